@@ -0,0 +1,104 @@
+#!/usr/bin/python
+#
+# Katello CLI checksum benchmark
+# Copyright 2013 Red Hat, Inc.
+#
+# This software is licensed to you under the GNU General Public License,
+# version 2 (GPLv2). There is NO WARRANTY for this software, express or
+# implied, including the implied warranties of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. You should have received a copy of GPLv2
+# along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+#
+# Red Hat trademarks are not licensed under GPLv2. No permission is
+# granted to use or replicate Red Hat trademarks that are incorporated
+# in this software or its documentation.
+
+# Measures throughput of checksumming large files: reading vs. mapping the
+# file to memory, one algorithm vs. sha256 and sha1 in a single pass, and
+# hashing while the file is sent for upload vs. a separate checksum pass.
+# The upload sends chunks to a server stub, so only the client side is
+# measured.
+#
+# Without a file a test file of the given size is created (and removed).
+# The file is likely in the page cache after it's written, to measure cold
+# reads drop the caches between the runs (echo 3 > /proc/sys/vm/drop_caches).
+#
+# Usage: checksum_benchmark.py [-s SIZE_MB] [file]
+#    eg. checksum_benchmark.py -s 4096
+
+import os
+import sys
+import tempfile
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../src")
+sys.path.insert(0, SRC_DIR)
+
+
+class NullUploadAPI(object):
+    def upload_bits(self, repo_id, upload_id, offset, content):
+        pass
+
+
+def create_file(size_mb):
+    fd, path = tempfile.mkstemp(suffix='.bin')
+    f = os.fdopen(fd, 'wb')
+    block = os.urandom(1024 * 1024)
+    for __ in range(size_mb):
+        f.write(block)
+    f.close()
+    return path
+
+
+def measure(label, size, function):
+    start = time.time()
+    function()
+    elapsed = time.time() - start
+    print "%-32s %7.2f s  %8.1f MB/s" % (label, elapsed, size / elapsed / 1024 / 1024)
+
+
+def main(args):
+    size_mb = 2048
+    if args[:1] == ['-s']:
+        size_mb = int(args[1])
+        args = args[2:]
+
+    from katello.client.i18n import configure_i18n
+    configure_i18n()
+    from katello.client.core.repo import ContentUpload
+    from katello.client.lib.utils.checksum import MultiHash, file_checksums
+
+    if args:
+        path, created = args[0], False
+    else:
+        path, created = create_file(size_mb), True
+    size = os.path.getsize(path)
+
+    upload = ContentUpload()
+    upload.upload_api = NullUploadAPI()
+
+    def upload_then_hash():
+        upload.send_content(1, 'benchmark', path)
+        file_checksums(path, ['sha256'])
+
+    def upload_with_hash():
+        upload.send_content(1, 'benchmark', path, hashes=MultiHash(['sha256']))
+
+    try:
+        print "%s, %.1f MB" % (path, size / 1024.0 / 1024)
+        measure("sha256 read", size, lambda: file_checksums(path, ['sha256'], use_mmap=False))
+        measure("sha256 mmap", size, lambda: file_checksums(path, ['sha256'], use_mmap=True))
+        measure("sha256, sha1 in two passes", size,
+            lambda: [file_checksums(path, [algorithm]) for algorithm in ('sha256', 'sha1')])
+        measure("sha256 + sha1 read", size, lambda: file_checksums(path, ['sha256', 'sha1'], use_mmap=False))
+        measure("sha256 + sha1 mmap", size, lambda: file_checksums(path, ['sha256', 'sha1'], use_mmap=True))
+        measure("upload, then sha256", size, upload_then_hash)
+        measure("upload hashing sha256", size, upload_with_hash)
+    finally:
+        if created:
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,97 @@
+#!/usr/bin/python
+#
+# Katello CLI startup benchmark
+# Copyright 2013 Red Hat, Inc.
+#
+# This software is licensed to you under the GNU General Public License,
+# version 2 (GPLv2). There is NO WARRANTY for this software, express or
+# implied, including the implied warranties of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. You should have received a copy of GPLv2
+# along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+#
+# Red Hat trademarks are not licensed under GPLv2. No permission is
+# granted to use or replicate Red Hat trademarks that are incorporated
+# in this software or its documentation.
+
+# Measures time the cli spends before it can parse options of a command:
+# imports, building the command tree and creating the command's parser.
+# The lazily loaded command tree (as used by bin/katello) is compared with
+# a tree with all the commands loaded upfront. Every run is done in a fresh
+# interpreter, so that module imports are counted.
+#
+# Usage: startup_benchmark.py [-n RUNS] [command [subcommand ...]]
+#    eg. startup_benchmark.py -n 20 ping
+
+import os
+import subprocess
+import sys
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../src")
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../etc/client.conf")
+
+
+def load_all(cmd):
+    from katello.client.core.base import CommandContainer
+    if not isinstance(cmd, CommandContainer):
+        return
+    for name in cmd.get_command_names():
+        load_all(cmd.get_command(name))
+
+
+def measure(eager, command_path):
+    start = time.time()
+
+    from katello.client.config import Config
+    Config.PATH = CONFIG_PATH
+    from katello.client.i18n import configure_i18n
+    configure_i18n()
+
+    from katello.client.cli.admin import AdminCLI
+    from katello.client.main import setup_admin
+    cmd = AdminCLI()
+    setup_admin(cmd)
+    if eager:
+        load_all(cmd)
+    for name in command_path:
+        cmd = cmd.get_command(name)
+    cmd.create_parser()
+
+    return time.time() - start
+
+
+def run_child(eager, command_path):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([SRC_DIR] + [p for p in [env.get('PYTHONPATH')] if p])
+    args = [sys.executable, os.path.abspath(__file__), '--child', eager and 'eager' or 'lazy'] + command_path
+    output = subprocess.Popen(args, env=env, stdout=subprocess.PIPE).communicate()[0]
+    return float(output.strip().splitlines()[-1])
+
+
+def report(label, times):
+    times = sorted(times)
+    print "%-6s  min %7.1f ms   median %7.1f ms   max %7.1f ms" % \
+        (label, times[0] * 1000, times[len(times) / 2] * 1000, times[-1] * 1000)
+
+
+def main(args):
+    runs = 10
+    if args[:1] == ['-n']:
+        runs = int(args[1])
+        args = args[2:]
+    command_path = args or ['ping']
+
+    print "katello %s, %d runs" % (' '.join(command_path), runs)
+    lazy = [run_child(False, command_path) for __ in range(runs)]
+    eager = [run_child(True, command_path) for __ in range(runs)]
+    report("lazy", lazy)
+    report("eager", eager)
+    print "speedup %.1fx" % (sorted(eager)[runs / 2] / sorted(lazy)[runs / 2])
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ['--child']:
+        print measure(sys.argv[2] == 'eager', sys.argv[3:])
+    else:
+        main(sys.argv[1:])
@@ -29,4 +29,23 @@ class KatelloAPI(object):
     # pylint: disable=R0201
     @property
     def server(self):
-        return server.active_server
+        return server.get_active_server()
+
+    @classmethod
+    def paging_query(cls, query=None, page=None, per_page=None):
+        """
+        Add pagination parameters to a query
+        @type query: dict
+        @param query: query parameters, the dictionary is not modified
+        @type page: int
+        @param page: number of the page to return, starting from 1
+        @type per_page: int
+        @param per_page: number of records on a page
+        @rtype: dict
+        """
+        query = dict(query or {})
+        if page is not None:
+            query['page'] = page
+        if per_page is not None:
+            query['per_page'] = per_page
+        return query
@@ -34,7 +34,7 @@ class EnvironmentAPI(KatelloAPI):
 
     def environment_by_name(self, orgId, envName):
         path = "/api/organizations/%s/environments/" % (orgId)
-        envs = self.server.GET(path, {"name": envName})[1]
+        envs = self.server.GET(path, {"name": envName}, cache=True)[1]
         if len(envs) > 0:
             return envs[0]
         else:
@@ -42,7 +42,7 @@ class EnvironmentAPI(KatelloAPI):
 
     def library_by_org(self, orgId):
         path = "/api/organizations/%s/environments/" % (orgId)
-        envs = self.server.GET(path, {"library": "true"})[1]
+        envs = self.server.GET(path, {"library": "true"}, cache=True)[1]
         if len(envs) > 0:
             return envs[0]
         else:
@@ -18,9 +18,10 @@ from katello.client.api.base import KatelloAPI
 class ErrataAPI(KatelloAPI):
     """ Connection class to access errata calls """
 
-    def errata_filter(self, repo_id=None, environment_id=None, prod_id=None, type_in=None, severity=None):
+    def errata_filter(self, repo_id=None, environment_id=None, prod_id=None, type_in=None, severity=None,
+                      stream=False, page=None, per_page=None):
         path = "/api/errata"
-        params = {}
+        params = self.paging_query(None, page, per_page)
         if not repo_id == None:
             params['repoid'] = repo_id
         if not environment_id == None:
@@ -31,7 +32,7 @@ class ErrataAPI(KatelloAPI):
             params['type'] = type_in
         if not severity == None:
             params['severity'] = severity
-        pack = self.server.GET(path, params)[1]
+        pack = self.server.GET(path, params, stream=stream)[1]
         return pack
 
     def errata_by_repo(self, repoId, type_in=None):
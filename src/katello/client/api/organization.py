@@ -42,7 +42,7 @@ class OrganizationAPI(KatelloAPI):
 
     def organization(self, name):
         path = "/api/organizations/%s" % u_str(name)
-        org = self.server.GET(path)[1]
+        org = self.server.GET(path, cache=True)[1]
         return org
 
     def uebercert(self, name, regenerate=False):
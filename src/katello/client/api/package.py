@@ -24,9 +24,9 @@ class PackageAPI(KatelloAPI):
         pack = self.server.GET(path)[1]
         return pack
 
-    def packages_by_repo(self, repoId):
+    def packages_by_repo(self, repoId, stream=False, page=None, per_page=None):
         path = "/api/repositories/%s/packages" % repoId
-        pack_list = self.server.GET(path)[1]
+        pack_list = self.server.GET(path, self.paging_query(None, page, per_page), stream=stream)[1]
         return pack_list
 
     def search(self, query, repoId):
@@ -42,7 +42,7 @@ class ProductAPI(KatelloAPI):
         update_dict_unless_none(params, "label", prodLabel)
         update_dict_unless_none(params, "cp_id", prodId)
         path = "/api/organizations/%s/products" % u_str(orgName)
-        products = self.server.GET(path, params)[1]
+        products = self.server.GET(path, params, cache=True)[1]
         return products
 
     def create(self, provId, name, label, description, gpgkey):
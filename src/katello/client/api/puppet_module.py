@@ -25,9 +25,9 @@ class PuppetModuleAPI(KatelloAPI):
         module = self.server.GET(path)[1]
         return module
 
-    def puppet_modules_by_repo(self, repo_id):
+    def puppet_modules_by_repo(self, repo_id, page=None, per_page=None):
         path = "/api/repositories/%s/puppet_modules" % repo_id
-        module_list = self.server.GET(path)[1]
+        module_list = self.server.GET(path, self.paging_query(None, page, per_page))[1]
         return module_list
 
     def search(self, query, repo_id):
@@ -77,7 +77,7 @@ class RepoAPI(KatelloAPI):
 
     def repo(self, repo_id):
         path = "/api/repositories/%s/" % repo_id
-        data = self.server.GET(path)[1]
+        data = self.server.GET(path, cache=True)[1]
         return data
 
 
@@ -166,26 +166,26 @@ class SystemAPI(KatelloAPI):
         path = "/api/systems/%s/packages" % system_id
         return self.server.DELETE(path, {"groups": packages})[1]
 
-    def systems_by_org(self, orgId, query = None):
+    def systems_by_org(self, orgId, query = None, stream = False, page = None, per_page = None):
         path = "/api/organizations/%s/systems" % orgId
-        return self.server.GET(path, query)[1]
+        return self.server.GET(path, self.paging_query(query, page, per_page), stream=stream)[1]
 
-    def systems_by_env(self, environment_id, query = None):
+    def systems_by_env(self, environment_id, query = None, stream = False, page = None, per_page = None):
         path = "/api/environments/%s/systems" % environment_id
-        return self.server.GET(path, query)[1]
+        return self.server.GET(path, self.paging_query(query, page, per_page), stream=stream)[1]
 
     def errata(self, system_id):
         path = "/api/systems/%s/errata" % system_id
         return self.server.GET(path)[1]
 
-    def report_by_org(self, orgId, format_in):
+    def report_by_org(self, orgId, format_in, stream=False):
         path = "/api/organizations/%s/systems/report" % orgId
-        to_return = self.server.GET(path, custom_headers={"Accept": format_in})
+        to_return = self.server.GET(path, custom_headers={"Accept": format_in}, raw=stream)
         return (to_return[1], to_return[2])
 
-    def report_by_env(self, env_id, format_in):
+    def report_by_env(self, env_id, format_in, stream=False):
         path = "/api/environments/%s/systems/report" % env_id
-        to_return = self.server.GET(path, custom_headers={"Accept": format_in})
+        to_return = self.server.GET(path, custom_headers={"Accept": format_in}, raw=stream)
         return (to_return[1], to_return[2])
 
     def add_system_groups(self, system_id, system_group_ids):
@@ -57,9 +57,9 @@ class UserAPI(KatelloAPI):
         path = "/api/users/%s" % u_str(user_id)
         return self.server.PUT(path, {"user": userdata})[1]
 
-    def users(self, query=None):
+    def users(self, query=None, page=None, per_page=None):
         path = "/api/users/"
-        users = self.server.GET(path, query)[1]
+        users = self.server.GET(path, self.paging_query(query, page, per_page))[1]
         return users
 
     def user(self, user_id):
@@ -92,6 +92,6 @@ class UserAPI(KatelloAPI):
         path = "/api/users/%s/roles/" % u_str(user_id)
         return self.server.GET(path)[1]
 
-    def report(self, format_in):
-        to_return = self.server.GET("/api/users/report", custom_headers={"Accept": format_in})
+    def report(self, format_in, stream=False):
+        to_return = self.server.GET("/api/users/report", custom_headers={"Accept": format_in}, raw=stream)
         return (to_return[1], to_return[2])
@@ -19,8 +19,19 @@ Bunch of api utilities for finding records by their names.
 Katello API uses integer ids for record identification in most
 cases. These util functions help with translating names to ids.
 All of them throw ApiDataError if any of the records is not found.
+
+Records found by the most frequently used helpers are remembered for a short
+time by L{resolution_cache}, so that nested lookups and consecutive commands
+in the katello shell don't ask the server repeatedly. Repositories change
+their state (e.g. when they are synchronized), only their ids are cached.
 """
 
+import threading
+import time
+from copy import deepcopy
+from functools import wraps
+
+from katello.client import server
 
 from katello.client.api.organization import OrganizationAPI
 from katello.client.api.environment import EnvironmentAPI
@@ -50,6 +61,157 @@ class ApiDataError(Exception):
     pass
 
 
+class ResolutionCache(object):
+    """
+    Process wide cache of records resolved by their names.
+
+    Entries are kept per entity type for the type's time to live. Whenever
+    the client itself successfully modifies a record on the server, cached
+    entries of that entity type (and of the types depending on it) are
+    dropped.
+
+    @ivar enabled: the cache is bypassed unless this flag is set
+    """
+
+    # time to live of the entries in seconds
+    TTL = {
+        'organization': 600,
+        'environment': 300,
+        'product': 120,
+        'content_view': 60,
+        'cv_definition': 60,
+        'repository': 60,
+        'system_group': 120
+    }
+
+    # api path segments identifying the entity type of a modified record
+    PATH_ENTITIES = {
+        'organizations': 'organization',
+        'environments': 'environment',
+        'products': 'product',
+        'content_views': 'content_view',
+        'content_view_definitions': 'cv_definition',
+        'repositories': 'repository',
+        'system_groups': 'system_group',
+        'providers': 'provider',
+        'changesets': 'changeset',
+        # enabling a repository set creates its repositories
+        'repository_sets': 'repository'
+    }
+
+    # actions on a record that modify the record itself, e.g. /api/changesets/5/apply
+    RECORD_ACTIONS = ('import_manifest', 'delete_manifest', 'refresh_manifest', 'refresh_products',
+        'product_create', 'apply', 'promote', 'refresh', 'clone', 'enable', 'disable')
+
+    # entity types embedding data of another type
+    DEPENDENT = {
+        'organization': TTL.keys(),
+        'environment': ['repository'],
+        'product': ['repository'],
+        'content_view': ['repository'],
+        'cv_definition': ['content_view'],
+        # providers own products and their repositories, e.g. a manifest import
+        'provider': ['product', 'repository'],
+        # promotion and deletion changesets add and remove content of environments
+        'changeset': ['product', 'content_view', 'repository']
+    }
+
+    def __init__(self):
+        self.enabled = False
+        self.__entries = {}
+        self.__lock = threading.Lock()
+
+    def get(self, key, now=None):
+        """
+        @type key: tuple
+        @param key: cache key, its first item is the entity type
+        @rtype: (bool, any)
+        @return: tuple of a flag whether the key was found and the cached value
+        """
+        now = now or time.time()
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None:
+                return (False, None)
+            if entry[0] <= now:
+                del self.__entries[key]
+                return (False, None)
+            return (True, entry[1])
+
+    def store(self, key, value, now=None):
+        now = now or time.time()
+        with self.__lock:
+            self.__entries[key] = (now + self.TTL[key[0]], value)
+
+    def invalidate(self, entity=None):
+        """
+        Drop entries of the entity type and of the types depending on it,
+        or all entries when no type is given
+        """
+        with self.__lock:
+            if entity is None:
+                self.__entries.clear()
+                return
+            entities = set([entity] + self.DEPENDENT.get(entity, []))
+            for key in self.__entries.keys():
+                if key[0] in entities:
+                    del self.__entries[key]
+
+    def invalidate_path(self, method, path):
+        """
+        Modification listener dropping entries of the entity type
+        modified by a request to the path. The type is determined by
+        the last collection in the path only, e.g. /api/organizations/ACME/products/1
+        modifies a product, while /api/organizations/ACME/systems modifies
+        systems, which aren't cached.
+        """
+        segments = [segment for segment in path.split('/') if segment]
+        if 'api' in segments:
+            segments = segments[segments.index('api') + 1:]
+        if len(segments) > 2 and len(segments) % 2 == 1 and segments[-1] in self.RECORD_ACTIONS:
+            segments = segments[:-1]
+        if not segments:
+            return
+        # collections and ids of their records alternate in the path
+        entity = self.PATH_ENTITIES.get(segments[(len(segments) - 1) // 2 * 2])
+        if entity is not None:
+            self.invalidate(entity)
+
+
+resolution_cache = ResolutionCache()
+server.add_modification_listener(resolution_cache.invalidate_path)
+
+
+def _server_identity():
+    active_server = server.get_active_server()
+    if active_server is None:
+        return None
+    return active_server.identity()
+
+
+def cached_lookup(entity):
+    """
+    Decorator remembering records returned by a lookup function in
+    the L{resolution_cache}. Callers always get their own copy of the record.
+    @type entity: str
+    @param entity: entity type of the returned records
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not resolution_cache.enabled:
+                return func(*args, **kwargs)
+            key = (entity, _server_identity(), func.__name__, args, tuple(sorted(kwargs.items())))
+            found, value = resolution_cache.get(key)
+            if not found:
+                value = func(*args, **kwargs)
+                resolution_cache.store(key, value)
+            return deepcopy(value)
+        return wrapper
+    return decorator
+
+
+@cached_lookup('organization')
 def get_organization(orgName):
     organization_api = OrganizationAPI()
 
@@ -60,6 +222,7 @@ def get_organization(orgName):
     return org
 
 
+@cached_lookup('environment')
 def get_environment(orgName, envName=None):
     environment_api = EnvironmentAPI()
 
@@ -79,6 +242,7 @@ def get_library(orgName):
     return get_environment(orgName, None)
 
 
+@cached_lookup('product')
 def get_product(orgName, prodName=None, prodLabel=None, prodId=None):
     """
     Retrieve product by name, label or id.
@@ -98,6 +262,7 @@ def get_product(orgName, prodName=None, prodLabel=None, prodId=None):
     return products[0]
 
 
+@cached_lookup('content_view')
 def get_content_view(org_name, view_label=None, view_name=None, view_id=None):
     cv_api = ContentViewAPI()
 
@@ -121,6 +286,7 @@ def get_composite_cv_definition(org_name, def_label=None, def_name=None, def_id=
         raise  ApiDataError(_("%(def)s is not a composite definition") % {'def':cvd['name']})
     return cvd
 
+@cached_lookup('cv_definition')
 def get_cv_definition(org_name, def_label=None, def_name=None, def_id=None):
     cvd_api = ContentViewDefinitionAPI()
 
@@ -163,6 +329,18 @@ def get_node(node_name, node_id):
 
 def get_repo(orgName, repoName, prodName=None, prodLabel=None, prodId=None, envName=None, includeDisabled=False,
              viewName=None, viewLabel=None, viewId=None):
+    repoId = get_repo_id(orgName, repoName, prodName, prodLabel, prodId, envName, includeDisabled,
+                         viewName, viewLabel, viewId)
+    #repo by id call provides more information
+    return RepoAPI().repo(repoId)
+
+@cached_lookup('repository')
+def get_repo_id(orgName, repoName, prodName=None, prodLabel=None, prodId=None, envName=None, includeDisabled=False,
+                viewName=None, viewLabel=None, viewId=None):
+    """
+    Resolve id of a repository. Unlike the repository details, the id
+    doesn't change, so it is cached.
+    """
     repo_api = RepoAPI()
 
     env  = get_environment(orgName, envName)
@@ -176,8 +354,7 @@ def get_repo(orgName, repoName, prodName=None, prodLabel=None, prodId=None, envN
 
     repos = repo_api.repos_by_env_product(env["id"], prod["id"], repoName, includeDisabled, resultViewId)
     if len(repos) > 0:
-        #repo by id call provides more information
-        return repo_api.repo(repos[0]["id"])
+        return repos[0]["id"]
 
     if view:
         error = _("Could not find repository [ %(repoName)s ] within organization [ %(orgName)s ], " \
@@ -242,6 +419,7 @@ def get_permission(role_name, permission_name):
             {'role_name':role_name, 'permission_name':permission_name})
     return perm
 
+@cached_lookup('system_group')
 def get_system_group(org_name, system_group_name):
     system_group_api = SystemGroupAPI()
 
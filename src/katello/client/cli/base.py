@@ -28,6 +28,9 @@ from katello.client import server
 
 from katello.client.server import BasicAuthentication, SSLAuthentication, NoAuthentication
 from katello.client.lib.control import get_katello_mode
+from katello.client.lib.http_cache import ResponseCache
+from katello.client.api.utils import resolution_cache
+from katello.client.lib.ui.progress import PollingDelay
 
 
 _log = getLogger(__name__)
@@ -72,6 +75,19 @@ def opt_parser_add_environment(parser, required=None, default=''):
                       help=_('environment name e.g.: production%(required)s%(default)s')
                         % {'required':required, 'default':default})
 
+def opt_parser_add_paging(parser):
+    """ Add to the instance of optparse options --limit and --offset"""
+    parser.add_option('--limit', dest='limit', type="int",
+                      help=_("maximal number of records to list"))
+    parser.add_option('--offset', dest='offset', type="int",
+                      help=_("number of records to skip (default: 0)"))
+
+def check_paging_options(validator):
+    """ Check values of the options added by opt_parser_add_paging"""
+    for opt_dest in ('limit', 'offset'):
+        if validator.exists(opt_dest) and getattr(validator.options, opt_dest) < 0:
+            validator.add_option_error(_('Option --%s must not be negative') % opt_dest)
+
 def opt_parser_add_node(parser):
     """
     Add node view options (name, id) to command
@@ -123,6 +139,17 @@ class KatelloCLI(Command):
         self._password = None
         self._certfile = None
         self._keyfile = None
+        self.thread_local_server = False
+
+    def share_credentials(self, cli):
+        """
+        Use the credentials another cli was started with
+        @type cli: KatelloCLI
+        """
+        self._username = cli._username
+        self._password = cli._password
+        self._certfile = cli._certfile
+        self._keyfile = cli._keyfile
 
     def setup_parser(self, parser):
         """
@@ -172,7 +199,75 @@ class KatelloCLI(Command):
         path = self.opts.path
 
         self._server = server.KatelloServer(host, int(port), scheme, path, self.__server_locale())
-        server.set_active_server(self._server)
+        server.set_active_server(self._server, self.thread_local_server)
+        if not self.thread_local_server:
+            # workers of a batch script share the pool their parent sized for them
+            self.__setup_connection_pool()
+        self.__setup_compression()
+        self.__setup_response_cache()
+        self.__setup_resolution_cache()
+        self.__setup_polling()
+
+    def __setup_response_cache(self):
+        """
+        Set up the on-disk cache of lookup responses in the user's config dir.
+        """
+        Config()
+        if Config.parser.has_option('server', 'http_cache') and \
+            Config.parser.get('server', 'http_cache').lower() == 'false':
+            return
+        max_size = 10
+        if Config.parser.has_option('server', 'http_cache_size'):
+            max_size = Config.parser.getint('server', 'http_cache_size')
+        self._server.response_cache = ResponseCache(os.path.join(Config.USER_DIR, 'http_cache'),
+                                                    max_size * 1024 * 1024)
+
+    def __setup_resolution_cache(self):
+        """
+        Remember records resolved by their names for the rest of the process,
+        unless disabled by [server] lookup_cache.
+        """
+        Config()
+        resolution_cache.enabled = not (Config.parser.has_option('server', 'lookup_cache') and \
+            Config.parser.get('server', 'lookup_cache').lower() == 'false')
+
+    def __setup_compression(self):
+        """
+        Configure compression of responses and request bodies from the
+        [server] section of the config file.
+        """
+        Config()
+        accept_compressed = not (Config.parser.has_option('server', 'compression') and \
+            Config.parser.get('server', 'compression').lower() == 'false')
+        compress_requests = Config.parser.has_option('server', 'compress_requests') and \
+            Config.parser.get('server', 'compress_requests').lower() == 'true'
+        self._server.set_compression(accept_compressed, compress_requests)
+
+    @classmethod
+    def __setup_connection_pool(cls):
+        """
+        Configure keep-alive connection pooling from the [server] section
+        of the config file.
+        """
+        Config()
+        pool = server.connection_pool
+        if Config.parser.has_option('server', 'keepalive') and \
+            Config.parser.get('server', 'keepalive').lower() == 'false':
+            pool.max_per_host = 0
+        elif Config.parser.has_option('server', 'keepalive_connections'):
+            pool.max_per_host = Config.parser.getint('server', 'keepalive_connections')
+        if Config.parser.has_option('server', 'keepalive_timeout'):
+            pool.idle_timeout = Config.parser.getint('server', 'keepalive_timeout')
+
+    @classmethod
+    def __setup_polling(cls):
+        """
+        Configure the ceiling of delays between task status polls
+        from the [interface] section of the config file.
+        """
+        Config()
+        if Config.parser.has_option('interface', 'poll_max_delay'):
+            PollingDelay.max_delay = Config.parser.getfloat('interface', 'poll_max_delay')
 
     @classmethod
     def __server_locale(cls):
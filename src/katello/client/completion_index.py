@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2013 Red Hat, Inc.
+#
+# This software is licensed to you under the GNU Lesser General Public
+# License as published by the Free Software Foundation; either version
+# 2 of the License (LGPLv2) or (at your option) any later version.
+# There is NO WARRANTY for this software, express or implied,
+# including the implied warranties of MERCHANTABILITY,
+# NON-INFRINGEMENT, or FITNESS FOR A PARTICULAR PURPOSE. You should
+# have received a copy of LGPLv2 along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/lgpl-2.0.txt.
+
+"""
+Tab completion answered from a precomputed index of the command tree.
+
+Building the command tree and parsers of the commands on every keystroke
+is slow. The names of subcommands and long options of every command are
+therefore serialized to a file in the user's config directory and reused
+until the installed cli or the config files change. This module must stay
+light, it doesn't import any of the command modules.
+"""
+
+import glob
+import os
+import tempfile
+
+try:
+    import json
+except ImportError:
+    import simplejson as json
+
+from katello.client.config import Config
+from katello.client.lib.control import parse_tokens
+
+
+class CompletionIndex(object):
+    """
+    Completion index stored on disk. The index contains trees of commands
+    for the modes (katello/headpin) it was used in, each node has the form
+    {'commands': {name: node}, 'options': [long options]}
+
+    @ivar path: path to the index file
+    """
+
+    FILE = 'completion_index.json'
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(Config.USER_DIR, self.FILE)
+
+    @classmethod
+    def stamp(cls):
+        """
+        Identification of the installed commands and of the config files.
+        The index is rebuilt whenever it changes.
+        @rtype: list
+        """
+        package_dir = os.path.dirname(os.path.abspath(__file__))
+        sources = [os.path.join(package_dir, 'main.py')] + glob.glob(os.path.join(package_dir, 'core', '*.py'))
+        configs = [Config.PATH, Config.USER, Config.USER_OPTIONS]
+        return [max([cls.__mtime(path) for path in sources]), [cls.__mtime(path) for path in configs]]
+
+    def load(self, mode, stamp):
+        """
+        @rtype: dict
+        @return: tree of commands for the mode or None when the index
+                 doesn't exist or is outdated
+        """
+        index = self.__read()
+        if index.get('stamp') != stamp:
+            return None
+        return index['modes'].get(mode)
+
+    def save(self, mode, stamp, tree):
+        """
+        Store tree of commands for the mode. Trees of other modes are kept
+        as long as the stamp doesn't change.
+        """
+        index = self.__read()
+        if index.get('stamp') != stamp:
+            index = {'stamp': stamp, 'modes': {}}
+        index['modes'][mode] = tree
+        try:
+            directory = os.path.dirname(self.path)
+            if not os.path.isdir(directory):
+                os.makedirs(directory, 0700)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            f = os.fdopen(fd, 'w')
+            try:
+                json.dump(index, f)
+            finally:
+                f.close()
+            os.rename(tmp_path, self.path)
+        except (IOError, OSError):
+            # completion works without the index, only slower
+            pass
+
+    @classmethod
+    def build(cls, cmd):
+        """
+        Build tree of commands from a command and all its subcommands.
+        This loads all the commands.
+        @rtype: dict
+        """
+        # imported here to keep completions answered from the index fast
+        from katello.client.core.base import CommandContainer
+
+        node = {'commands': {}, 'options': sorted(cmd.create_parser().get_long_options())}
+        if isinstance(cmd, CommandContainer):
+            for name in cmd.get_command_names():
+                node['commands'][name] = cls.build(cmd.get_command(name))
+        return node
+
+    def __read(self):
+        try:
+            f = open(self.path)
+            try:
+                return json.load(f)
+            finally:
+                f.close()
+        except (IOError, ValueError):
+            return {}
+
+    @classmethod
+    def __mtime(cls, path):
+        try:
+            return os.path.getmtime(path)
+        except OSError:
+            return None
+
+
+class IndexCompletion(object):
+    """
+    Completion of command lines using a tree of commands from the L{CompletionIndex}
+    """
+
+    def __init__(self, tree):
+        self.tree = tree
+
+    def __get_node(self, names):
+        node = self.tree
+        for name in names:
+            if name in node['commands']:
+                node = node['commands'][name]
+        return node
+
+    def complete(self, line):
+        """
+        Return the next possible completions for 'line'.
+        """
+        line_parts = parse_tokens(line)
+        if line.endswith(" ") or not len(line):
+            last_word = ""
+            node = self.__get_node(line_parts)
+        else:
+            last_word = line_parts[-1]
+            node = self.__get_node(line_parts[:-1])
+
+        completions = node['commands'].keys() + node['options']
+        return [a for a in completions if a.startswith(last_word)]
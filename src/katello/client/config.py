@@ -47,6 +47,9 @@ class Config(object):
     @cvar USER: The path to an alternate configuration file
         within the user's home.
     @type USER: str
+    @cvar generation: Number increased whenever the saved options change,
+        used to find out that objects derived from the options are outdated.
+    @type generation: int
     """
 
     FILE = 'client.conf'
@@ -61,6 +64,7 @@ class Config(object):
     USER_OPTIONS = os.path.expanduser(os.path.join(USER_DIR, 'client-options.conf'))
 
     parser = None
+    generation = 0
 
     def __init__(self):
         """
@@ -90,6 +94,7 @@ class Config(object):
         if not Config.parser:
             raise Exception('Config.parser has not been initialized.')
 
+        Config.generation += 1
         opt = ConfigParser.RawConfigParser()
         # write a comment informing user not to use this file for own settings
         opt.set('', '# = do not edit and use client.conf instead', '')
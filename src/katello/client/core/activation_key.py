@@ -19,9 +19,10 @@ import sys
 
 from katello.client.api.activation_key import ActivationKeyAPI
 from katello.client.api.system_group import SystemGroupAPI
+from katello.client.api.content_view import ContentViewAPI
 from katello.client.core.base import BaseAction, Command
 from katello.client.api.utils import get_environment, get_content_view
-from katello.client.lib.utils.data import test_record
+from katello.client.lib.utils.data import test_record, join_related
 from katello.client.lib.ui import printer
 from katello.client.cli.base import opt_parser_add_org, opt_parser_add_environment, \
     opt_parser_add_content_view
@@ -69,9 +70,10 @@ class List(ActivationKeyAction):
                 k['usage'] = str(k['usage_count'])
             else:
                 k['usage'] = str(k['usage_count']) + '/' + str(k['usage_limit'])
-            if mode == 'katello' and k['content_view_id']:
-                view = get_content_view(orgName, view_id=k['content_view_id'])
-                k['content_view'] = view["name"]
+
+        if mode == 'katello' and [k for k in keys if k['content_view_id']]:
+            views = ContentViewAPI().content_views_by_org(orgName)
+            join_related(keys, views, 'content_view_id', 'content_view')
 
         self.printer.add_column('id', _("ID"))
         self.printer.add_column('name', _("Name"))
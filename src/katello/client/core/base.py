@@ -85,10 +85,76 @@ class CommandContainer(object):
         :return: command or action registered under the given name
         """
         if name in self.__subcommands:
-            return self.__subcommands[name]
+            command = self.__subcommands[name]
+            if isinstance(command, LazyCommand):
+                command = self.__subcommands[name] = command.load()
+            return command
         raise CommandException(_("Command not found"))
 
 
+class LazyCommand(object):
+    """
+    Placeholder that can be registered instead of a command or action.
+    The module defining the command is imported and the command is
+    instantiated only when it is first looked up in its container, so that
+    running one command doesn't import modules of all the others.
+
+    Subcommands added to the placeholder are added to the command once
+    it is loaded.
+
+    :ivar path: dotted path to the class of the command,
+                eg. katello.client.core.ping.Status
+    """
+
+    def __init__(self, path, *args, **kwargs):
+        """
+        :param path: dotted path to the class of the command
+        :type path: string
+        :param args: arguments for the constructor of the command
+        :param kwargs: keyword arguments for the constructor of the command
+        """
+        self.path = path
+        self.__args = args
+        self.__kwargs = kwargs
+        self.__subcommands = []
+
+    def add_command(self, name, command):
+        self.__subcommands.append((name, command))
+
+    def load(self):
+        """
+        Import the command's module and create the command
+
+        :rtype: Action|Command
+        """
+        module_name, class_name = self.path.rsplit('.', 1)
+        module = __import__(module_name, fromlist=[class_name])
+        command = getattr(module, class_name)(*self.__args, **self.__kwargs)
+        for name, subcommand in self.__subcommands:
+            command.add_command(name, subcommand)
+        return command
+
+
+class LazyModule(object):
+    """
+    Stand-in for a module with commands. Instantiating a class of the module
+    creates a L{LazyCommand} instead, eg. LazyModule('katello.client.core.ping').Status()
+    """
+
+    def __init__(self, name):
+        """
+        :param name: full name of the module
+        :type name: string
+        """
+        self.__name = name
+
+    def __getattr__(self, class_name):
+        if class_name.startswith('__'):
+            raise AttributeError(class_name)
+        path = '%s.%s' % (self.__name, class_name)
+        return lambda *args, **kwargs: LazyCommand(path, *args, **kwargs)
+
+
 
 class Action(object):
     """
@@ -104,6 +170,10 @@ class Action(object):
     args = None
     takes_options = True
 
+    # reuse option parsers between runs of the actions, set in the shell
+    cache_parsers = False
+    _cached_parser = None
+
     def _get_usage_line(self, command_name, parent_usage):
         first_line = parent_usage or ""
         first_line += " "
@@ -137,9 +207,35 @@ class Action(object):
         """
         parser = OptionParser(option_class=KatelloOption)
         self.setup_parser(parser)
-        parser.set_usage(self.usage(command_name, parent_usage))
+        # usage of commands lists all their subcommands, build it only when it's displayed
+        parser.set_usage(lambda: self.usage(command_name, parent_usage))
         return parser
 
+    def get_parser(self, command_name=None, parent_usage=None):
+        """
+        Get an option parser for running the action. When parsers are cached,
+        the parser is built only once and reused until the saved options change.
+        Parsing options doesn't change the parser, so every run still gets
+        fresh opts and args.
+
+        :rtype: OptionParser
+        """
+        if not Action.cache_parsers:
+            return self.build_parser(command_name, parent_usage)
+
+        key = (command_name, parent_usage, Config.generation)
+        if self._cached_parser is None or self._cached_parser[0] != key:
+            self._cached_parser = (key, self.build_parser(command_name, parent_usage))
+        return self._cached_parser[1]
+
+    def build_parser(self, command_name=None, parent_usage=None):
+        """
+        Create a parser prepared for running the action
+
+        :rtype: OptionParser
+        """
+        return self.create_parser(command_name, parent_usage)
+
     @classmethod
     def create_validator(cls, parser, opts, args):
         """
@@ -244,7 +340,7 @@ class Action(object):
 
         :warning: this method should only be overridden with care
         """
-        parser = self.create_parser(command_name, parent_usage)
+        parser = self.get_parser(command_name, parent_usage)
         self.process_options(parser, args)
         return self.run()
 
@@ -303,7 +399,7 @@ class Command(CommandContainer, Action):
         if type(args) == str:
             args = parse_tokens(args)
 
-        parser = self.create_parser(command_name, parent_usage)
+        parser = self.get_parser(command_name, parent_usage)
         self.process_options(parser, args)
 
         self.run()
@@ -369,9 +465,13 @@ class BaseAction(Action):
                 parser.set_default(opt.get_dest(), opt_value)
 
 
-    def setup_action(self, args, command_name=None, parent_usage=None):
+    def build_parser(self, command_name=None, parent_usage=None):
         parser = self.create_parser(command_name, parent_usage)
         self.load_saved_options(parser)
+        return parser
+
+    def setup_action(self, args, command_name=None, parent_usage=None):
+        parser = self.get_parser(command_name, parent_usage)
         self.process_options(parser, args)
 
         self.printer = self.create_printer(self.__print_strategy())
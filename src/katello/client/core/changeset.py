@@ -261,7 +261,11 @@ class UpdateContent(ChangesetAction):
                                action="callback", callback=self._store_item,
                                help=_("id of a content view to be removed from the changeset"))
 
+    def process_options(self, parser, args):
+        # items are collected by the option callbacks, the parser may be
+        # reused in shell mode so they have to be cleared before every parsing
         self.reset_items()
+        super(UpdateContent, self).process_options(parser, args)
 
     def reset_items(self):
         self.items = {}
@@ -20,11 +20,12 @@ from katello.client.api.errata import ErrataAPI
 from katello.client.api.system import SystemAPI
 from katello.client.api.system_group import SystemGroupAPI
 from katello.client.cli.base import opt_parser_add_product, opt_parser_add_org, \
-        opt_parser_add_environment, opt_parser_add_content_view
+        opt_parser_add_environment, opt_parser_add_content_view, opt_parser_add_paging, check_paging_options
 from katello.client.core.base import BaseAction, Command
 from katello.client.api.utils import get_repo, get_environment, get_product, \
     get_system_group, get_system
 from katello.client.lib.utils.encoding import u_str
+from katello.client.lib.utils.paging import paged_items
 from katello.client.lib.ui import printer
 from katello.client.lib.ui.printer import batch_add_columns
 
@@ -58,6 +59,7 @@ class List(ErrataAction):
                       help=_("filter errata by type eg: enhancements"))
         parser.add_option('--severity', dest='severity',
                       help=_("filter errata by severity"))
+        opt_parser_add_paging(parser)
 
     def check_options(self, validator):
         validator.require_at_least_one_of(('repo', 'repo_id'))
@@ -67,6 +69,7 @@ class List(ErrataAction):
             validator.require_at_least_one_of(('product', 'product_label', 'product_id'))
             validator.mutually_exclude('product', 'product_label', 'product_id')
             validator.mutually_exclude('view_name', 'view_label', 'view_id')
+        check_paging_options(validator)
 
     def run(self):
         repo_id   = self.get_option('repo_id')
@@ -98,8 +101,9 @@ class List(ErrataAction):
                     prod_id = product["id"]
 
 
-        errata = self.api.errata_filter(repo_id=repo_id, environment_id=env_id, type_in=self.get_option('type'),
-            severity=self.get_option('severity'), prod_id=prod_id)
+        errata = paged_items(lambda page, per_page: self.api.errata_filter(repo_id=repo_id, environment_id=env_id,
+            type_in=self.get_option('type'), severity=self.get_option('severity'), prod_id=prod_id,
+            stream=True, page=page, per_page=per_page), self.get_option('offset'), self.get_option('limit'))
 
         self.printer.set_header(_("Errata List"))
         self.printer.print_items(errata)
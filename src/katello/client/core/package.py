@@ -18,9 +18,10 @@ import os
 
 from katello.client.api.package import PackageAPI
 from katello.client.cli.base import opt_parser_add_product, opt_parser_add_org, \
-        opt_parser_add_environment, opt_parser_add_content_view
+        opt_parser_add_environment, opt_parser_add_content_view, opt_parser_add_paging, check_paging_options
 from katello.client.core.base import BaseAction, Command
 from katello.client.api.utils import get_repo
+from katello.client.lib.utils.paging import paged_items, slice_items
 from katello.client.lib.ui import printer
 from katello.client.lib.ui.printer import batch_add_columns
 
@@ -106,6 +107,7 @@ class List(PackageAction):
         opt_parser_add_environment(parser, default="Library")
         opt_parser_add_product(parser)
         opt_parser_add_content_view(parser)
+        opt_parser_add_paging(parser)
 
     def check_options(self, validator):
         if not validator.exists('repo_id'):
@@ -113,6 +115,7 @@ class List(PackageAction):
             validator.require_at_least_one_of(('product', 'product_label', 'product_id'))
             validator.mutually_exclude('product', 'product_label', 'product_id')
             validator.mutually_exclude('view_name', 'view_label', 'view_id')
+        check_paging_options(validator)
 
     def run(self):
         repoId = self.get_repo_id()
@@ -121,7 +124,9 @@ class List(PackageAction):
 
         self.printer.set_header(_("Package List For Repo %s") % repoId)
 
-        packages = self.api.packages_by_repo(repoId)
+        packages = paged_items(
+            lambda page, per_page: self.api.packages_by_repo(repoId, stream=True, page=page, per_page=per_page),
+            self.get_option('offset'), self.get_option('limit'))
         self.print_packages(packages)
 
         return os.EX_OK
@@ -174,7 +179,7 @@ class Search(List):
             {'repoId':repoId, 'query':query})
 
         packages = self.api.search(query, repoId)
-        self.print_packages(packages)
+        self.print_packages(slice_items(packages, self.get_option('offset'), self.get_option('limit')))
         return os.EX_OK
 
 
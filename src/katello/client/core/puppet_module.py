@@ -18,9 +18,10 @@ import os
 
 from katello.client.api.puppet_module import PuppetModuleAPI
 from katello.client.cli.base import opt_parser_add_product, opt_parser_add_org, \
-    opt_parser_add_environment, opt_parser_add_content_view
+    opt_parser_add_environment, opt_parser_add_content_view, opt_parser_add_paging, check_paging_options
 from katello.client.core.base import BaseAction, Command
 from katello.client.api.utils import get_repo
+from katello.client.lib.utils.paging import paged_items, slice_items
 from katello.client.lib.ui import printer
 from katello.client.lib.ui.printer import batch_add_columns
 
@@ -106,6 +107,7 @@ class List(PuppetModuleAction):
         opt_parser_add_environment(parser, default="Library")
         opt_parser_add_product(parser)
         opt_parser_add_content_view(parser)
+        opt_parser_add_paging(parser)
 
     def check_options(self, validator):
         if not validator.exists('repo_id'):
@@ -113,6 +115,7 @@ class List(PuppetModuleAction):
             validator.require_at_least_one_of(('product', 'product_label', 'product_id'))
             validator.mutually_exclude('product', 'product_label', 'product_id')
             validator.mutually_exclude('view_name', 'view_label', 'view_id')
+        check_paging_options(validator)
 
     def run(self):
         repo_id = self.get_repo_id()
@@ -121,7 +124,9 @@ class List(PuppetModuleAction):
 
         self.printer.set_header(_("Puppet Module List For Repo %s") % repo_id)
 
-        puppet_modules = self.api.puppet_modules_by_repo(repo_id)
+        puppet_modules = paged_items(
+            lambda page, per_page: self.api.puppet_modules_by_repo(repo_id, page=page, per_page=per_page),
+            self.get_option('offset'), self.get_option('limit'))
         self.print_puppet_modules(puppet_modules)
 
         return os.EX_OK
@@ -176,7 +181,7 @@ class Search(List):
                                 {'repo_id': repo_id, 'query': query})
 
         puppet_modules = self.api.search(query, repo_id)
-        self.print_puppet_modules(puppet_modules)
+        self.print_puppet_modules(slice_items(puppet_modules, self.get_option('offset'), self.get_option('limit')))
         return os.EX_OK
 
 
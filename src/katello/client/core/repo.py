@@ -14,25 +14,40 @@
 # in this software or its documentation.
 #
 
+import httplib
+import multiprocessing
 import os
+import socket
+import sys
+import time
 import urlparse
+from fnmatch import fnmatch
+from M2Crypto import SSL
 
-from katello.client import constants
+from katello.client import constants, server
 from katello.client.api.repo import RepoAPI
 from katello.client.api.organization import OrganizationAPI
 from katello.client.api.content_upload import ContentUploadAPI
+from katello.client.api.package import PackageAPI
+from katello.client.api.puppet_module import PuppetModuleAPI
 from katello.client.api.utils import get_environment, get_product, get_repo
 from katello.client.cli.base import opt_parser_add_product, opt_parser_add_org, opt_parser_add_environment
 from katello.client.core.base import BaseAction, Command
+from katello.client.server import ServerRequestError
 
 from katello.client.lib.control import system_exit
-from katello.client.lib.async import AsyncTask, evaluate_task_status
+from katello.client.lib.async import AsyncTask, evaluate_task_status, progress
+from katello.client.lib.upload_journal import UploadJournal
+from katello.client.lib.utils.checksum import MultiHash
+from katello.client.lib.utils.concurrency import parallel_map
 from katello.client.lib.utils.encoding import u_str
 from katello.client.lib.ui import printer
 from katello.client.lib.ui.printer import batch_add_columns
-from katello.client.lib.ui.progress import ProgressBar, run_async_task_with_status, run_spinner_in_bg
-from katello.client.lib.ui.progress import wait_for_async_task
-from katello.client.lib.ui.formatters import format_sync_errors, format_sync_time, format_sync_state
+from katello.client.lib.ui.progress import ProgressBar, TransferProgress, run_async_task_with_status, \
+    run_spinner_in_bg
+from katello.client.lib.ui.progress import wait_for_async_task, PollingDelay
+from katello.client.lib.ui.formatters import format_sync_errors, format_sync_time, format_sync_state, \
+    format_duration, format_size
 from katello.client.lib.rpm_utils import generate_rpm_data, InvalidRPMError
 from katello.client.lib.puppet_utils import generate_puppet_data, ExtractionException
 
@@ -382,6 +397,157 @@ class Sync(SingleRepoAction):
         )
 
 
+class BulkSync(RepoAction):
+
+    description = _('synchronize more repositories at once')
+
+    def setup_parser(self, parser):
+        opt_parser_add_org(parser, required=1)
+        opt_parser_add_product(parser)
+        parser.add_option('--name', dest='name',
+            help=_("pattern of names of the repositories to synchronize, shell wildcards are allowed"))
+        parser.add_option('--file', dest='file',
+            help=_("file with ids of the repositories to synchronize, one per line"))
+        parser.add_option('--concurrency', dest='concurrency', type="int", default=4,
+            help=_("maximal number of repositories synchronized at once (default: 4)"))
+
+    def check_options(self, validator):
+        validator.require('org')
+        validator.mutually_exclude('product', 'product_label', 'product_id')
+        validator.mutually_exclude('file', ('name', 'product', 'product_label', 'product_id'))
+        if validator.exists('concurrency') and self.get_option('concurrency') < 1:
+            validator.add_option_error(_('Concurrency must be a positive number'))
+
+    def run(self):
+        repos = self.select_repos()
+        if not repos:
+            print _("No repositories to synchronize found")
+            return os.EX_DATAERR
+
+        results = self.sync_repos(repos, self.get_option('concurrency'), ProgressBar())
+
+        batch_add_columns(self.printer, {'id': _("ID")}, {'name': _("Name")}, {'result': _("Result")})
+        self.printer.add_column('duration', _("Duration"), formatter=format_duration)
+        self.printer.add_column('errors', _("Errors"), multiline=True, show_with=printer.VerboseStrategy)
+        self.printer.set_header(_("Repository Synchronization Summary"))
+        self.printer.print_items(results)
+
+        if [r for r in results if r['result'] != _("synchronized")]:
+            return os.EX_DATAERR
+        return os.EX_OK
+
+    def select_repos(self):
+        orgName = self.get_option('org')
+        prodName = self.get_option('product')
+        prodLabel = self.get_option('product_label')
+        prodId = self.get_option('product_id')
+        namePattern = self.get_option('name')
+
+        if self.has_option('file'):
+            return parallel_map(self.api.repo, self.read_repo_ids(self.get_option('file')), AsyncTask.POLL_WORKERS)
+
+        if prodName or prodLabel or prodId:
+            prod = get_product(orgName, prodName, prodLabel, prodId)
+            repos = self.api.repos_by_product(orgName, prod["id"])
+        else:
+            env = get_environment(orgName, None)
+            repos = self.api.repos_by_org_env(orgName, env["id"])
+
+        if namePattern:
+            repos = [r for r in repos if fnmatch(r['name'], namePattern)]
+        return repos
+
+    @classmethod
+    def read_repo_ids(cls, filename):
+        try:
+            f = open(filename)
+            try:
+                lines = [line.strip() for line in f]
+            finally:
+                f.close()
+        except IOError, e:
+            system_exit(os.EX_IOERR, _("Could not read file [ %(file)s ]: %(error)s") %
+                {'file': filename, 'error': e.strerror})
+        return [line for line in lines if line and not line.startswith('#')]
+
+    def sync_repos(self, repos, concurrency, progress_bar):
+        """
+        Synchronize the repositories, at most concurrency of them at once.
+        Progress of all the repositories is shown by one progress bar.
+        @rtype: list of dicts
+        @return: summary of the synchronization of each repository
+        """
+        pending = list(repos)
+        running = []
+        results = []
+        delays = PollingDelay()
+
+        while pending or running:
+            while pending and len(running) < concurrency:
+                repo = pending.pop(0)
+                result = self.start_sync(repo)
+                if result.get('task') is None:
+                    results.append(result)
+                else:
+                    running.append(result)
+
+            time.sleep(delays.next())
+            parallel_map(self.poll_sync, running, AsyncTask.POLL_WORKERS)
+
+            for result in [r for r in running if 'poll_error' in r or r['task'].finished()]:
+                running.remove(result)
+                results.append(self.finish_sync(result))
+            progress_bar.update_progress(progress(len(pending) + len(running), len(repos)))
+
+        progress_bar.done()
+        order = dict((repo['id'], index) for index, repo in enumerate(repos))
+        results.sort(key=lambda r: order[r['id']])
+        return results
+
+    def start_sync(self, repo):
+        result = {
+            'id': repo['id'],
+            'name': repo['name'],
+            'started': time.time(),
+            'duration': 0
+        }
+        try:
+            result['task'] = AsyncTask(self.api.sync(repo['id']))
+        except ServerRequestError, e:
+            result['result'] = _("failed to start")
+            result['errors'] = u_str(e.args[1])
+        return result
+
+    @classmethod
+    def poll_sync(cls, result):
+        """
+        Refresh status of the synchronization. An error is recorded in the
+        result, so that the other synchronizations are still followed.
+        """
+        try:
+            result['task'].update()
+        except ServerRequestError, e:
+            result['poll_error'] = u_str(e.args[1])
+        except (socket.error, httplib.HTTPException), e:
+            result['poll_error'] = u_str(e)
+
+    @classmethod
+    def finish_sync(cls, result):
+        task = result.pop('task')
+        result['duration'] = time.time() - result['started']
+        if 'poll_error' in result:
+            result['result'] = _("failed")
+            result['errors'] = _("Could not get status of the synchronization: %s") % result.pop('poll_error')
+        elif task.failed():
+            result['result'] = _("failed")
+            result['errors'] = format_sync_errors(task)
+        elif task.canceled():
+            result['result'] = _("canceled")
+        else:
+            result['result'] = _("synchronized")
+        return result
+
+
 class CancelSync(SingleRepoAction):
 
     description = _('cancel currently running synchronization of a repository')
@@ -490,18 +656,23 @@ class Delete(SingleRepoAction):
 
 class ContentUpload(SingleRepoAction):
 
+    # see SSLRenegBufferSize in apache
+    DEFAULT_CHUNK = 1048575
+    DEFAULT_CONCURRENCY = 4
+
     def __init__(self):
         super(ContentUpload, self).__init__()
         self.upload_api = ContentUploadAPI()
+        self.journal = UploadJournal()
 
     description = _('upload content into a repository')
 
     @classmethod
-    def get_content_data(cls, content_type, filepath):
+    def get_content_data(cls, content_type, filepath, checksum=True):
         unit_key = metadata = None
         if content_type == "yum":
             try:
-                unit_key, metadata = generate_rpm_data(filepath)
+                unit_key, metadata = generate_rpm_data(filepath, checksum)
             except InvalidRPMError:
                 print _("Invalid rpm '%s'. Please check the file and try again.") % filepath
         elif content_type == "puppet":
@@ -521,8 +692,10 @@ class ContentUpload(SingleRepoAction):
                           help=_("path of file or directory of files to upload (required)"))
         parser.add_option('--content_type', dest='content_type',
                           help=_("type of content to upload (puppet or yum, required)"))
-        parser.add_option('--chunk', dest='chunk',
-                          help=_("number of bytes to send to server at a time (default is 1048575)"))
+        parser.add_option('--chunk', dest='chunk', type="int",
+                          help=_("number of bytes to send to server at a time (default is %d)") % self.DEFAULT_CHUNK)
+        parser.add_option('--concurrency', dest='concurrency', type="int",
+                          help=_("number of chunks sent to server at once (default is %d)") % self.DEFAULT_CONCURRENCY)
 
         opt_parser_add_org(parser, required=1)
         opt_parser_add_environment(parser, default="Library")
@@ -534,6 +707,10 @@ class ContentUpload(SingleRepoAction):
             validator.require(('repo', 'org'))
             validator.require_at_least_one_of(('product', 'product_label', 'product_id'))
             validator.mutually_exclude('product', 'product_label', 'product_id')
+        if validator.exists('chunk') and self.get_option('chunk') < 1:
+            validator.add_option_error(_('Chunk size must be a positive number'))
+        if validator.exists('concurrency') and self.get_option('concurrency') < 1:
+            validator.add_option_error(_('Concurrency must be a positive number'))
 
     def run(self):
         repo_id = self.get_option('repo_id')
@@ -546,60 +723,374 @@ class ContentUpload(SingleRepoAction):
         filepath = self.get_option("filepath")
         content_type = self.get_option("content_type")
         chunk = self.get_option("chunk")
+        concurrency = self.get_option("concurrency")
 
         if not repo_id:
             repo = get_repo(org_name, repo_name, prod_name, prod_label, prod_id, env_name, False)
             repo_id = repo["id"]
 
-        paths = []
         if os.path.isdir(filepath):
-            for dirname, __, filenames in os.walk(filepath):
-                paths = [os.path.join(dirname, filename) for filename in filenames]
+            return self.upload_directory(filepath, repo_id, content_type, chunk, concurrency)
         elif os.path.isfile(filepath):
-            paths = [filepath]
+            try:
+                self.send_file(filepath, repo_id, content_type, chunk, concurrency)
+            except FileUploadError:
+                pass
         else:
             print _("Invalid path '%s'.") % filepath
             return os.EX_DATAERR
 
-        for path in paths:
-            try:
-                self.send_file(path, repo_id, content_type, chunk)
-            except FileUploadError:
-                if len(paths) > 1:
-                    print _("Skipping file '%s'.") % path
+        return os.EX_OK
 
+    def upload_directory(self, dirpath, repo_id, content_type, chunk, concurrency):
+        """
+        Upload all files from a directory and its subdirectories. Unit keys
+        of the files are computed in a pool of processes, files whose units
+        are already in the repository are skipped and the rest is uploaded
+        concurrently.
+        """
+        paths = self.collect_files(dirpath)
+        if not paths:
+            print _("No files found in '%s'.") % dirpath
+            return os.EX_OK
+
+        units = self.read_units(content_type, paths)
+        invalid = [path for path, unit_key, __ in units if unit_key is None]
+
+        known = self.existing_units(repo_id, content_type)
+        pending = []
+        for path, unit_key, metadata in units:
+            if unit_key is None:
+                continue
+            identity = self.unit_identity(content_type, unit_key)
+            if identity in known:
+                continue
+            known.add(identity)
+            pending.append((path, unit_key, metadata))
+        skipped = len(units) - len(invalid) - len(pending)
+
+        failed = self.upload_units(repo_id, pending, chunk, concurrency)
+        for path, error in failed:
+            print _("Failed to upload '%(file)s': %(error)s") % {'file': path, 'error': error}
+
+        print _("Uploaded %(uploaded)d files, %(skipped)d already in the repository, %(failed)d failed") % \
+            {'uploaded': len(pending) - len(failed), 'skipped': skipped, 'failed': len(invalid) + len(failed)}
+        if failed:
+            return os.EX_DATAERR
         return os.EX_OK
 
-    def send_file(self, filepath, repo_id, content_type, chunk):
+    @classmethod
+    def collect_files(cls, dirpath):
+        """
+        @rtype: list
+        @return: sorted paths of all files in the directory and its subdirectories
+        """
+        paths = []
+        for dirname, __, filenames in os.walk(dirpath):
+            paths.extend([os.path.join(dirname, filename) for filename in filenames])
+        return sorted(paths)
+
+    @classmethod
+    def read_units(cls, content_type, paths, processes=None):
+        """
+        Compute unit keys and metadata of the files. Reading rpm headers
+        and checksumming is cpu bound, so the files are processed in a pool
+        of processes.
+        @type processes: int
+        @param processes: size of the pool, number of cpus by default
+        @rtype: list
+        @return: list of tuples (path, unit_key, metadata), unit_key is None
+                 for files that are not valid content
+        """
+        items = [(content_type, path) for path in paths]
+        if processes is None:
+            processes = multiprocessing.cpu_count()
+        processes = min(processes, len(items))
+        if processes <= 1:
+            return [_read_unit(item) for item in items]
+
+        pool = multiprocessing.Pool(processes)
+        try:
+            # get with a timeout keeps the main process responsive to Ctrl+C
+            chunksize = max(1, len(items) / (processes * 4))
+            units = pool.map_async(_read_unit, items, chunksize).get(sys.maxint)
+            pool.close()
+            return units
+        except:
+            pool.terminate()
+            raise
+        finally:
+            pool.join()
+
+    @classmethod
+    def existing_units(cls, repo_id, content_type):
+        """
+        @rtype: set
+        @return: identities of units already present in the repository
+        """
+        if content_type == "yum":
+            packages = PackageAPI().packages_by_repo(repo_id)
+            return set([pkg['checksum'] for pkg in packages if pkg.get('checksum')])
+        elif content_type == "puppet":
+            modules = PuppetModuleAPI().puppet_modules_by_repo(repo_id)
+            return set([cls.unit_identity(content_type, module) for module in modules])
+        return set()
+
+    @classmethod
+    def unit_identity(cls, content_type, unit):
+        """
+        Value identifying a unit, used to detect content already present
+        in the repository. Packages are identified by their checksum,
+        puppet modules by author, name and version.
+        """
+        if content_type == "yum":
+            return unit['checksum']
+        return (unit['author'], unit['name'], unit['version'])
+
+    def upload_units(self, repo_id, units, chunk, concurrency):
+        """
+        Upload the files concurrently with a combined progress bar.
+        When there are more files, the concurrency is spent on sending
+        whole files at once, otherwise on chunks of the single file.
+        @type units: list
+        @param units: list of tuples (path, unit_key, metadata)
+        @rtype: list
+        @return: list of tuples (path, error) of files that failed to upload
+        """
+        if not units:
+            return []
+        concurrency = concurrency or self.DEFAULT_CONCURRENCY
+        server.connection_pool.ensure_capacity(concurrency)
+        if len(units) > 1:
+            file_workers, chunk_workers = concurrency, 1
+        else:
+            file_workers, chunk_workers = 1, concurrency
+
+        transfer = TransferProgress(sum([os.path.getsize(path) for path, __, __ in units]))
+
+        def upload_unit(unit):
+            path, unit_key, metadata = unit
+            try:
+                upload, __, __ = self.transfer_file(repo_id, path, chunk, chunk_workers, transfer.update)
+                self.upload_api.import_into_repo(repo_id, upload.upload_id, unit_key, metadata)
+                self.upload_api.delete(repo_id, upload.upload_id)
+                upload.remove()
+            except ServerRequestError, e:
+                return (path, u_str(e.args[1]))
+            except (IOError, httplib.HTTPException, SSL.SSLError), e:
+                # socket errors are IOErrors too, the other files are still uploaded
+                return (path, u_str(e))
+            return None
+
+        transfer.update(0)
+        try:
+            results = parallel_map(upload_unit, units, file_workers)
+        finally:
+            transfer.done()
+        return [result for result in results if result is not None]
+
+    def send_file(self, filepath, repo_id, content_type, chunk, concurrency=None):
         filename = os.path.basename(filepath)
-        unit_key, metadata = ContentUpload.get_content_data(content_type, filepath)
+        # checksum of a package is computed while it's sent, the file is read only once
+        unit_key, metadata = ContentUpload.get_content_data(content_type, filepath, checksum=False)
 
         if unit_key is None and metadata is None:
             raise FileUploadError
 
-        upload_id = self.upload_api.create(repo_id)["upload_id"]
-        self.send_content(repo_id, upload_id, filepath, chunk)
+        checksum_type = None
+        if content_type == "yum":
+            checksum_type = unit_key['checksumtype']
+
+        started = time.time()
+        upload, size, checksum = self.transfer_file(repo_id, filepath, chunk, concurrency, checksum_type=checksum_type)
+        if checksum_type:
+            unit_key['checksum'] = checksum
+        elapsed = max(time.time() - started, 0.001)
+        print _("Sent %(size)s in %(duration)s (%(rate)s/s)") % {'size': format_size(size),
+            'duration': format_duration(elapsed), 'rate': format_size(size / elapsed)}
         run_spinner_in_bg(self.upload_api.import_into_repo,
-                          [repo_id, upload_id, unit_key, metadata],
+                          [repo_id, upload.upload_id, unit_key, metadata],
                           message=_("Uploading '%s' to server, please... ") % filename)
-        self.upload_api.delete(repo_id, upload_id)
+        self.upload_api.delete(repo_id, upload.upload_id)
+        upload.remove()
 
         print _("Successfully uploaded '%s' into repository") % filename
 
-    def send_content(self, repo_id, upload_id, filepath, chunk=None):
-        if not chunk:
-            chunk = 1048575  # see SSLRenegBufferSize in apache
+    def transfer_file(self, repo_id, filepath, chunk=None, concurrency=None, callback=None, checksum_type=None):
+        """
+        Send the file to the server. An unfinished upload of the file
+        recorded in the journal is resumed, otherwise a new upload request
+        is created.
+        @type checksum_type: string
+        @param checksum_type: algorithm of the checksum computed while the file is sent
+        @rtype: (UploadJournalEntry, int, string)
+        @return: tuple of the journal of the upload, number of bytes of the file
+                 and its checksum
+        """
+        upload = self.start_upload(repo_id, filepath, chunk or self.DEFAULT_CHUNK)
+        resumed = bool(upload.acknowledged)
+        if resumed:
+            print _("Resuming upload of '%(file)s', %(size)s already sent") % \
+                {'file': filepath, 'size': format_size(upload.acknowledged_size())}
+
+        while True:
+            hashes = checksum_type and MultiHash([checksum_type])
+            attempt = TransferProgress(None)
+            try:
+                size = self.send_content(repo_id, upload.upload_id, filepath, upload.chunk, concurrency,
+                    callback and self.counting_callback(callback, attempt), hashes, upload)
+                break
+            except ServerRequestError, e:
+                if not resumed or e.args[0] != httplib.NOT_FOUND:
+                    raise
+                # the server dropped the unfinished upload meanwhile, the whole file is sent again
+                if callback:
+                    callback(-attempt.transferred)
+                self.discard_upload(upload)
+                upload = self.start_upload(repo_id, filepath, chunk or self.DEFAULT_CHUNK)
+                resumed = False
+        return upload, size, hashes and hashes.hexdigest(checksum_type)
 
-        with open(filepath, "rb") as f:
-            offset = 0
-            while True:
-                piece = f.read(chunk)
+    @classmethod
+    def counting_callback(cls, callback, counter):
+        """
+        Wrap the callback to record the reported sizes in the counter too
+        @type counter: TransferProgress
+        """
+        def report(size):
+            counter.update(size)
+            callback(size)
+        return report
+
+    def start_upload(self, repo_id, filepath, chunk):
+        """
+        Return journal of an unfinished upload of the file or create a new
+        upload request. Unfinished uploads of files that changed since are
+        discarded.
+        @rtype: UploadJournalEntry
+        """
+        server_url = self.server_url()
+        upload = self.journal.find(server_url, repo_id, filepath)
+        if upload is not None:
+            if upload.file_unchanged():
+                return upload
+            self.discard_upload(upload)
+        upload_id = self.upload_api.create(repo_id)["upload_id"]
+        return self.journal.start(server_url, repo_id, filepath, upload_id, chunk)
 
-                if piece == "":
-                    break  # end of file
+    def discard_upload(self, upload):
+        try:
+            self.upload_api.delete(upload.repo_id, upload.upload_id)
+        except ServerRequestError, e:
+            if e.args[0] != httplib.NOT_FOUND:
+                raise
+        upload.remove()
 
-                self.upload_api.upload_bits(repo_id, upload_id, offset, piece)
-                offset += chunk
+    @classmethod
+    def server_url(cls):
+        """
+        Identification of the server uploads in the journal belong to
+        """
+        active = server.get_active_server()
+        if active is None:
+            return None
+        return "%s://%s:%s%s" % (active.protocol, active.host, active.port, active.path_prefix)
+
+    def send_content(self, repo_id, upload_id, filepath, chunk=None, concurrency=None, callback=None, hashes=None,
+                     journal=None):
+        """
+        Send the file to the server in chunks. The file is read once from
+        the start to the end, the chunks are sent with explicit offsets,
+        so that more of them can be sent at once, each over its own
+        persistent connection.
+        @type callback: function
+        @param callback: called with the size of every sent chunk
+        @type hashes: MultiHash
+        @param hashes: checksums updated with the content as it's read
+        @type journal: UploadJournalEntry
+        @param journal: journal recording the sent chunks, chunks it
+                        already contains are not sent again
+        @rtype: int
+        @return: number of bytes of the file
+        """
+        chunk = chunk or self.DEFAULT_CHUNK
+        concurrency = concurrency or self.DEFAULT_CONCURRENCY
+        server.connection_pool.ensure_capacity(concurrency)
+        skipped = [0]
+
+        def read_chunks():
+            # read lazily by the sending threads, at most concurrency chunks are held in memory
+            f = open(filepath, "rb")
+            try:
+                offset = 0
+                while True:
+                    piece = f.read(chunk)
+                    if not piece:
+                        return
+                    if hashes:
+                        hashes.update(piece)
+                    if journal and journal.is_acknowledged(offset):
+                        skipped[0] += len(piece)
+                        if callback:
+                            callback(len(piece))
+                    else:
+                        yield offset, piece
+                    offset += len(piece)
+            finally:
+                f.close()
+
+        def send_chunk(item):
+            offset, piece = item
+            self.upload_api.upload_bits(repo_id, upload_id, offset, piece)
+            if journal:
+                journal.acknowledge(offset, piece)
+            if callback:
+                callback(len(piece))
+            return len(piece)
+
+        return sum(parallel_map(send_chunk, read_chunks(), concurrency)) + skipped[0]
+
+
+class ContentUploadCleanup(BaseAction):
+
+    description = _('remove unfinished content uploads')
+
+    def __init__(self):
+        super(ContentUploadCleanup, self).__init__()
+        self.upload_api = ContentUploadAPI()
+        self.journal = UploadJournal()
+
+    def setup_parser(self, parser):
+        parser.add_option('--older_than', dest='older_than', type="int",
+                          help=_("remove only uploads that made no progress for the number of hours"))
+
+    def check_options(self, validator):
+        if validator.exists('older_than') and self.get_option('older_than') < 0:
+            validator.add_option_error(_('Number of hours must not be negative'))
+
+    def run(self):
+        older_than = self.get_option('older_than')
+        server_url = ContentUpload.server_url()
+
+        uploads = [upload for upload in self.journal.entries() if upload.server_url == server_url]
+        if older_than is not None:
+            uploads = [upload for upload in uploads if upload.age() >= older_than * 3600]
+        if not uploads:
+            print _("No unfinished uploads found")
+            return os.EX_OK
+
+        for upload in uploads:
+            try:
+                self.upload_api.delete(upload.repo_id, upload.upload_id)
+            except ServerRequestError, e:
+                if e.args[0] != httplib.NOT_FOUND:
+                    print _("Could not remove upload of '%(file)s': %(error)s") % \
+                        {'file': upload.filepath, 'error': u_str(e.args[1])}
+                    continue
+            upload.remove()
+            print _("Removed unfinished upload of '%(file)s' into repository [ %(repo)s ]") % \
+                {'file': upload.filepath, 'repo': upload.repo_id}
+        return os.EX_OK
 
 
 # command --------------------------------------------------------------------
@@ -611,3 +1102,17 @@ class Repo(Command):
 
 class FileUploadError(Exception):
     pass
+
+
+def _read_unit(item):
+    """
+    Compute unit key and metadata of a file. Defined at module level,
+    so that it can be run in a pool of processes.
+    @type item: tuple
+    @param item: tuple (content_type, path)
+    @rtype: tuple
+    @return: tuple (path, unit_key, metadata)
+    """
+    content_type, path = item
+    unit_key, metadata = ContentUpload.get_content_data(content_type, path)
+    return (path, unit_key, metadata)
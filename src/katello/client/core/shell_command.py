@@ -15,27 +15,86 @@
 #
 
 import os
+import sys
 
-from katello.client.shell import KatelloShell
-from katello.client.core.base import BaseAction
+from katello.client.shell import KatelloShell, BatchShell
+from katello.client.core.base import Action, BaseAction
+from katello.client.lib.control import system_exit, get_katello_mode
+from katello.client import server
 
 
 # shell action ------------------------------------------------------------
 
 class ShellAction(BaseAction):
 
-    description = _('run the cli as a shell')
+    description = _('run the cli as a shell or execute a script of cli commands')
 
     def __init__(self, cli):
         super(ShellAction, self).__init__()
         self.admin = cli
 
     def setup_parser(self, parser):
-        pass
+        parser.add_option('--file', dest='file',
+            help=_("script with one command per line to execute, '-' reads the commands from stdin"))
+        parser.add_option('--continue-on-error', dest='continue_on_error', action='store_true',
+            default=False, help=_("don't stop the script when a command fails"))
+        parser.add_option('--workers', dest='workers', type="int", default=1,
+            help=_("number of independent commands of the script run at once (default: 1)"))
+        parser.add_option('--unordered', dest='unordered', action='store_true', default=False,
+            help=_("print output of the commands run at once as they finish, not in the order of the script"))
+
+    def check_options(self, validator):
+        if validator.exists('workers') and self.get_option('workers') < 1:
+            validator.add_option_error(_('Number of workers must be a positive number'))
 
     def run(self):
         self.admin.remove_command("shell")
+        # the same commands run over and over in the shell
+        Action.cache_parsers = True
+
+        # batch mode only when asked for, stdin may be redirected in an interactive session too
+        script_path = self.get_option('file')
+        if script_path is not None:
+            return self.run_script(script_path)
+
         shell = KatelloShell(self.admin)
         shell.cmdloop()
 
         return os.EX_OK
+
+    def run_script(self, script_path):
+        if script_path == '-':
+            script = sys.stdin
+        else:
+            try:
+                script = open(script_path)
+            except IOError, e:
+                system_exit(os.EX_IOERR, _("Could not read file [ %(file)s ]: %(error)s") %
+                    {'file': script_path, 'error': e.strerror})
+
+        workers = self.get_option('workers')
+        # keep an idle connection for every worker
+        server.connection_pool.ensure_capacity(workers)
+
+        try:
+            batch = BatchShell(self.admin, self.get_option('continue_on_error'), self.get_option('verbose'),
+                workers=workers, ordered=not self.get_option('unordered'), cli_factory=self.create_worker_cli)
+            return batch.run(script)
+        finally:
+            if script is not sys.stdin:
+                script.close()
+
+    def create_worker_cli(self):
+        """
+        Create a separate cli for a worker running commands of a script.
+        The worker's cli has its own actions and its own active server.
+        """
+        # imported here, the main module imports this one
+        from katello.client.main import setup_admin
+
+        cli = self.admin.__class__()
+        setup_admin(cli, get_katello_mode())
+        cli.remove_command("shell")
+        cli.share_credentials(self.admin)
+        cli.thread_local_server = True
+        return cli
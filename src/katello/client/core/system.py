@@ -14,27 +14,36 @@
 # in this software or its documentation.
 #
 
+import csv
 import os
+import sys
+import threading
+import time
 
 from katello.client import constants
+from katello.client.api.activation_key import ActivationKeyAPI
 from katello.client.api.system import SystemAPI
 from katello.client.api.task_status import SystemTaskStatusAPI
 from katello.client.api.system_group import SystemGroupAPI
 from katello.client.api.custom_info import CustomInfoAPI
-from katello.client.api.utils import get_environment, get_system, get_content_view
+from katello.client.api.utils import get_environment, get_system, get_content_view, ApiDataError
 from katello.client.cli.base import opt_parser_add_org, opt_parser_add_environment, \
-    opt_parser_add_content_view
+    opt_parser_add_content_view, opt_parser_add_paging, check_paging_options
 from katello.client.core.base import BaseAction, Command
 from katello.client.server import ServerRequestError
 
-from katello.client.lib.control import get_katello_mode
-from katello.client.lib.utils.io import convert_to_mime_type, attachment_file_name, save_report
+from katello.client.lib.control import get_katello_mode, system_exit
+from katello.client.lib.utils.concurrency import parallel_map
+from katello.client.lib.utils.paging import paged_items
+from katello.client.lib.utils.io import convert_to_mime_type, attachment_file_name, save_report, read_records, \
+    print_stream
 from katello.client.lib.utils.data import test_record, update_dict_unless_none
 from katello.client.lib.utils.encoding import u_str
-from katello.client.lib.async import SystemAsyncTask, evaluate_remote_action
+from katello.client.lib.async import SystemAsyncTask, evaluate_remote_action, progress
 from katello.client.lib.ui import printer
 from katello.client.lib.ui.printer import VerboseStrategy, batch_add_columns
-from katello.client.lib.ui.progress import run_spinner_in_bg, wait_for_async_task
+from katello.client.lib.ui.progress import run_spinner_in_bg, wait_for_async_task, ProgressBar, PollingDelay, \
+    TransferProgress
 from katello.client.lib.ui.formatters import format_date, stringify_custom_info
 
 
@@ -59,17 +68,22 @@ class List(SystemAction):
         super(List, self).setup_parser(parser)
         parser.add_option('--pool', dest='pool_id',
                        help=_("pool ID to filter systems by subscriptions"))
+        opt_parser_add_paging(parser)
 
     def check_options(self, validator):
         validator.require('org')
+        check_paging_options(validator)
 
     def get_systems(self, org_name, env_name, pool_id):
         query = {'pool_id': pool_id} if pool_id else {}
         if env_name is None:
-            return self.api.systems_by_org(org_name, query)
+            fetch_page = lambda page, per_page: self.api.systems_by_org(org_name, query, stream=True,
+                page=page, per_page=per_page)
         else:
             environment = get_environment(org_name, env_name)
-            return self.api.systems_by_env(environment["id"], query)
+            fetch_page = lambda page, per_page: self.api.systems_by_env(environment["id"], query, stream=True,
+                page=page, per_page=per_page)
+        return paged_items(fetch_page, self.get_option('offset'), self.get_option('limit'))
 
     def run(self):
         org_name = self.get_option('org')
@@ -261,6 +275,186 @@ class InstalledPackages(SystemAction):
         return os.EX_OK
 
 
+class BulkPackages(SystemAction):
+    description = _('install, remove or update packages on more systems at once')
+
+    REMOTE_ACTIONS = ('install', 'remove', 'update', 'install_groups', 'remove_groups')
+
+    def setup_parser(self, parser):
+        super(BulkPackages, self).setup_parser(parser)
+        parser.add_option('--search', dest='search',
+            help=_("search query selecting the systems, e.g. --search='name:web*'"))
+        parser.add_option('--file', dest='file',
+            help=_("file with names or uuids of the systems, one per line"))
+        parser.add_option('--install', dest='install', type="list",
+            help=_("packages to be installed remotely on the systems, package names are separated with comma"))
+        parser.add_option('--remove', dest='remove', type="list",
+            help=_("packages to be removed remotely from the systems, package names are separated with comma"))
+        parser.add_option('--update', dest='update', type="list",
+            help=_("packages to be updated on the systems, use --all to update all packages," +
+                " package names are separated with comma"))
+        parser.add_option('--install_groups', dest='install_groups', type="list",
+            help=_("package groups to be installed remotely on the systems, group names are separated with comma"))
+        parser.add_option('--remove_groups', dest='remove_groups', type="list",
+            help=_("package groups to be removed remotely from the systems, group names are separated with comma"))
+        parser.add_option('--concurrency', dest='concurrency', type="int", default=8,
+            help=_("maximal number of requests sent to the server at once (default: 8)"))
+
+    def check_options(self, validator):
+        validator.require('org')
+        validator.require_at_least_one_of(('search', 'file', 'environment'))
+        validator.mutually_exclude('file', 'search')
+        validator.require_one_of(self.REMOTE_ACTIONS,
+            message=_('You have to specify exactly one install/remove/update action'))
+        if validator.exists('concurrency') and self.get_option('concurrency') < 1:
+            validator.add_option_error(_('Concurrency must be a positive number'))
+
+    def run(self):
+        systems = self.select_systems(self.get_option('org'), self.get_option('environment'))
+        if not systems:
+            print _("No systems found")
+            return os.EX_DATAERR
+
+        concurrency = self.get_option('concurrency')
+        action = self.remote_action()
+        results = parallel_map(lambda system: self.start_action(system, action), systems, concurrency)
+        print _("Performing remote action on %d systems... ") % len([r for r in results if r['task']])
+        self.wait_for_tasks(results, concurrency, ProgressBar())
+
+        batch_add_columns(self.printer, {'name': _("Name")}, {'uuid': _("UUID")}, {'result': _("Result")})
+        self.printer.add_column('errors', _("Errors"), multiline=True, show_with=printer.VerboseStrategy)
+        self.printer.set_header(_("Remote Action Summary"))
+        self.printer.print_items(results)
+
+        if [r for r in results if r['result'] != _("finished")]:
+            return os.EX_DATAERR
+        return os.EX_OK
+
+    def select_systems(self, org_name, env_name):
+        """
+        Find the systems listed in a file, matching the search query
+        or in the environment
+        @rtype: list of dicts
+        """
+        environment_id = get_environment(org_name, env_name)['id'] if env_name is not None else None
+        if not self.has_option('file'):
+            query = {'search': self.get_option('search')} if self.has_option('search') else {}
+            return self.find_systems(org_name, environment_id, query)
+
+        keys = self.read_system_keys(self.get_option('file'))
+        found = parallel_map(lambda key: self.find_systems_by_key(org_name, environment_id, key),
+            keys, self.get_option('concurrency'))
+
+        errors = []
+        missing = [key for key, systems in zip(keys, found) if not systems]
+        if missing:
+            errors.append(_("Could not find systems [ %(systems)s ] within organization [ %(org)s ]") %
+                {'systems': ", ".join(missing), 'org': org_name})
+        ambiguous = [key for key, systems in zip(keys, found) if len(systems) > 1]
+        if ambiguous:
+            errors.append(_("More systems are named [ %(systems)s ] within organization [ %(org)s ], " \
+                "list them by their uuids") % {'systems': ", ".join(ambiguous), 'org': org_name})
+        if errors:
+            raise ApiDataError("\n".join(errors))
+
+        selected = []
+        for systems in found:
+            if systems[0] not in selected:
+                selected.append(systems[0])
+        return selected
+
+    def find_systems(self, org_name, environment_id, query):
+        if environment_id is None:
+            return self.api.systems_by_org(org_name, query)
+        return self.api.systems_by_env(environment_id, query)
+
+    def find_systems_by_key(self, org_name, environment_id, key):
+        """
+        Find the systems with the name, or the system with the uuid
+        when there is no such name
+        @rtype: list of dicts
+        """
+        systems = self.find_systems(org_name, environment_id, {'name': key})
+        systems = [s for s in systems if s['name'] == key]
+        if not systems:
+            systems = self.find_systems(org_name, environment_id, {'search': 'uuid:%s' % key})
+            systems = [s for s in systems if s['uuid'] == key]
+        return systems
+
+    @classmethod
+    def read_system_keys(cls, filename):
+        try:
+            f = open(filename)
+            try:
+                lines = [u_str(line.strip()) for line in f]
+            finally:
+                f.close()
+        except IOError, e:
+            system_exit(os.EX_IOERR, _("Could not read file [ %(file)s ]: %(error)s") %
+                {'file': filename, 'error': e.strerror})
+        return [line for line in lines if line and not line.startswith('#')]
+
+    def remote_action(self):
+        """
+        @return: function starting the requested remote action on a system
+        """
+        update = self.get_option('update')
+        if update:
+            packages = [] if update in ('--all', ['--all']) else update
+            return lambda system_id: self.api.update_packages(system_id, packages)
+
+        apis = {
+            'install': self.api.install_packages,
+            'remove': self.api.remove_packages,
+            'install_groups': self.api.install_package_groups,
+            'remove_groups': self.api.remove_package_groups
+        }
+        for opt, api_call in apis.items():
+            if self.get_option(opt):
+                return lambda system_id, api_call=api_call, names=self.get_option(opt): api_call(system_id, names)
+
+    @classmethod
+    def start_action(cls, system, action):
+        result = {'name': system['name'], 'uuid': system['uuid'], 'task': None}
+        try:
+            result['task'] = action(system['uuid'])
+        except ServerRequestError, e:
+            result['result'] = _("failed to start")
+            result['errors'] = u_str(e.args[1])
+        return result
+
+    @classmethod
+    def wait_for_tasks(cls, results, concurrency, progress_bar):
+        """
+        Poll the remote actions of all the systems together until they
+        finish and fill their results in
+        """
+        started = [r for r in results if r['task']]
+        if started:
+            task = SystemAsyncTask([r['task'] for r in started])
+            task.POLL_WORKERS = concurrency
+            delays = PollingDelay()
+            while task.is_running():
+                time.sleep(delays.next())
+                task.update()
+                progress_bar.update_progress(task.get_progress())
+            progress_bar.done()
+
+            for result, status in zip(started, task.get_hashes()):
+                result['task'] = status
+                subtask = SystemAsyncTask(status)
+                if subtask.failed():
+                    result['result'] = _("failed")
+                    result['errors'] = "\n".join([m for m in subtask.status_messages() if m])
+                elif subtask.canceled():
+                    result['result'] = _("canceled")
+                else:
+                    result['result'] = _("finished")
+
+        for result in results:
+            del result['task']
+
+
 class TasksList(SystemAction):
     description = _('display status of remote tasks')
 
@@ -462,6 +656,265 @@ class Register(SystemAction):
             _("Could not register system [ %s ]") % name
         )
 
+class BulkRegister(SystemAction):
+    description = _('register systems listed in a CSV or JSON file')
+
+    # columns of CSV manifests with this prefix hold the system facts
+    FACT_PREFIX = 'fact.'
+    # columns of the output file
+    OUTPUT_COLUMNS = ('name', 'uuid', 'result', 'errors')
+
+    def setup_parser(self, parser):
+        super(BulkRegister, self).setup_parser(parser)
+        parser.add_option('--file', dest='file',
+            help=_("CSV or JSON file with the systems to register, records have keys name, environment, " \
+                   "activationkey, servicelevel, release, content_view and facts (required)"))
+        parser.add_option('--output', dest='output',
+            help=_("CSV file the names, uuids and results of the registrations are written to, " \
+                   "systems registered according to it are skipped when the registration is resumed (required)"))
+        parser.add_option('--servicelevel', dest='sla', help=_("default service level agreement"))
+        parser.add_option('--activationkey', dest='activationkey',
+            help=_("default activation keys, more keys are separated with comma e.g. --activationkey=key1,key2"))
+        parser.add_option('--release', dest='release', help=_("default value of $releasever for the systems"))
+        opt_parser_add_content_view(parser)
+        parser.add_option('--concurrency', dest='concurrency', type="int", default=4,
+            help=_("maximal number of systems registered at once (default: 4)"))
+
+    def check_options(self, validator):
+        validator.require(('org', 'file', 'output'))
+        validator.require_at_most_one_of(('activationkey', 'environment'))
+        if get_katello_mode() == 'katello':
+            validator.mutually_exclude(('view_name', 'view_label', 'view_id'))
+        if validator.exists('concurrency') and self.get_option('concurrency') < 1:
+            validator.add_option_error(_('Concurrency must be a positive number'))
+
+    def run(self):
+        org = self.get_option('org')
+        output = self.get_option('output')
+
+        systems = self.read_manifest(self.get_option('file'))
+        registered = self.read_registered(output)
+        pending = [s for s in systems if s['name'] not in registered]
+        if len(pending) < len(systems):
+            print _("Skipping %d systems already registered in [ %s ]") % (len(systems) - len(pending), output)
+
+        self.resolve(org, pending)
+        results = self.register_systems(org, pending, output, self.get_option('concurrency'), ProgressBar())
+
+        batch_add_columns(self.printer, {'name': _("Name")}, {'uuid': _("UUID")}, {'result': _("Result")})
+        self.printer.add_column('errors', _("Errors"), multiline=True, show_with=printer.VerboseStrategy)
+        self.printer.set_header(_("System Registration Summary"))
+        self.printer.print_items(results)
+
+        if [r for r in results if r['uuid'] is None]:
+            return os.EX_DATAERR
+        return os.EX_OK
+
+    def read_manifest(self, filename):
+        """
+        Read the systems to register and complete them with the defaults
+        given by the options
+        @rtype: list of dicts
+        """
+        try:
+            records = read_records(filename)
+        except IOError, e:
+            system_exit(os.EX_IOERR, _("Could not read file [ %(file)s ]: %(error)s") %
+                {'file': filename, 'error': e.strerror})
+        except (ValueError, csv.Error), e:
+            system_exit(os.EX_DATAERR, _("Could not parse file [ %(file)s ]: %(error)s") %
+                {'file': filename, 'error': u_str(e)})
+
+        systems = []
+        errors = []
+        for number, record in enumerate(records):
+            try:
+                system = self.__system_from_record(record)
+                error = self.__validate_system(system)
+            except ValueError, e:
+                system, error = None, u_str(e)
+            if error:
+                errors.append(_("record %(number)d: %(error)s") % {'number': number + 1, 'error': error})
+            if system is not None:
+                systems.append(system)
+
+        names = [s['name'] for s in systems]
+        duplicates = sorted(set([name for name in names if name and names.count(name) > 1]))
+        if duplicates:
+            errors.append(_("systems listed more than once: %s") % ", ".join(duplicates))
+        if errors:
+            system_exit(os.EX_DATAERR, errors)
+        return systems
+
+    def __system_from_record(self, record):
+        """
+        Normalize a record of the manifest, JSON manifests may contain
+        values of any type
+        @raise ValueError: when the record can't be used
+        """
+        if not isinstance(record, dict):
+            raise ValueError(_("record is not an object"))
+
+        facts = {}
+        if isinstance(record.get('facts'), dict):
+            facts.update(record['facts'])
+        elif record.get('facts'):
+            raise ValueError(_("facts must be an object"))
+        for key, value in record.items():
+            if key.startswith(self.FACT_PREFIX) and value:
+                facts[key[len(self.FACT_PREFIX):]] = value
+
+        return {
+            'name': self.__text_value(record, 'name'),
+            'environment': self.__text_value(record, 'environment') or self.get_option('environment'),
+            'activationkey': self.__text_value(record, 'activationkey') or self.get_option('activationkey'),
+            'sla': self.__text_value(record, 'servicelevel') or self.get_option('sla'),
+            'release': self.__text_value(record, 'release') or self.get_option('release'),
+            'content_view': self.__text_value(record, 'content_view'),
+            'facts': facts
+        }
+
+    @classmethod
+    def __text_value(cls, record, key):
+        value = record.get(key)
+        if key == 'activationkey' and isinstance(value, (list, tuple)):
+            # more keys can be listed in JSON manifests
+            value = ",".join([u_str(v) for v in value])
+        if isinstance(value, (list, tuple, dict)):
+            raise ValueError(_("%s must be a single value") % key)
+        if value is None or value == '':
+            return None
+        return u_str(value)
+
+    @classmethod
+    def __validate_system(cls, system):
+        if not system['name']:
+            return _("system name is missing")
+        if system['environment'] and system['activationkey']:
+            return _("only one of environment and activation key can be set")
+        if get_katello_mode() == 'katello' and not (system['environment'] or system['activationkey']):
+            return _("environment or activation key is required")
+        return None
+
+    @classmethod
+    def read_registered(cls, output):
+        """
+        Names of the systems registered by previous runs
+        @rtype: set
+        """
+        if not os.path.exists(output):
+            return set()
+        try:
+            return set([r['name'] for r in read_records(output) if r.get('uuid')])
+        except (IOError, csv.Error), e:
+            system_exit(os.EX_IOERR, _("Could not read file [ %(file)s ]: %(error)s") %
+                {'file': output, 'error': u_str(e)})
+
+    def resolve(self, org, systems):
+        """
+        Look up ids of the environments and content views the systems are
+        registered to and check the activation keys exist. Every name is
+        resolved only once, not for each of the systems.
+        """
+        environment_ids = {}
+        view_ids = {}
+        default_view_id = self.__default_view_id(org)
+
+        for name in set([s['environment'] for s in systems if s['environment']]):
+            environment_ids[name] = get_environment(org, name)['id']
+        for name in set([s['content_view'] for s in systems if s['content_view']]):
+            view_ids[name] = get_content_view(org, view_name=name)['id']
+
+        key_names = set()
+        for system in systems:
+            if system['activationkey']:
+                key_names.update([key.strip() for key in system['activationkey'].split(',')])
+        if key_names:
+            existing = set([key['name'] for key in ActivationKeyAPI().activation_keys_by_organization(org)])
+            missing = sorted(key_names - existing)
+            if missing:
+                raise ApiDataError(_("Could not find activation keys [ %(keys)s ] within organization [ %(org)s ]") %
+                    {'keys': ", ".join(missing), 'org': org})
+
+        for system in systems:
+            system['environment_id'] = environment_ids.get(system['environment'])
+            system['view_id'] = view_ids.get(system['content_view'], default_view_id)
+
+    def __default_view_id(self, org):
+        view_name = self.get_option('view_name')
+        view_label = self.get_option('view_label')
+        if view_name or view_label:
+            return get_content_view(org, view_label, view_name)['id']
+        return self.get_option('view_id')
+
+    def register_systems(self, org, systems, output, concurrency, progress_bar):
+        """
+        Register the systems, at most concurrency of them at once. Every
+        registered system is immediately written to the output file, so that
+        an interrupted registration can be resumed.
+        @rtype: list of dicts
+        @return: summary of the registration of each system
+        """
+        lock = threading.Lock()
+        finished = []
+        output_file, writer = self.__open_output(output)
+
+        def register(system):
+            result = self.register_system(org, system)
+            with lock:
+                writer.writerow(dict((key, u_str(result.get(key) or '').encode('utf-8')) for key in self.OUTPUT_COLUMNS))
+                output_file.flush()
+                finished.append(result)
+                progress_bar.update_progress(progress(len(systems) - len(finished), len(systems)))
+            return result
+
+        try:
+            return parallel_map(register, systems, concurrency)
+        finally:
+            output_file.close()
+            progress_bar.done()
+
+    def register_system(self, org, system):
+        result = {'name': system['name'], 'uuid': None}
+        try:
+            registered = self.api.register(system['name'], org, system['environment_id'], system['activationkey'],
+                'system', system['release'], system['sla'], system['facts'], system['view_id'])
+            result['uuid'] = registered['uuid']
+            result['result'] = _("registered")
+        except ServerRequestError, e:
+            result['result'] = _("failed")
+            result['errors'] = u_str(e.args[1])
+        except Exception, e: # pylint: disable=W0703
+            # a failure of one system must not stop registration of the others
+            result['result'] = _("failed")
+            result['errors'] = u_str(e) or e.__class__.__name__
+        return result
+
+    @classmethod
+    def __open_output(cls, output):
+        """
+        Open the output file for appending, a new file gets a header line.
+        Files written by earlier versions keep their columns.
+        @rtype: (file, csv dict writer)
+        """
+        try:
+            columns = None
+            if os.path.exists(output) and os.path.getsize(output) > 0:
+                f = open(output, 'rb')
+                try:
+                    columns = csv.reader(f).next()
+                finally:
+                    f.close()
+            f = open(output, 'ab')
+        except (IOError, OSError, csv.Error, StopIteration), e:
+            system_exit(os.EX_IOERR, _("Could not write file [ %(file)s ]: %(error)s") %
+                {'file': output, 'error': getattr(e, 'strerror', None) or u_str(e)})
+        writer = csv.DictWriter(f, columns or cls.OUTPUT_COLUMNS, extrasaction='ignore')
+        if columns is None:
+            writer.writerow(dict((column, column) for column in cls.OUTPUT_COLUMNS))
+        return (f, writer)
+
+
 class RemoveDeletion(SystemAction):
     description = _("remove a deletion record for hypervisor")
 
@@ -796,15 +1249,22 @@ class Report(SystemAction):
         format_in = self.get_option('format')
 
         if envName is None:
-            report = self.api.report_by_org(orgId, convert_to_mime_type(format_in, 'text'))
+            report, headers = self.api.report_by_org(orgId, convert_to_mime_type(format_in, 'text'), stream=True)
         else:
             environment = get_environment(orgId, envName)
-            report = self.api.report_by_env(environment['id'], convert_to_mime_type(format_in, 'text'))
+            report, headers = self.api.report_by_env(environment['id'], convert_to_mime_type(format_in, 'text'),
+                stream=True)
 
-        if format_in == 'pdf':
-            save_report(report[0], attachment_file_name(report[1], "%s_systems_report.pdf" % get_katello_mode()))
-        else:
-            print report[0]
+        try:
+            if format_in == 'pdf':
+                transfer = TransferProgress(report.length)
+                save_report(report, attachment_file_name(headers, "%s_systems_report.pdf" % get_katello_mode()),
+                    transfer.update)
+                transfer.done()
+            else:
+                print_stream(report, sys.stdout, encoding='utf-8')
+        finally:
+            report.close()
 
         return os.EX_OK
 
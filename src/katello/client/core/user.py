@@ -15,15 +15,19 @@
 #
 
 import os
+import sys
 
 from katello.client.api.user import UserAPI
 from katello.client.api.user_role import UserRoleAPI
 from katello.client.api.about import AboutAPI
 from katello.client.api.utils import get_user, get_environment
+from katello.client.cli.base import opt_parser_add_paging, check_paging_options
 from katello.client.core.base import BaseAction, Command
-from katello.client.lib.utils.io import convert_to_mime_type, attachment_file_name, save_report
+from katello.client.lib.utils.io import convert_to_mime_type, attachment_file_name, save_report, print_stream
 from katello.client.lib.utils.data import test_record
+from katello.client.lib.utils.paging import paged_items
 from katello.client.lib.ui.printer import batch_add_columns
+from katello.client.lib.ui.progress import TransferProgress
 from katello.client.lib.control import get_katello_mode
 
 
@@ -42,8 +46,15 @@ class List(UserAction):
 
     description = _('list all known users')
 
+    def setup_parser(self, parser):
+        opt_parser_add_paging(parser)
+
+    def check_options(self, validator):
+        check_paging_options(validator)
+
     def run(self):
-        users = self.api.users()
+        users = paged_items(lambda page, per_page: self.api.users(page=page, per_page=per_page),
+                            self.get_option('offset'), self.get_option('limit'))
 
         batch_add_columns(self.printer, {'id': _("ID")}, {'username': _("Username")}, \
             {'email': _("Email")}, {'disabled': _("Disabled")}, \
@@ -330,12 +341,17 @@ class Report(UserAction):
 
     def run(self):
         format_in = self.get_option('format')
-        report = self.api.report(convert_to_mime_type(format_in, 'text'))
+        report, headers = self.api.report(convert_to_mime_type(format_in, 'text'), stream=True)
 
-        if format_in == 'pdf':
-            save_report(report[0], attachment_file_name(report[1], 'katello_users_report.pdf'))
-        else:
-            print report[0]
+        try:
+            if format_in == 'pdf':
+                transfer = TransferProgress(report.length)
+                save_report(report, attachment_file_name(headers, 'katello_users_report.pdf'), transfer.update)
+                transfer.done()
+            else:
+                print_stream(report, sys.stdout, encoding='utf-8')
+        finally:
+            report.close()
 
         return os.EX_OK
 
@@ -80,6 +80,24 @@ class OptionParser(_OptionParser):
             return self.epilog
         return _OptionParser.format_epilog(self, formatter)
 
+    _usage_function = None
+    def set_usage(self, usage):
+        """
+        Usage can be also a function returning the usage string. It is called
+        only when the usage is displayed.
+        """
+        if callable(usage):
+            self._usage_function = usage
+        else:
+            self._usage_function = None
+            _OptionParser.set_usage(self, usage)
+
+    def get_usage(self):
+        if self._usage_function is not None:
+            _OptionParser.set_usage(self, self._usage_function())
+            self._usage_function = None
+        return _OptionParser.get_usage(self)
+
     def _process_args(self, largs, rargs, values):
         try:
             _OptionParser._process_args(self, largs, rargs, values)
@@ -26,6 +26,7 @@ except ImportError:
 from katello.client.lib.ui.formatters import format_sync_errors, format_sync_status
 from katello.client.api.task_status import TaskStatusAPI, SystemTaskStatusAPI
 from katello.client.api.job import SystemGroupJobStatusAPI
+from katello.client.lib.utils.concurrency import parallel_map
 
 
 # Envelope around task status structure
@@ -45,6 +46,9 @@ from katello.client.api.job import SystemGroupJobStatusAPI
 # 'uuid': '52456711-cd67-11e0-af50-f0def13c24e5'}
 class AsyncTask():
 
+    # maximal number of task statuses fetched at once
+    POLL_WORKERS = 4
+
     def __init__(self, task):
         if not isinstance(task, list):
             self._tasks = [task]
@@ -55,8 +59,20 @@ class AsyncTask():
     def status_api(cls):
         return TaskStatusAPI()
 
+    @classmethod
+    def _task_id(cls, task):
+        return task['uuid']
+
     def update(self):
-        self._tasks = [self.status_api().status(t['uuid']) for t in self._tasks]
+        """
+        Refresh statuses of the tasks that are still running. The statuses
+        are fetched concurrently, finished tasks are not polled anymore.
+        """
+        api = self.status_api()
+        running = [i for i, task in enumerate(self._tasks) if self._subtask_is_running(task)]
+        statuses = parallel_map(lambda i: api.status(self._task_id(self._tasks[i])), running, self.POLL_WORKERS)
+        for i, status in zip(running, statuses):
+            self._tasks[i] = status
 
     def get_progress(self):
         """
@@ -230,8 +246,9 @@ class AsyncJob(AsyncTask):
         # return JobStatusAPI()
         return SystemGroupJobStatusAPI()
 
-    def update(self):
-        self._tasks = [self.status_api().status(j['id']) for j in self._tasks]
+    @classmethod
+    def _task_id(cls, task):
+        return task['id']
 
 
 
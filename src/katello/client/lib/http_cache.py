@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2013 Red Hat, Inc.
+#
+# This software is licensed to you under the GNU General Public License,
+# version 2 (GPLv2). There is NO WARRANTY for this software, express or
+# implied, including the implied warranties of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. You should have received a copy of GPLv2
+# along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+#
+# Red Hat trademarks are not licensed under GPLv2. No permission is
+# granted to use or replicate Red Hat trademarks that are incorporated
+# in this software or its documentation.
+
+import hashlib
+import os
+import re
+import tempfile
+import time
+from email.utils import parsedate_tz, mktime_tz
+
+try:
+    import json
+except ImportError:
+    import simplejson as json
+
+from katello.client.logutil import getLogger
+
+_log = getLogger(__name__)
+
+
+class ResponseCache(object):
+    """
+    On-disk cache of responses to GET requests.
+
+    Each response is stored in its own file together with its validators
+    (ETag and Last-Modified) and expiration computed from Cache-Control
+    and Expires headers. Stale entries are revalidated with conditional
+    requests. When the cache grows over its size limit, the least recently
+    used entries are removed.
+
+    @ivar directory: directory the cache files are stored in
+    @ivar max_size: maximal size of the cache in bytes
+    """
+
+    SUFFIX = '.json'
+
+    def __init__(self, directory, max_size=10 * 1024 * 1024):
+        self.directory = directory
+        self.max_size = max_size
+
+    @classmethod
+    def key(cls, identity, url):
+        """
+        Compute cache key of a request
+        @type identity: tuple
+        @param identity: identification of the server and the user
+        @type url: str
+        @param url: requested url
+        @rtype: str
+        """
+        return hashlib.sha1(repr((identity, url))).hexdigest()
+
+    def get(self, key):
+        """
+        Return cached entry or None when the response isn't cached.
+        Reading the entry marks it as recently used.
+        @rtype: dict
+        """
+        path = self.__path(key)
+        try:
+            f = open(path)
+            try:
+                entry = json.load(f)
+            finally:
+                f.close()
+            os.utime(path, None)
+            return entry
+        except (IOError, OSError):
+            return None
+        except ValueError:
+            _log.debug("removing corrupted cache entry %s" % path)
+            self.delete(key)
+            return None
+
+    def store(self, key, status, body, headers):
+        """
+        Store a response. Responses that can't be revalidated nor are
+        allowed to be stored by their Cache-Control header are skipped.
+        @return: the stored entry or None
+        """
+        directives = self.cache_control(headers)
+        header_dict = self.__header_dict(headers)
+        if 'no-store' in directives:
+            self.delete(key)
+            return None
+
+        entry = {
+            'status': status,
+            'body': body,
+            'headers': headers,
+            'etag': header_dict.get('etag'),
+            'last_modified': header_dict.get('last-modified'),
+            'expires': self.expires(headers),
+            'no_cache': 'no-cache' in directives
+        }
+        if not (entry['etag'] or entry['last_modified'] or entry['expires']):
+            self.delete(key)
+            return None
+        self.__write(key, entry)
+        self.__evict()
+        return entry
+
+    def revalidated(self, key, entry, headers):
+        """
+        Update an entry after the server confirmed it's still valid (304)
+        @rtype: dict
+        @return: updated entry
+        """
+        header_dict = self.__header_dict(headers)
+        entry['etag'] = header_dict.get('etag', entry['etag'])
+        entry['last_modified'] = header_dict.get('last-modified', entry['last_modified'])
+        entry['expires'] = self.expires(headers)
+        self.__write(key, entry)
+        return entry
+
+    def delete(self, key):
+        try:
+            os.remove(self.__path(key))
+        except OSError:
+            pass
+
+    def clear(self):
+        for name in self.__entry_names():
+            self.delete(name[:-len(self.SUFFIX)])
+
+    @classmethod
+    def is_fresh(cls, entry, now=None):
+        """
+        Whether the entry can be used without asking the server
+        """
+        if entry.get('no_cache') or entry.get('expires') is None:
+            return False
+        return (now or time.time()) < entry['expires']
+
+    @classmethod
+    def validators(cls, entry):
+        """
+        Headers for a conditional request revalidating the entry
+        @rtype: dict
+        """
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    @classmethod
+    def cache_control(cls, headers):
+        """
+        Parse Cache-Control header to dictionary {directive: value or None}
+        """
+        value = cls.__header_dict(headers).get('cache-control', '')
+        directives = {}
+        for directive in value.split(','):
+            m = re.match(r'\s*([\w-]+)\s*(?:=\s*"?([^"]*)"?)?\s*$', directive)
+            if m:
+                directives[m.group(1).lower()] = m.group(2)
+        return directives
+
+    @classmethod
+    def expires(cls, headers, now=None):
+        """
+        Compute expiration time of a response from max-age
+        or the Expires header
+        @rtype: float or None
+        """
+        now = now or time.time()
+        directives = cls.cache_control(headers)
+        if 'max-age' in directives:
+            try:
+                return now + int(directives['max-age'])
+            except (TypeError, ValueError):
+                return None
+        expires = cls.__header_dict(headers).get('expires')
+        if expires:
+            parsed = parsedate_tz(expires)
+            if parsed:
+                return mktime_tz(parsed)
+        return None
+
+    @classmethod
+    def __header_dict(cls, headers):
+        return dict((name.lower(), value) for name, value in headers)
+
+    def __path(self, key):
+        return os.path.join(self.directory, key + self.SUFFIX)
+
+    def __entry_names(self):
+        try:
+            return [name for name in os.listdir(self.directory) if name.endswith(self.SUFFIX)]
+        except OSError:
+            return []
+
+    def __write(self, key, entry):
+        """
+        Write the entry atomically, so that concurrently running clients
+        never read a partially written file
+        """
+        try:
+            if not os.path.isdir(self.directory):
+                os.makedirs(self.directory, 0700)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            f = os.fdopen(fd, 'w')
+            try:
+                json.dump(entry, f)
+            finally:
+                f.close()
+            os.rename(tmp_path, self.__path(key))
+        except (IOError, OSError), e:
+            _log.debug("failed to write cache entry: %s" % e)
+
+    def __evict(self):
+        """
+        Remove least recently used entries until the cache fits its size limit
+        """
+        entries = []
+        total_size = 0
+        for name in self.__entry_names():
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+            total_size += stat.st_size
+
+        entries.sort()
+        while total_size > self.max_size and entries:
+            __, size, name = entries.pop(0)
+            self.delete(name[:-len(self.SUFFIX)])
+            total_size -= size
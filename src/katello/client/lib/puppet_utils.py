@@ -19,7 +19,6 @@ import os
 import re
 import sys
 import tarfile
-import tempfile
 
 # WARNING: THIS CODE IS COPY-PASTED FROM PULP!
 
@@ -31,7 +30,8 @@ import tempfile
 #
 # The things I changed were the exceptions (there was a pulp exception that we
 # didn't have). And also I created generate_puppet_data based on
-# extract_metadata and extract_json. It doesn't require a temp_dir path.
+# extract_metadata and extract_json. It reads the metadata file straight from
+# the tarball, without extracting it to a temporary directory.
 #
 # pylint: disable-all
 
@@ -62,15 +62,13 @@ class InvalidTarball(ExtractionException):
 
 def generate_puppet_data(filename):
     """
-    Extracts the module's metadata file from the tarball. This call will attempt
-    to only extract and read the metadata file itself, cleaning up the
-    extracted file at the end.
+    Reads the module's metadata file from the tarball. The tarball is read
+    as a stream and only up to the metadata file, nothing is extracted to
+    the disk.
 
     :raise InvalidTarball: if the module file cannot be opened
     :raise MissingModuleFile: if the module's metadata file cannot be found
     """
-    temp_dir = tempfile.gettempdir()
-
     data = re.match('^(.+)?-(.+)?-(.+)?\.tar\.gz$', os.path.basename(filename))
     if data is None:
         raise ExtractionException(filename), None, sys.exc_info()[2]
@@ -79,46 +77,40 @@ def generate_puppet_data(filename):
         name = data.group(2)
         version = data.group(3)
 
-    # Extract the module's metadata file itself
     metadata_file_path = '%s-%s-%s/%s' % (author, name, version,
                                           "metadata.json")
 
     try:
-        tgz = tarfile.open(name=filename)
+        tgz = tarfile.open(name=filename, mode='r|gz')
     except Exception, e:
         raise InvalidTarball(filename), None, sys.exc_info()[2]
 
     try:
-        tgz.extract(metadata_file_path, path=temp_dir)
-        tgz.close()
+        contents = _read_member(tgz, metadata_file_path)
     except Exception, e:
-        tgz.close()
         raise MissingModuleFile(filename), None, sys.exc_info()[2]
+    finally:
+        tgz.close()
+
+    if contents is None:
+        raise MissingModuleFile(filename)
 
-    # Read in the contents
-    temp_filename = os.path.join(temp_dir, metadata_file_path)
-    contents = _read_contents(temp_filename)
     unit_key = {"author": author, "name": name, "version": version}
     metadata = json.loads(contents)
     return unit_key, metadata
 
 
-def _read_contents(filename):
+def _read_member(tgz, member_path):
     """
-    Simple utility to read in the contents of the given file, making sure to
-    properly handle the file object.
+    Read contents of a member of a tarball opened as a stream. Members
+    following the wanted one are not decompressed.
 
-    :return: contents of the given file
+    :return: contents of the member or None when it's not in the tarball
     """
-    try:
-        f = open(filename)
-        contents = f.read()
-        f.close()
-
-        return contents
-    finally:
-        # Clean up the temporary file
-        os.remove(filename)
+    for member in tgz:
+        if os.path.normpath(member.name) == member_path and member.isfile():
+            return tgz.extractfile(member).read()
+    return None
 
 
 def _find_file_in_dir(dir, filename):
@@ -16,9 +16,10 @@
 
 import os
 import rpm
-import hashlib
 import sys
 
+from katello.client.lib.utils.checksum import file_checksums
+
 # WARNING: THIS CODE IS COPY-PASTED FROM PULP!
 
 #
@@ -28,19 +29,20 @@ import sys
 # This code will be removed once pulp no longer requires unit_key/unit_metadata
 # to be passed in via its API.
 #
-# The only thing I've changed here is the exceptions.
+# The things I've changed here are the exceptions, the checksum is computed
+# by file_checksums and can be left to the caller (eg. computed while the file
+# is uploaded).
 #
 # pylint: disable-all
 
 RPMTAG_NOSOURCE = 1051
-CHECKSUM_READ_BUFFER_SIZE = 65536
 
 
 class InvalidRPMError(Exception):
     pass
 
 
-def generate_rpm_data(rpm_filename):
+def generate_rpm_data(rpm_filename, checksum=True):
     """
     For the given RPM, analyzes its metadata to generate the appropriate unit
     key and metadata fields, returning both to the caller.
@@ -56,6 +58,9 @@ def generate_rpm_data(rpm_filename):
 
     @param rpm_filename: full path to the RPM to analyze
     @type  rpm_filename: str
+    @param checksum: when False, the checksum is left None for the caller
+                     to fill in
+    @type  checksum: bool
 
     @return: tuple of unit key and unit metadata for the RPM
     @rtype:  tuple
@@ -87,7 +92,9 @@ def generate_rpm_data(rpm_filename):
 
     # Checksum
     unit_key['checksumtype'] = 'sha256'  # hardcoded to this in v1 so leaving this way for now
-    unit_key['checksum'] = _calculate_checksum(unit_key['checksumtype'], rpm_filename)
+    unit_key['checksum'] = None
+    if checksum:
+        unit_key['checksum'] = _calculate_checksum(unit_key['checksumtype'], rpm_filename)
 
     # Name, Version, Release, Epoch
     for k in ['name', 'version', 'release', 'epoch']:
@@ -130,12 +137,4 @@ def generate_rpm_data(rpm_filename):
 
 
 def _calculate_checksum(checksum_type, filename):
-    m = hashlib.new(checksum_type)
-    f = open(filename, 'r')
-    while 1:
-        file_buffer = f.read(CHECKSUM_READ_BUFFER_SIZE)
-        if not file_buffer:
-            break
-    m.update(file_buffer)
-    f.close()
-    return m.hexdigest()
+    return file_checksums(filename, [checksum_type])[checksum_type]
@@ -37,6 +37,31 @@ def format_sync_state(state):
     return SYNC_STATES[state]
 
 
+def format_duration(seconds):
+    """
+    Format number of seconds as [hours:]minutes:seconds
+    """
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return "%d:%02d:%02d" % (hours, minutes, seconds)
+    return "%d:%02d" % (minutes, seconds)
+
+
+def format_size(size):
+    """
+    Format number of bytes in human readable units
+    """
+    if size < 1024:
+        return "%d B" % size
+    size = float(size)
+    for unit in ('KB', 'MB', 'GB'):
+        size /= 1024
+        if size < 1024:
+            return "%.1f %s" % (size, unit)
+    return "%.1f TB" % (size / 1024)
+
+
 def format_date(date, to_format="%Y/%m/%d %H:%M:%S"):
     """
     Format standard rails timestamp to more human readable format
@@ -20,6 +20,7 @@ import sys
 import unicodedata
 
 
+from itertools import chain, islice
 from math import floor
 from katello.client.lib.utils.encoding import u_str
 
@@ -30,9 +31,10 @@ class PrinterStrategy(object):
     Strategy of formatting the data and printing them on the output.
     """
 
-    def __init__(self, output=sys.stdout):
+    def __init__(self, output=None):
         super(PrinterStrategy, self).__init__()
-        self._output = output
+        # sys.stdout is looked up at creation time, so that redirected output is respected
+        self._output = output or sys.stdout
 
     def print_item(self, heading, columns, item):
         """
@@ -188,7 +190,10 @@ class GrepStrategy(PrinterStrategy):
     String to divide the columns can be set optionally.
     """
 
-    def __init__(self, delimiter=None, output=sys.stdout):
+    # number of streamed items used for computing widths of the columns
+    STREAM_WIDTH_SAMPLE = 100
+
+    def __init__(self, delimiter=None, output=None):
         """
         :type delimiter: string
         :param delimiter: delimiter for dividing the grid columns
@@ -206,10 +211,19 @@ class GrepStrategy(PrinterStrategy):
         :param heading: Title for the list of items
         :type columns: list of dicts
         :param columns: definition of columns
-        :type items: list of dicts
+        :type items: list of dicts or iterable of dicts
         :param items: data to be printed, list of items
         """
-        column_widths = self._calc_column_widths(items, columns)
+        if not isinstance(items, (list, tuple)):
+            # streamed items, column widths are estimated from the first few
+            # of them so that the printing can start before all data arrive
+            items = iter(items)
+            first_items = list(islice(items, self.STREAM_WIDTH_SAMPLE))
+            column_widths = self._calc_column_widths(first_items, columns)
+            items = chain(first_items, items)
+        else:
+            column_widths = self._calc_column_widths(items, columns)
+
         if heading is not None:
             self._print_header(heading, columns, column_widths)
         for item in items:
@@ -478,7 +492,7 @@ def center_text(text, width=None):
     return "\n".join(centered)
 
 
-def print_line(width=None, output=sys.stdout):
+def print_line(width=None, output=None):
     """
     Prints line of characters '-' to stdout
 
@@ -15,6 +15,7 @@
 # in this software or its documentation.
 #
 
+import random
 import sys
 import time
 import threading
@@ -33,6 +34,31 @@ class ProgressBar(object):
         sys.stdout.write("\r%60s\r" % (' ' * 70))
 
 
+class TransferProgress(object):
+    """
+    Progress bar of a transfer of known size. Updates can come from more
+    threads. Nothing is displayed when the size is not known.
+    """
+
+    def __init__(self, total):
+        self.total = total
+        self.transferred = 0
+        self.__lock = threading.Lock()
+
+    def update(self, size):
+        """
+        Record transfer of size more bytes
+        """
+        with self.__lock:
+            self.transferred += size
+            if self.total:
+                ProgressBar.update_progress(min(float(self.transferred) / self.total, 1.0))
+
+    def done(self):
+        if self.total:
+            ProgressBar.done()
+
+
 class Spinner(threading.Thread):
     """
     Spinner shows nice cli "spinner" while function is executing.
@@ -116,12 +142,46 @@ def run_spinner_in_bg(function, arguments=(), message=""):
     return result
 
 
+class PollingDelay(object):
+    """
+    Delays between polls of running tasks. The delay starts at the initial
+    value and grows exponentially up to max_delay, so that long running tasks
+    don't flood the server with status requests. Each delay is randomized
+    by the jitter ratio to spread polls of more clients running at once.
+    """
+
+    # ceiling of the delay in seconds, configurable by [interface] poll_max_delay
+    max_delay = 10.0
+
+    def __init__(self, initial=1, factor=1.5, jitter=0.1):
+        self.initial = initial
+        self.factor = factor
+        self.jitter = jitter
+        self.__current = initial
+
+    def next(self):
+        """
+        @rtype: float
+        @return: number of seconds to wait before the next poll
+        """
+        delay = min(self.__current, max(self.max_delay, self.initial))
+        self.__current = delay * self.factor
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def reset(self):
+        """
+        Start again from the initial delay, eg. when the task made progress
+        """
+        self.__current = self.initial
+
+
 def wait_for_async_task(task, delay=1):
     if not isinstance(task, AsyncTask):
         task = AsyncTask(task)
 
+    delays = PollingDelay(delay)
     while task.is_running():
-        time.sleep(delay)
+        time.sleep(delays.next())
         task.update()
     return task.get_hashes()
 
@@ -130,10 +190,17 @@ def run_async_task_with_status(task, progress_bar, delay=1):
     if not isinstance(task, AsyncTask):
         task = AsyncTask(task)
 
+    delays = PollingDelay(delay)
+    last_progress = None
     while task.is_running():
-        time.sleep(delay)
+        time.sleep(delays.next())
         task.update()
-        progress_bar.update_progress(task.get_progress())
+        current_progress = task.get_progress()
+        if current_progress != last_progress:
+            # keep the progress bar responsive while the task is moving
+            delays.reset()
+            last_progress = current_progress
+        progress_bar.update_progress(current_progress)
 
     progress_bar.done()
     return task.get_hashes()
@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2013 Red Hat, Inc.
+#
+# This software is licensed to you under the GNU General Public License,
+# version 2 (GPLv2). There is NO WARRANTY for this software, express or
+# implied, including the implied warranties of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. You should have received a copy of GPLv2
+# along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+#
+# Red Hat trademarks are not licensed under GPLv2. No permission is
+# granted to use or replicate Red Hat trademarks that are incorporated
+# in this software or its documentation.
+
+import hashlib
+import os
+import threading
+import time
+
+try:
+    import json
+except ImportError:
+    import simplejson as json
+
+from katello.client.config import Config
+from katello.client.logutil import getLogger
+
+_log = getLogger(__name__)
+
+
+class UploadJournal(object):
+    """
+    Journal of content uploads in progress, kept in the user's config
+    directory. An interrupted upload can be resumed from the chunks the
+    server already acknowledged.
+
+    Every upload has its own journal file. The first line is a json header
+    describing the upload, every acknowledged chunk appends a line with its
+    offset and checksum, so recording a chunk costs one small write.
+
+    @ivar directory: directory the journal files are stored in
+    """
+
+    SUFFIX = '.journal'
+
+    def __init__(self, directory=None):
+        self.directory = directory or os.path.join(Config.USER_DIR, 'uploads')
+
+    def start(self, server_url, repo_id, filepath, upload_id, chunk):
+        """
+        Record a new upload, replaces previous upload of the same file
+        @rtype: UploadJournalEntry
+        """
+        filepath = os.path.abspath(filepath)
+        stat = os.stat(filepath)
+        header = {
+            'server': server_url,
+            'repo_id': repo_id,
+            'path': filepath,
+            'upload_id': upload_id,
+            'chunk': chunk,
+            'size': stat.st_size,
+            'mtime': stat.st_mtime,
+            'started': time.time()
+        }
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory, 0700)
+        entry = UploadJournalEntry(self.__path(server_url, repo_id, filepath), header)
+        entry.save()
+        return entry
+
+    def find(self, server_url, repo_id, filepath):
+        """
+        @rtype: UploadJournalEntry
+        @return: journal of an unfinished upload of the file or None
+        """
+        return UploadJournalEntry.load(self.__path(server_url, repo_id, os.path.abspath(filepath)))
+
+    def entries(self):
+        """
+        @rtype: list
+        @return: journals of all unfinished uploads
+        """
+        try:
+            names = sorted(os.listdir(self.directory))
+        except OSError:
+            return []
+        entries = [UploadJournalEntry.load(os.path.join(self.directory, name))
+                   for name in names if name.endswith(self.SUFFIX)]
+        return [entry for entry in entries if entry is not None]
+
+    def __path(self, server_url, repo_id, filepath):
+        key = hashlib.sha1(repr((server_url, str(repo_id), filepath))).hexdigest()
+        return os.path.join(self.directory, key + self.SUFFIX)
+
+
+class UploadJournalEntry(object):
+    """
+    Journal of a single upload
+
+    @ivar path: path to the journal file
+    @ivar header: dictionary describing the upload
+    @ivar acknowledged: dictionary {offset: checksum} of chunks the server received
+    """
+
+    def __init__(self, path, header, acknowledged=None):
+        self.path = path
+        self.header = header
+        self.acknowledged = acknowledged or {}
+        self.__lock = threading.Lock()
+
+    upload_id = property(lambda self: self.header['upload_id'])
+    repo_id = property(lambda self: self.header['repo_id'])
+    filepath = property(lambda self: self.header['path'])
+    server_url = property(lambda self: self.header['server'])
+    chunk = property(lambda self: self.header['chunk'])
+
+    @classmethod
+    def load(cls, path):
+        """
+        Read the journal file. Damaged journals are removed.
+        @rtype: UploadJournalEntry
+        @return: the journal or None when the file doesn't exist
+        """
+        try:
+            f = open(path)
+            try:
+                lines = f.read().splitlines()
+            finally:
+                f.close()
+        except IOError:
+            return None
+
+        try:
+            header = json.loads(lines[0])
+            acknowledged = {}
+            for line in lines[1:]:
+                try:
+                    offset, checksum = json.loads(line)
+                except ValueError:
+                    # last line is incomplete when the cli was killed while writing it
+                    break
+                acknowledged[offset] = checksum
+        except (IndexError, ValueError):
+            _log.debug("removing damaged upload journal %s" % path)
+            cls(path, {}).remove()
+            return None
+        return cls(path, header, acknowledged)
+
+    @classmethod
+    def checksum(cls, data):
+        return hashlib.sha1(data).hexdigest()
+
+    def save(self):
+        f = open(self.path, 'w')
+        try:
+            f.write(json.dumps(self.header) + '\n')
+            for offset in sorted(self.acknowledged.keys()):
+                f.write(json.dumps([offset, self.acknowledged[offset]]) + '\n')
+        finally:
+            f.close()
+
+    def acknowledge(self, offset, data):
+        """
+        Record a chunk the server received. Safe to call from more threads.
+        """
+        checksum = self.checksum(data)
+        line = json.dumps([offset, checksum]) + '\n'
+        with self.__lock:
+            self.acknowledged[offset] = checksum
+            f = open(self.path, 'a')
+            try:
+                f.write(line)
+            finally:
+                f.close()
+
+    def is_acknowledged(self, offset):
+        return offset in self.acknowledged
+
+    def file_unchanged(self):
+        """
+        Check that the uploaded file wasn't changed since the upload started:
+        its size and modification time are the same and the acknowledged
+        chunks have the same content.
+        @rtype: bool
+        """
+        try:
+            stat = os.stat(self.filepath)
+            if stat.st_size != self.header['size'] or stat.st_mtime != self.header['mtime']:
+                return False
+            f = open(self.filepath, 'rb')
+            try:
+                for offset in sorted(self.acknowledged.keys()):
+                    f.seek(offset)
+                    if self.checksum(f.read(self.chunk)) != self.acknowledged[offset]:
+                        return False
+            finally:
+                f.close()
+        except (IOError, OSError):
+            return False
+        return True
+
+    def acknowledged_size(self):
+        """
+        @rtype: int
+        @return: number of bytes the server already received
+        """
+        return sum([min(self.chunk, self.header['size'] - offset) for offset in self.acknowledged.keys()])
+
+    def age(self):
+        """
+        @rtype: float
+        @return: seconds since the upload last made progress
+        """
+        try:
+            return time.time() - os.path.getmtime(self.path)
+        except OSError:
+            return 0
+
+    def remove(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2013 Red Hat, Inc.
+#
+# This software is licensed to you under the GNU General Public License,
+# version 2 (GPLv2). There is NO WARRANTY for this software, express or
+# implied, including the implied warranties of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. You should have received a copy of GPLv2
+# along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+#
+# Red Hat trademarks are not licensed under GPLv2. No permission is
+# granted to use or replicate Red Hat trademarks that are incorporated
+# in this software or its documentation.
+
+import hashlib
+import mmap
+import os
+
+READ_BUFFER_SIZE = 1024 * 1024
+# smaller files are read faster than mapped
+MMAP_THRESHOLD = 64 * 1024 * 1024
+
+
+class MultiHash(object):
+    """
+    Computes checksums of more algorithms at once from a stream of data,
+    so that the data is read only once.
+
+    Typical usage:
+
+    hashes = MultiHash(['sha256', 'sha1'])
+    for data in stream:
+        hashes.update(data)
+    hashes.hexdigest('sha256')
+    """
+
+    def __init__(self, algorithms=('sha256',)):
+        self.__hashes = [(algorithm, hashlib.new(algorithm)) for algorithm in algorithms]
+
+    def update(self, data):
+        for __, h in self.__hashes:
+            h.update(data)
+
+    def hexdigest(self, algorithm):
+        for name, h in self.__hashes:
+            if name == algorithm:
+                return h.hexdigest()
+        raise KeyError(algorithm)
+
+    def hexdigests(self):
+        """
+        @rtype: dict
+        @return: dictionary {algorithm: hexdigest}
+        """
+        return dict((name, h.hexdigest()) for name, h in self.__hashes)
+
+
+def file_checksums(filename, algorithms=('sha256',), use_mmap=None):
+    """
+    Compute checksums of a file in a single pass over its content.
+
+    @type filename: str
+    @param filename: path to the file
+    @type algorithms: list
+    @param algorithms: names of hashlib algorithms
+    @type use_mmap: bool
+    @param use_mmap: map the file to memory instead of reading it,
+                     by default large files are mapped
+    @rtype: dict
+    @return: dictionary {algorithm: hexdigest}
+    """
+    hashes = MultiHash(algorithms)
+    f = open(filename, 'rb')
+    try:
+        size = os.fstat(f.fileno()).st_size
+        if use_mmap is None:
+            use_mmap = size >= MMAP_THRESHOLD
+        if use_mmap and size > 0:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                # buffers pass the mapped pages to the hashes without copying
+                for offset in xrange(0, size, READ_BUFFER_SIZE):
+                    hashes.update(buffer(mapped, offset, READ_BUFFER_SIZE))
+            finally:
+                mapped.close()
+        else:
+            while True:
+                data = f.read(READ_BUFFER_SIZE)
+                if not data:
+                    break
+                hashes.update(data)
+    finally:
+        f.close()
+    return hashes.hexdigests()
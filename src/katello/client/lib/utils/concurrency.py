@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2013 Red Hat, Inc.
+#
+# This software is licensed to you under the GNU General Public License,
+# version 2 (GPLv2). There is NO WARRANTY for this software, express or
+# implied, including the implied warranties of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. You should have received a copy of GPLv2
+# along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+#
+# Red Hat trademarks are not licensed under GPLv2. No permission is
+# granted to use or replicate Red Hat trademarks that are incorporated
+# in this software or its documentation.
+
+import sys
+import threading
+
+from katello.client import server
+
+
+def parallel_map(function, items, max_workers=8):
+    """
+    Apply the function to all items using a pool of threads.
+    Handy for issuing more independent api requests at once.
+
+    Results are returned in the order of the items. If any of the calls
+    raises an exception, no further items are processed and the exception
+    is re-raised once the running calls finish.
+
+    Items are taken from the iterable one by one as the threads need them
+    and in the order of the iterable, so a generator keeps at most
+    max_workers items in memory.
+
+    @type function: function
+    @param function: function taking one item
+    @type items: iterable
+    @param items: items to process
+    @type max_workers: int
+    @param max_workers: maximal number of threads
+    @rtype: list
+    @return: list of results of the function
+    """
+    sized = hasattr(items, '__len__')
+    if max_workers <= 1 or (sized and len(items) <= 1):
+        return [function(item) for item in items]
+
+    results = {}
+    errors = []
+    lock = threading.Lock()
+    indexed_items = enumerate(items)
+    context = ThreadContext()
+
+    def worker():
+        context.apply()
+        while not errors:
+            try:
+                with lock:
+                    index, item = indexed_items.next()
+            except StopIteration:
+                return
+            except: # pylint: disable=W0702
+                errors.append(sys.exc_info())
+                return
+            try:
+                results[index] = function(item)
+            except: # pylint: disable=W0702
+                errors.append(sys.exc_info())
+
+    if sized:
+        max_workers = min(max_workers, len(items))
+    threads = [threading.Thread(target=worker) for __ in range(max_workers)]
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+    for thread in threads:
+        # join with a timeout keeps the main thread responsive to Ctrl+C
+        while thread.is_alive():
+            thread.join(0.1)
+
+    if errors:
+        raise errors[0][0], errors[0][1], errors[0][2]
+    return [results[index] for index in range(len(results))]
+
+
+class ThreadContext(object):
+    """
+    State of the current thread that helper threads started by it have to
+    share: the server bound to the thread (eg. a worker of a batch shell)
+    and the output captured by L{ThreadLocalStream}s.
+
+    Typical usage:
+
+    context = ThreadContext()
+    def helper():
+        context.apply()
+        ...
+    threading.Thread(target=helper).start()
+    """
+
+    def __init__(self):
+        self.server = server.get_active_server()
+        self.captures = [(stream, stream.captured()) for stream in (sys.stdout, sys.stderr)
+                         if isinstance(stream, ThreadLocalStream) and stream.captured() is not None]
+
+    def apply(self):
+        """
+        Bind the state to the current thread
+        """
+        if self.server is not None and self.server is not server.active_server:
+            server.set_active_server(self.server, thread_local=True)
+        for stream, chunks in self.captures:
+            stream.capture(chunks)
+
+
+class ThreadLocalStream(object):
+    """
+    Wrapper of an output stream (eg. sys.stdout) that lets threads capture
+    what they write instead of interleaving it with the output of other
+    threads. Threads that don't capture write directly to the stream.
+
+    @ivar stream: the wrapped stream
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.__local = threading.local()
+
+    def capture(self, chunks=None):
+        """
+        Start capturing output written by the current thread
+        @type chunks: list
+        @param chunks: list to capture the output to, threads sharing
+                       the list share the captured output
+        """
+        self.__local.chunks = chunks if chunks is not None else []
+
+    def captured(self):
+        """
+        @rtype: list
+        @return: chunks captured by the current thread or None when it
+                 doesn't capture its output
+        """
+        return getattr(self.__local, 'chunks', None)
+
+    def release(self):
+        """
+        Stop capturing output of the current thread
+        @rtype: list
+        @return: chunks of data written since the capture started
+        """
+        chunks = getattr(self.__local, 'chunks', None) or []
+        self.__local.chunks = None
+        return chunks
+
+    def write(self, data):
+        chunks = getattr(self.__local, 'chunks', None)
+        if chunks is None:
+            self.stream.write(data)
+        else:
+            chunks.append(data)
+
+    def writelines(self, lines):
+        for line in lines:
+            self.write(line)
+
+    def flush(self):
+        if getattr(self.__local, 'chunks', None) is None:
+            self.stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
@@ -113,3 +113,39 @@ def slice_dict(orig_dict, *key_list, **kw_args):
         return dict((key, orig_dict[key]) for key in key_list if key in orig_dict)
     else:
         return dict((key, orig_dict[key]) for key in key_list if key in orig_dict and orig_dict[key] is not None)
+
+
+def join_related(records, related, foreign_key, target_key, related_key='id', related_field='name'):
+    """
+    Decorate records with a field of related records that were fetched
+    all at once, instead of looking up the related record for each row.
+    Eg.
+        >>> keys = [{'name': 'key', 'content_view_id': 3}]
+        >>> views = [{'id': 3, 'name': 'view'}]
+        >>> join_related(keys, views, 'content_view_id', 'content_view')
+        [{'name': 'key', 'content_view_id': 3, 'content_view': 'view'}]
+
+    Records whose foreign key is empty or doesn't match any related
+    record are left untouched.
+
+    @type records: list of dicts
+    @param records: records to decorate, they are updated in place
+    @type related: list of dicts
+    @param related: related records
+    @type foreign_key: string
+    @param foreign_key: key of the records referencing a related record
+    @type target_key: string
+    @param target_key: key the related field is stored under in the records
+    @type related_key: string
+    @param related_key: key of the related records the foreign key references
+    @type related_field: string
+    @param related_field: field of the related records to store
+    @rtype: list of dicts
+    @return: the decorated records
+    """
+    index = dict((rel[related_key], rel) for rel in related)
+    for rec in records:
+        rel = index.get(rec.get(foreign_key))
+        if rel is not None:
+            rec[target_key] = rel[related_field]
+    return records
@@ -15,8 +15,15 @@
 # in this software or its documentation.
 #
 
+import codecs
+import csv
 import os
 
+try:
+    import json
+except ImportError:
+    import simplejson as json
+
 
 def get_abs_path(path):
     """
@@ -47,14 +54,208 @@ def attachment_file_name(headers, default):
         filename = content_disposition[0][1].split('filename=')
         if len(filename) < 2:
             return default
-        if filename[1][0] == '"' or filename[1][0] == "'":
-            return filename[1][1:-1]
-        return filename
+        filename = filename[1].split(';')[0].strip()
+        if filename[:1] == '"' or filename[:1] == "'":
+            filename = filename[1:-1]
+        # never let the server choose a directory to write to
+        return os.path.basename(filename) or default
 
     return default
 
 
-def save_report(report, filename):
-    f = open(filename, 'w')
-    f.write(report)
-    f.close()
+def copy_stream(source, target, callback=None, block_size=64 * 1024, encoding=None):
+    """
+    Copy data from a file-like source to the target in blocks,
+    so that the data is never held in memory at once.
+    @type callback: function
+    @param callback: called with the size of every copied block
+    @type encoding: string
+    @param encoding: when set, the data are decoded to unicode before
+                     they are written, eg. for streams with a codec
+    @rtype: int
+    @return: number of copied bytes
+    """
+    decoder = encoding and codecs.getincrementaldecoder(encoding)('replace')
+    copied = 0
+    while True:
+        block = source.read(block_size)
+        if not block:
+            if decoder:
+                target.write(decoder.decode('', True))
+            return copied
+        target.write(decoder.decode(block) if decoder else block)
+        copied += len(block)
+        if callback:
+            callback(len(block))
+
+
+class _LastCharacter(object):
+    """
+    Writes to a target and remembers the last written character
+    """
+
+    def __init__(self, target):
+        self.target = target
+        self.last = None
+
+    def write(self, data):
+        if data:
+            self.last = data[-1]
+        self.target.write(data)
+
+
+def print_stream(source, target, encoding=None):
+    """
+    Copy a text stream to the target like print would do, ending it
+    with a new line unless the data already end with one.
+    @type encoding: string
+    @param encoding: encoding the data are decoded from
+    @rtype: int
+    @return: number of copied bytes
+    """
+    writer = _LastCharacter(target)
+    copied = copy_stream(source, writer, encoding=encoding)
+    if writer.last != '\n':
+        target.write('\n')
+    return copied
+
+
+def save_report(report, filename, callback=None):
+    """
+    Save a report to the file
+    @type report: string or file-like object
+    @param report: content of the report or a stream it's read from
+    @type callback: function
+    @param callback: called with the size of every block written from a stream
+    """
+    f = open(filename, 'wb')
+    try:
+        if hasattr(report, 'read'):
+            copy_stream(report, f, callback)
+        else:
+            f.write(report)
+    finally:
+        f.close()
+
+
+def read_records(filename):
+    """
+    Read records from a JSON file with an array of objects or from a CSV
+    file with a header line. The format is chosen by the file extension,
+    files not ending with .json are read as CSV.
+    @type filename: string
+    @param filename: path to the file
+    @rtype: list of dicts
+    @return: the records, values of CSV records are unicode strings
+    """
+    f = open(filename, 'rb')
+    try:
+        if filename.lower().endswith('.json'):
+            return list(iter_json_array(f))
+        return [dict((key.strip().decode('utf-8'), (value or '').strip().decode('utf-8'))
+                     for key, value in row.items() if key is not None)
+                for row in csv.DictReader(f)]
+    finally:
+        f.close()
+
+
+def iter_json_array(stream, block_size=65536):
+    """
+    Incrementally decode a json array read from a stream and yield its items
+    one by one, so that the whole document never has to be held in memory.
+    When the document is not an array, the decoded value is yielded as the
+    only item.
+    @type stream: file-like object
+    @param stream: stream with utf-8 encoded json document
+    @type block_size: int
+    @param block_size: number of bytes read from the stream at a time
+    """
+    reader = _JsonStreamReader(stream, block_size)
+
+    if reader.next_char() != '[':
+        document = json.loads(reader.read_rest())
+        if isinstance(document, list):
+            for item in document:
+                yield item
+        else:
+            yield document
+        return
+
+    reader.skip(1)
+    if reader.next_char() == ']':
+        return
+    while True:
+        yield reader.decode_value()
+        separator = reader.next_char()
+        reader.skip(1)
+        if separator == ']':
+            return
+        elif separator != ',':
+            raise ValueError("Expecting , delimiter or end of array in streamed json")
+
+
+class _JsonStreamReader(object):
+    """
+    Buffer of a json document that is being decoded from a stream
+    """
+
+    def __init__(self, stream, block_size):
+        self.__stream = stream
+        self.__block_size = block_size
+        self.__decoder = json.JSONDecoder()
+        self.__utf8 = codecs.getincrementaldecoder('utf-8')()
+        self.__buffer = u''
+        self.__pos = 0
+        self.__eof = False
+
+    def __fill(self):
+        """
+        Read next block from the stream, drop the part of the buffer
+        that was already decoded
+        @return: False when the stream is exhausted
+        """
+        if self.__eof:
+            return False
+        block = self.__stream.read(self.__block_size)
+        self.__eof = not block
+        self.__buffer = self.__buffer[self.__pos:] + self.__utf8.decode(block, final=self.__eof)
+        self.__pos = 0
+        return not self.__eof
+
+    def next_char(self):
+        """
+        Skip whitespace and return the next character without consuming it
+        """
+        while True:
+            while self.__pos < len(self.__buffer) and self.__buffer[self.__pos].isspace():
+                self.__pos += 1
+            if self.__pos < len(self.__buffer):
+                return self.__buffer[self.__pos]
+            if not self.__fill():
+                raise ValueError("Unexpected end of streamed json")
+
+    def skip(self, count):
+        self.__pos += count
+
+    def decode_value(self):
+        self.next_char()
+        while True:
+            try:
+                value, end = self.__decoder.raw_decode(self.__buffer, self.__pos)
+                # a number at the end of the buffer may continue in the next block
+                if self.__eof or (end < len(self.__buffer) and self.__value_ends_at(end)):
+                    self.__pos = end
+                    return value
+            except ValueError:
+                if self.__eof:
+                    raise
+            self.__fill()
+
+    def __value_ends_at(self, pos):
+        char = self.__buffer[pos]
+        return char in ',]' or char.isspace()
+
+    def read_rest(self):
+        while self.__fill():
+            pass
+        return self.__buffer[self.__pos:]
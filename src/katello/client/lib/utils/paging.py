@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2013 Red Hat, Inc.
+#
+# This software is licensed to you under the GNU General Public License,
+# version 2 (GPLv2). There is NO WARRANTY for this software, express or
+# implied, including the implied warranties of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. You should have received a copy of GPLv2
+# along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+#
+# Red Hat trademarks are not licensed under GPLv2. No permission is
+# granted to use or replicate Red Hat trademarks that are incorporated
+# in this software or its documentation.
+
+import sys
+import threading
+
+from itertools import islice
+
+from katello.client.lib.utils.concurrency import ThreadContext
+
+DEFAULT_PER_PAGE = 250
+
+
+class _Prefetch(threading.Thread):
+    """
+    Calls a function in a background thread and keeps its result.
+    The thread uses the active server and output capture of its creator.
+    """
+
+    def __init__(self, function, *args):
+        super(_Prefetch, self).__init__()
+        self.daemon = True
+        self.function = function
+        self.args = args
+        self.result = None
+        self.error = None
+        self.context = ThreadContext()
+        self.start()
+
+    def run(self):
+        self.context.apply()
+        try:
+            self.result = self.function(*self.args)
+        except: # pylint: disable=W0702
+            self.error = sys.exc_info()
+
+    def get(self):
+        # join with a timeout keeps the main thread responsive to Ctrl+C
+        while self.is_alive():
+            self.join(0.1)
+        if self.error:
+            raise self.error[0], self.error[1], self.error[2]
+        return self.result
+
+
+def paged_items(fetch_page, offset=0, limit=None, per_page=DEFAULT_PER_PAGE):
+    """
+    Iterate over records of a collection the server returns in pages.
+    The first page is requested right away so that errors are raised before
+    any output is printed. Once a page turns out to be full, the next page
+    is requested in a background thread while the records are consumed.
+
+    Iteration ends with the first page shorter than per_page. A server
+    that doesn't support paging returns the whole collection for every
+    page. That is recognized by a response longer than per_page, or, when
+    the offset starts beyond the first page, by asking for the first page
+    with a single record. The collection is then sliced on the client
+    instead of being requested page by page.
+
+    Typical usage:
+
+    systems = paged_items(lambda page, per_page: api.systems_by_org(org, page=page, per_page=per_page),
+                          offset=20, limit=10)
+
+    @type fetch_page: function
+    @param fetch_page: function taking the page number (starting from 1)
+                       and the page size, returns an iterable of records
+    @type offset: int
+    @param offset: number of records to skip
+    @type limit: int
+    @param limit: maximal number of records to return, all when None
+    @type per_page: int
+    @param per_page: number of records requested at once
+    @rtype: iterator
+    @return: iterator of the records
+    """
+    offset = offset or 0
+    if limit is not None:
+        if limit <= 0:
+            return iter([])
+        per_page = min(per_page, limit)
+    page = offset // per_page + 1
+    probe = _Prefetch(fetch_page, 1, 1) if page > 1 else None
+    records = fetch_page(page, per_page)
+    if probe is not None and not _is_paged(probe.get()):
+        # the records are the whole collection
+        return _slice_stream(records, offset, limit)
+    return _iterate_pages(fetch_page, records, page, per_page, offset % per_page, limit)
+
+
+def _iterate_pages(fetch_page, records, page, per_page, skip, remaining):
+    previous_first = None
+    while records is not None:
+        fetch = None
+        count = 0
+        sized = isinstance(records, list)
+        try:
+            for record, more in _lookahead(records):
+                count += 1
+                if count == 1:
+                    if previous_first is not None and record == previous_first:
+                        # the same records again, the server ignores paging
+                        return
+                    previous_first = record
+                # the next page is requested as soon as this one is known to be full,
+                # for a fetched page right away, for a streamed one with its last record
+                if count == (1 if sized else per_page):
+                    full = len(records) == per_page if sized else not more
+                    if full and (remaining is None or remaining > per_page - max(count - 1, skip)):
+                        fetch = _Prefetch(_fetch_list, fetch_page, page + 1, per_page)
+                if count <= skip:
+                    continue
+                yield record
+                if remaining is not None:
+                    remaining -= 1
+                    if remaining <= 0:
+                        return
+        finally:
+            _close(records)
+        records = fetch.get() if fetch else None
+        page, skip = page + 1, 0
+
+
+def _fetch_list(fetch_page, page, per_page):
+    return list(fetch_page(page, per_page))
+
+
+def _lookahead(records):
+    """
+    Yield tuples of a record and a flag whether more records follow
+    """
+    records = iter(records)
+    try:
+        record = records.next()
+    except StopIteration:
+        return
+    for following in records:
+        yield record, True
+        record = following
+    yield record, False
+
+
+def _is_paged(records):
+    """
+    Check the response to a request of a single record
+    """
+    records = iter(records)
+    try:
+        return len(list(islice(records, 2))) <= 1
+    finally:
+        _close(records)
+
+
+def _slice_stream(records, offset, limit):
+    stop = offset + limit if limit is not None else None
+    try:
+        for record in islice(records, offset, stop):
+            yield record
+    finally:
+        _close(records)
+
+
+def _close(records):
+    # streamed responses release their connection when closed
+    close = getattr(records, 'close', None)
+    if close is not None:
+        close()
+
+
+def slice_items(records, offset=0, limit=None):
+    """
+    Apply offset and limit to records the server returned all at once
+    @type records: list
+    @rtype: list
+    """
+    offset = offset or 0
+    if limit is None:
+        return records[offset:]
+    return records[offset:offset + limit]
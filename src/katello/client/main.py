@@ -15,42 +15,44 @@
 #
 
 from katello.client.lib.control import get_katello_mode
-from katello.client.core import (
-  about,
-  activation_key,
-  environment,
-  organization,
-  user,
-  user_role,
-  provider,
-  ping,
-  version,
-  product,
-  repo,
-  packagegroup,
-  permission,
-  distribution,
-  package,
-  puppet_module,
-  errata,
-  system,
-  system_custom_info,
-  task,
-  sync_plan,
-  shell_command,
-  changeset,
-  client,
-  gpg_key,
-  system_group,
-  admin,
-  node,
-  content,
-  content_view,
-  content_view_definition,
-  filter as content_filter,
-  distributor,
-  distributor_custom_info
-)
+from katello.client.core.base import LazyModule
+
+# Commands are registered lazily, modules of the commands are imported
+# only when the command is run. See LazyCommand.
+about = LazyModule('katello.client.core.about')
+activation_key = LazyModule('katello.client.core.activation_key')
+environment = LazyModule('katello.client.core.environment')
+organization = LazyModule('katello.client.core.organization')
+user = LazyModule('katello.client.core.user')
+user_role = LazyModule('katello.client.core.user_role')
+provider = LazyModule('katello.client.core.provider')
+ping = LazyModule('katello.client.core.ping')
+version = LazyModule('katello.client.core.version')
+product = LazyModule('katello.client.core.product')
+repo = LazyModule('katello.client.core.repo')
+packagegroup = LazyModule('katello.client.core.packagegroup')
+permission = LazyModule('katello.client.core.permission')
+distribution = LazyModule('katello.client.core.distribution')
+package = LazyModule('katello.client.core.package')
+puppet_module = LazyModule('katello.client.core.puppet_module')
+errata = LazyModule('katello.client.core.errata')
+system = LazyModule('katello.client.core.system')
+system_custom_info = LazyModule('katello.client.core.system_custom_info')
+task = LazyModule('katello.client.core.task')
+sync_plan = LazyModule('katello.client.core.sync_plan')
+shell_command = LazyModule('katello.client.core.shell_command')
+changeset = LazyModule('katello.client.core.changeset')
+client = LazyModule('katello.client.core.client')
+gpg_key = LazyModule('katello.client.core.gpg_key')
+system_group = LazyModule('katello.client.core.system_group')
+admin = LazyModule('katello.client.core.admin')
+node = LazyModule('katello.client.core.node')
+content = LazyModule('katello.client.core.content')
+content_view = LazyModule('katello.client.core.content_view')
+content_view_definition = LazyModule('katello.client.core.content_view_definition')
+content_filter = LazyModule('katello.client.core.filter')
+distributor = LazyModule('katello.client.core.distributor')
+distributor_custom_info = LazyModule('katello.client.core.distributor_custom_info')
 
 def setup_admin(katello_cmd, mode=get_katello_mode()):
     # pylint: disable=R0912,R0914,R0915
@@ -158,10 +160,12 @@ def setup_admin(katello_cmd, mode=get_katello_mode()):
         repo_cmd.add_command('delete', repo.Delete())
         repo_cmd.add_command('status', repo.Status())
         repo_cmd.add_command('synchronize', repo.Sync())
+        repo_cmd.add_command('bulk_synchronize', repo.BulkSync())
         repo_cmd.add_command('cancel_sync', repo.CancelSync())
         repo_cmd.add_command('enable', repo.Enable(True))
         repo_cmd.add_command('disable', repo.Enable(False))
         repo_cmd.add_command('content_upload', repo.ContentUpload())
+        repo_cmd.add_command('content_upload_cleanup', repo.ContentUploadCleanup())
         katello_cmd.add_command('repo', repo_cmd)
 
     if mode == 'katello':
@@ -203,6 +207,7 @@ def setup_admin(katello_cmd, mode=get_katello_mode()):
     system_cmd = system.System()
     system_cmd.add_command('list', system.List())
     system_cmd.add_command('register', system.Register())
+    system_cmd.add_command('bulk_register', system.BulkRegister())
     system_cmd.add_command('unregister', system.Unregister())
     system_cmd.add_command('subscriptions', system.Subscriptions())
     system_cmd.add_command('subscribe', system.Subscribe())
@@ -217,6 +222,7 @@ def setup_admin(katello_cmd, mode=get_katello_mode()):
         system_cmd.add_command('tasks', system.TasksList())
         system_cmd.add_command('task', system.TaskInfo())
         system_cmd.add_command('packages', system.InstalledPackages())
+        system_cmd.add_command('bulk_packages', system.BulkPackages())
     system_cmd.add_command('add_to_groups', system.AddSystemGroups())
     system_cmd.add_command('remove_from_groups', system.RemoveSystemGroups())
     custom_info_cmd = system.CustomInfo()
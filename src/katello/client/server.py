@@ -13,15 +13,21 @@
 # granted to use or replicate Red Hat trademarks that are incorporated
 # in this software or its documentation.
 
+import atexit
 import base64
 import kerberos
 from kerberos import GSSError
 import httplib
 import logging
 import os
+import socket
+import threading
+import time
 import urllib
 import mimetypes
+import urlparse
 import sys
+import zlib
 
 try:
     import json
@@ -29,19 +35,161 @@ except ImportError:
     import simplejson as json
 
 from M2Crypto import SSL, httpslib
+from M2Crypto import threading as m2threading
 
 from katello.client.logutil import getLogger
 from katello.client.lib.utils.encoding import u_str
+from katello.client.lib.utils.io import iter_json_array
+
+# openssl needs locking callbacks to be used from more threads at once
+m2threading.init()
+atexit.register(m2threading.cleanup)
 
 # current active server -------------------------------------------------------
 
 active_server = None
+_thread_servers = threading.local()
 
 
-def set_active_server(server):
+def set_active_server(server, thread_local=False):
+    """
+    Set the server the api calls are sent to.
+    @type thread_local: bool
+    @param thread_local: the server is used only by the current thread,
+                         other threads keep using the global active server
+    """
     global active_server
     assert isinstance(server, KatelloServer)
-    active_server = server
+    if thread_local:
+        _thread_servers.server = server
+    else:
+        active_server = server
+
+
+def get_active_server():
+    """
+    @rtype: KatelloServer
+    @return: server set for the current thread or the global active server
+    """
+    return getattr(_thread_servers, 'server', None) or active_server
+
+# modification listeners ------------------------------------------------------
+
+modification_listeners = []
+
+
+def add_modification_listener(listener):
+    """
+    Register a function called after every successful request that modifies
+    data on the server (any method but GET and HEAD). The function gets
+    the request method and path as its arguments.
+    """
+    if listener not in modification_listeners:
+        modification_listeners.append(listener)
+
+
+def _notify_modification(method, url):
+    if method in ('GET', 'HEAD'):
+        return
+    path = urlparse.urlparse(url)[2]
+    for listener in modification_listeners:
+        listener(method, path)
+
+# connection pool -------------------------------------------------------------
+
+class ConnectionPool(object):
+    """
+    Pool of persistent (HTTP/1.1 keep-alive) connections.
+
+    Connections are kept per key, where the key identifies the host, port,
+    protocol and authentication strategy the connection was made with.
+    The pool is shared by all server instances, so the connections survive
+    between commands run in the katello shell.
+
+    @ivar max_per_host: maximum number of idle connections kept for one key
+    @ivar idle_timeout: number of seconds an idle connection is kept open
+    """
+
+    def __init__(self, max_per_host=4, idle_timeout=15):
+        self.max_per_host = max_per_host
+        self.idle_timeout = idle_timeout
+        self.__idle = {}
+        self.__lock = threading.Lock()
+        self._log = getLogger('katello')
+
+    def acquire(self, key, factory):
+        """
+        Get an idle connection for the key or create a new one
+        @type key: tuple
+        @param key: pool key of the connection
+        @type factory: function
+        @param factory: function creating a new connection
+        @rtype: (HTTPConnection, bool)
+        @return: tuple of the connection and flag whether it was reused
+        """
+        with self.__lock:
+            self.__evict_idle(time.time())
+            idle = self.__idle.get(key)
+            if idle:
+                connection = idle.pop()[0]
+                return (connection, True)
+        return (factory(), False)
+
+    def release(self, key, connection):
+        """
+        Return a connection with a completely read response back to the pool
+        """
+        with self.__lock:
+            idle = self.__idle.setdefault(key, [])
+            if len(idle) < self.max_per_host:
+                idle.append((connection, time.time()))
+                return
+        self.discard(connection)
+
+    def discard(self, connection):
+        """
+        Close a connection that can't be reused
+        """
+        try:
+            connection.close()
+        except (socket.error, httplib.HTTPException):
+            self._log.debug("failed to close connection cleanly")
+
+    def ensure_capacity(self, connections):
+        """
+        Keep at least the number of idle connections per key, so that
+        more threads sending requests at once can all reuse their
+        connections. Doesn't enable pooling when it's switched off.
+        """
+        if self.max_per_host:
+            self.max_per_host = max(self.max_per_host, connections)
+
+    def clear(self):
+        """
+        Close all idle connections
+        """
+        with self.__lock:
+            idle, self.__idle = self.__idle, {}
+        for connections in idle.values():
+            for connection, __ in connections:
+                self.discard(connection)
+
+    def __evict_idle(self, now):
+        for key, connections in self.__idle.items():
+            fresh = []
+            for connection, released in connections:
+                if now - released > self.idle_timeout:
+                    self.discard(connection)
+                else:
+                    fresh.append((connection, released))
+            if fresh:
+                self.__idle[key] = fresh
+            else:
+                del self.__idle[key]
+
+
+connection_pool = ConnectionPool()
+atexit.register(connection_pool.clear)
 
 # authentication strategies ---------------------------------------------------
 
@@ -60,6 +208,13 @@ class AuthenticationStrategy(object):
     def set_headers(cls, headers):
         return headers
 
+    def connection_key(self):
+        """
+        Identification of the strategy used for pooling the connections
+        @rtype: tuple
+        """
+        return (self.__class__.__name__,)
+
     def connect(self, host, port, protocol):
         return self._get_connection(host, port, protocol)
 
@@ -76,6 +231,9 @@ class BasicAuthentication(AuthenticationStrategy):
         self.__username = username
         self.__password = password
 
+    def connection_key(self):
+        return (self.__class__.__name__, self.__username)
+
     def set_headers(self, headers):
         raw = ':'.join((self.__username, self.__password))
         encoded = base64.encodestring(raw)[:-1]
@@ -87,8 +245,34 @@ class BasicAuthentication(AuthenticationStrategy):
         return self._get_connection(host, port, protocol)
 
 
+class ResumableHTTPSConnection(httpslib.HTTPSConnection):
+    """
+    HTTPS connection that resumes the TLS session negotiated by a previous
+    connection to the same host, so that the full handshake is skipped.
+    """
+
+    def __init__(self, host, port, sessions, **ssl):
+        """
+        @type sessions: dict
+        @param sessions: cache of TLS sessions shared by connections made
+        with the same ssl context, {(host, port): session}
+        """
+        httpslib.HTTPSConnection.__init__(self, host, port, **ssl)
+        self.__sessions = sessions
+
+    def connect(self):
+        self.set_session(self.__sessions.get((self.host, self.port)))
+        httpslib.HTTPSConnection.connect(self)
+        self.__sessions[(self.host, self.port)] = self.get_session()
+
+
 class SSLAuthentication(AuthenticationStrategy):
 
+    # ssl contexts loaded with certificates, shared by all instances
+    # {(certfile, keyfile): ((cert mtime, key mtime), context, tls sessions)}
+    _contexts = {}
+    _contexts_lock = threading.Lock()
+
     def __init__(self, certfile, keyfile):
         super(SSLAuthentication, self).__init__()
         self.__certfile = certfile
@@ -103,13 +287,35 @@ class SSLAuthentication(AuthenticationStrategy):
             raise RuntimeError(_('key file %s does not exist or cannot be read')
                                % self.__keyfile)
 
+    def __get_ssl_context(self):
+        """
+        Return ssl context with the certificate and key loaded and the cache
+        of TLS sessions made with it. The context is created only once and
+        reloaded when the certificate or key file changes.
+        @rtype: (SSL.Context, dict)
+        """
+        key = (self.__certfile, self.__keyfile)
+        mtimes = (os.path.getmtime(self.__certfile), os.path.getmtime(self.__keyfile))
+
+        with self._contexts_lock:
+            cached = self._contexts.get(key)
+            if cached is None or cached[0] != mtimes:
+                self._log.debug('loading SSL context with: %s, %s' % (self.__certfile, self.__keyfile))
+                ssl_context = SSL.Context('sslv3')
+                ssl_context.load_cert(self.__certfile, self.__keyfile)
+                cached = (mtimes, ssl_context, {})
+                self._contexts[key] = cached
+            return cached[1], cached[2]
+
+    def connection_key(self):
+        return (self.__class__.__name__, self.__certfile, self.__keyfile)
+
     def connect(self, host, port, protocol):
         if protocol != "https":
             raise RuntimeError(_("can't authenticate via certificate when not using https connection"))
-        ssl_context = SSL.Context('sslv3')
-        ssl_context.load_cert(self.__certfile, self.__keyfile)
+        ssl_context, sessions = self.__get_ssl_context()
         self._log.debug('making SSL connection with: %s, %s' % (self.__certfile, self.__keyfile))
-        return httpslib.HTTPSConnection(host, port, ssl_context=ssl_context)
+        return ResumableHTTPSConnection(host, port, sessions, ssl_context=ssl_context)
 
 
 class KerberosAuthentication(AuthenticationStrategy):
@@ -133,7 +339,205 @@ class KerberosAuthentication(AuthenticationStrategy):
 
     def connect(self, host, port, protocol):
         self._log.debug('making %s https connection with' % protocol)
-        self._get_connection(host, port, protocol)
+        return self._get_connection(host, port, protocol)
+
+
+# request encoding ------------------------------------------------------------
+
+class MultipartBody(object):
+    """
+    Streamed multipart/form-data request body. Files are not loaded to
+    memory, their content is read block by block while the body is sent,
+    so the length of the body is computed upfront from sizes of the files.
+
+    The body is file-like, httplib sends it in blocks returned by read().
+    """
+
+    BLOCK_SIZE = 64 * 1024
+
+    def __init__(self, fields, boundary):
+        """
+        @type fields: [(string, string or file)]
+        @param fields: list of tuples of the field name and field value
+        @type boundary: string
+        @param boundary: boundary separating the parts
+        """
+        self.boundary = boundary
+        self.__parts = []
+        for (key, value) in fields:
+            header = ['--' + boundary]
+            if isinstance(value, file):
+                header.append('Content-Disposition: form-data; name="%s"; filename="%s"' % (str(key), str(value.name)))
+                header.append('Content-Type: %s' % KatelloServer._get_content_type(value.name))
+                size = os.fstat(value.fileno()).st_size - value.tell()
+                self.__parts.append(('\r\n'.join(header + ['', '']), value, value.tell(), size))
+            else:
+                if isinstance(value, unicode):
+                    value = value.encode('utf-8')
+                value = str(value)
+                header.append('Content-Disposition: form-data; name="%s"' % str(key))
+                self.__parts.append(('\r\n'.join(header + ['', '']), value, None, len(value)))
+        self.__trailer = '--' + boundary + '--\r\n'
+        self.__blocks = iter(self)
+        self.__buffer = ''
+
+    def __len__(self):
+        return sum([len(header) + size + 2 for header, __, __, size in self.__parts]) + len(self.__trailer)
+
+    def __str__(self):
+        return "<multipart body of %d bytes>" % len(self)
+
+    def __iter__(self):
+        """
+        Generate the body in blocks: headers of the parts, contents of the
+        fields and the files split to blocks and the boundaries
+        """
+        for header, value, offset, size in self.__parts:
+            yield header
+            if offset is None:
+                yield value
+            else:
+                value.seek(offset)
+                left = size
+                while left > 0:
+                    block = value.read(min(self.BLOCK_SIZE, left))
+                    if not block:
+                        raise IOError("file %s was truncated while it was sent" % value.name)
+                    left -= len(block)
+                    yield block
+            yield '\r\n'
+        yield self.__trailer
+
+    def rewind(self):
+        """
+        Start reading the body from its beginning again, eg. when the
+        request is repeated
+        """
+        self.__blocks = iter(self)
+        self.__buffer = ''
+
+    def read(self, size=-1):
+        """
+        Read at most size bytes of the body, everything if size is negative
+        """
+        if size < 0:
+            data = self.__buffer + ''.join(self.__blocks)
+            self.__buffer = ''
+            return data
+        while not self.__buffer:
+            try:
+                self.__buffer = self.__blocks.next()
+            except StopIteration:
+                return ''
+        data, self.__buffer = self.__buffer[:size], self.__buffer[size:]
+        return data
+
+
+# response decoding -----------------------------------------------------------
+
+class DecompressingReader(object):
+    """
+    File-like reader of a response body. Bodies with gzip or deflate
+    content encoding are decompressed block by block as they are read.
+    """
+
+    BLOCK_SIZE = 64 * 1024
+
+    def __init__(self, response):
+        self.__response = response
+        self.__buffer = ''
+        self.__decompressed = False
+        self.__encoding = (response.getheader('content-encoding') or '').strip().lower()
+        if self.__encoding == 'gzip':
+            self.__decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif self.__encoding == 'deflate':
+            self.__decompressor = zlib.decompressobj()
+        else:
+            self.__decompressor = None
+
+    def read(self, size=-1):
+        """
+        Read at most size bytes of the decoded body, everything if size is negative
+        """
+        if self.__decompressor is None and not self.__buffer:
+            if size < 0:
+                return self.__response.read()
+            return self.__response.read(size)
+
+        if size < 0:
+            data, self.__buffer = self.__buffer, ''
+            if self.__decompressor is not None:
+                # the rest is decompressed at once rather than block by block,
+                # so that the decoded body isn't held twice, in blocks and joined
+                raw = self.__response.read()
+                body = self.__decompress(raw)
+                del raw
+                body += self.__decompressor.flush()
+                self.__decompressor = None
+                data = data + body if data else body
+            return data
+
+        while len(self.__buffer) < size:
+            block = self.__read_block()
+            if not block:
+                break
+            self.__buffer += block
+        data, self.__buffer = self.__buffer[:size], self.__buffer[size:]
+        return data
+
+    def __read_block(self):
+        """
+        Return next decompressed block of the body, empty string at the end
+        """
+        while self.__decompressor is not None:
+            raw = self.__response.read(self.BLOCK_SIZE)
+            if not raw:
+                data = self.__decompressor.flush()
+                self.__decompressor = None
+                return data
+            data = self.__decompress(raw)
+            if data:
+                return data
+        return ''
+
+    def __decompress(self, raw):
+        try:
+            data = self.__decompressor.decompress(raw)
+            self.__decompressed = True
+            return data
+        except zlib.error:
+            if self.__encoding != 'deflate' or self.__decompressed:
+                raise
+            # some servers send raw deflate streams without the zlib header
+            self.__encoding = 'raw deflate'
+            self.__decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+            return self.__decompressor.decompress(raw)
+
+class ResponseStream(object):
+    """
+    File-like body of a response read as it arrives, decompressed when
+    needed. The connection is released once the stream is closed.
+
+    @ivar length: size of the body in bytes or None when it's not known
+    """
+
+    def __init__(self, response, release):
+        self.__reader = DecompressingReader(response)
+        self.__release = release
+        self.length = None
+        if not response.getheader('content-encoding') and response.getheader('content-length'):
+            try:
+                self.length = int(response.getheader('content-length'))
+            except ValueError:
+                pass
+
+    def read(self, size=-1):
+        return self.__reader.read(size)
+
+    def close(self):
+        if self.__release is not None:
+            self.__release()
+            self.__release = None
 
 
 # base server class -----------------------------------------------------------
@@ -153,14 +557,29 @@ class KatelloServer(object):
     """
     Katello server connection class.
 
+    Once configured, the server can be used from more threads at once.
+    Headers of every request are assembled separately and connections are
+    taken from the shared, thread-safe L{ConnectionPool}.
+
     @ivar host: host name of the katello server
     @ivar port: port the katello server is listening on (443)
     @ivar protocol: protocol the katello server is using (http, https)
     @ivar path_prefix: mount point of the katello api (/katello/api)
     @ivar headers: dictionary of http headers to send in requests
+    @ivar compress_requests: send large request bodies gzipped
+    @ivar response_cache: L{ResponseCache} used for cacheable GET requests, or None
     """
     auth_method = NoAuthentication()
 
+    # minimal size of a request body that is sent compressed
+    COMPRESSION_THRESHOLD = 64 * 1024
+
+    # errors raised when a kept-alive connection was closed by the server
+    STALE_CONNECTION_ERRORS = (socket.error, httplib.BadStatusLine, httplib.CannotSendRequest, SSL.SSLError)
+
+    # requests that may be sent again even when the server could have processed them
+    IDEMPOTENT_METHODS = ('GET', 'HEAD')
+
     #---------------------------------------------------------------------------
     def __init__(self, host, port=443, protocol='https', path_prefix='', accept_lang=None):
         assert protocol in ('http', 'https')
@@ -170,8 +589,11 @@ class KatelloServer(object):
         self.protocol = protocol
         self.path_prefix = path_prefix
         self.headers = {}
+        self.compress_requests = False
+        self.response_cache = None
 
         default_headers = {'Accept': 'application/json',
+                           'Accept-Encoding': 'gzip, deflate',
                            'content-type': 'application/json',
                            'User-Agent': 'katello-cli/0.1'}
         self.headers.update(default_headers)
@@ -185,15 +607,32 @@ class KatelloServer(object):
     def set_auth_method(self, auth_method):
         self.auth_method = auth_method
 
+    def set_compression(self, accept_compressed=True, compress_requests=False):
+        """
+        Set up compression of the transferred data
+        @type accept_compressed: boolean
+        @param accept_compressed: ask the server for gzip or deflate encoded responses
+        @type compress_requests: boolean
+        @param compress_requests: send large request bodies gzipped
+        """
+        if accept_compressed:
+            self.headers['Accept-Encoding'] = 'gzip, deflate'
+        else:
+            self.headers.pop('Accept-Encoding', None)
+        self.compress_requests = compress_requests
+
     # protected server connection methods -------------------------------------
 
     def _connect(self):
-        # make an appropriate connection to the server and cache it
+        # make an appropriate connection to the server
         return self.auth_method.connect(self.host, self.port, self.protocol)
 
-    def _set_auth_headers(self):
+    def _connection_key(self):
+        return (self.host, self.port, self.protocol) + self.auth_method.connection_key()
+
+    def _set_auth_headers(self, headers):
         try:
-            self.auth_method.set_headers(self.headers)
+            self.auth_method.set_headers(headers)
         except GSSError, e:
             #TODO
             raise Exception(_("Missing credentials and unable to authenticate using Kerberos"), e), \
@@ -207,17 +646,17 @@ class KatelloServer(object):
     # protected request utilities ---------------------------------------------
 
     def _build_url(self, path, queries=None):
-        if queries is None:
-            queries = {}
         # build the request url from the path and queries dict or tuple
         if not path.startswith(self.path_prefix):
             path = '/'.join((self.path_prefix, path))
 
         # make sure the path is ascii and uses appropriate characters
         path = urllib.quote(path.encode('utf-8'))
-        for key, value in queries.items():
-            if isinstance(value, basestring):
-                queries[key] = value.encode('utf-8')
+        # the caller's queries are left untouched, they may be shared by more threads
+        if isinstance(queries, dict):
+            queries = queries.items()
+        queries = [(key, value.encode('utf-8') if isinstance(value, basestring) else value)
+                   for key, value in (queries or [])]
 
         queries = urllib.urlencode(queries)
         if queries:
@@ -225,29 +664,185 @@ class KatelloServer(object):
         return path
 
 
-    def _request(self, method, path, queries=None, body=None, multipart=False, custom_headers=None):
+    def _request(self, method, path, queries=None, body=None, multipart=False, custom_headers=None, stream=False,
+                 cache=False, raw=False):
         if queries is None:
             queries = {}
         if custom_headers is None:
             custom_headers = {}
         # make a request to the server and return the response
-        connection = self._connect()
         url = self._build_url(path, queries)
 
         content_type, body = self._prepare_body(body, multipart)
 
-        self.headers['content-type']   = content_type
-        self.headers['content-length'] = str(len(body) if body else 0)
-        self._set_auth_headers()
+        # headers are assembled per request, so that the server can be used
+        # from more threads at once
+        headers = dict(self.headers)
+        headers['content-type']   = content_type
+        headers['content-length'] = str(len(body) if body else 0)
+        self._set_auth_headers(headers)
 
         if body:
             self._log.debug("sending %s request to %s\n%s" % (method, url, body))
         else:
             self._log.debug("sending empty %s request to %s" % (method, url))
 
-        connection.request(method, url, body=body, headers=dict(self.headers.items() + custom_headers.items()))
-        return self._process_response(connection.getresponse())
+        headers.update(custom_headers)
 
+        if cache and method == 'GET' and self.response_cache is not None:
+            return self._cached_request(url, headers)
+
+        if self._should_compress(method, body):
+            compressed_body = self._compress_body(body)
+            compressed_headers = dict(headers)
+            compressed_headers['content-encoding'] = 'gzip'
+            compressed_headers['content-length'] = str(len(compressed_body))
+            try:
+                return self._send(method, url, compressed_body, compressed_headers, stream)
+            except ServerRequestError, e:
+                if e.args[0] != httplib.UNSUPPORTED_MEDIA_TYPE:
+                    raise
+                self._log.debug("server does not accept compressed requests, sending uncompressed")
+                self.compress_requests = False
+
+        return self._send(method, url, body, headers, stream, raw)
+
+    def _cached_request(self, url, headers):
+        """
+        Send a GET request through the response cache. Fresh cached responses
+        are returned without contacting the server, stale ones are revalidated
+        with a conditional request.
+        """
+        key = self.response_cache.key(self.identity(), url)
+        entry = self.response_cache.get(key)
+        if entry is not None:
+            if self.response_cache.is_fresh(entry):
+                self._log.debug("using cached response for %s" % url)
+                return (entry['status'], entry['body'], entry['headers'])
+            headers = dict(headers.items() + self.response_cache.validators(entry).items())
+
+        status, body, response_headers = self._send('GET', url, None, headers)
+        if status == httplib.NOT_MODIFIED and entry is not None:
+            self._log.debug("cached response for %s is still valid" % url)
+            entry = self.response_cache.revalidated(key, entry, response_headers)
+            return (entry['status'], entry['body'], entry['headers'])
+
+        self.response_cache.store(key, status, body, response_headers)
+        return (status, body, response_headers)
+
+    def identity(self):
+        """
+        Identification of the server and user, data fetched for different
+        users are cached separately
+        @rtype: tuple
+        """
+        return self._connection_key() + (self.path_prefix, self.headers.get('Accept-Language'))
+
+    def _send(self, method, url, body, headers, stream=False, raw=False):
+        """
+        Send the request over a pooled connection and process the response
+        """
+        key = self._connection_key()
+        connection, reused = connection_pool.acquire(key, self._connect)
+        connection, response = self._send_request(connection, reused, method, url, body, headers)
+        if raw and response.status < 300:
+            self._log.debug("streaming raw response %s" % response.status)
+            return (response.status, ResponseStream(response, lambda: self._release_connection(key, connection, response)),
+                response.getheaders())
+        if stream and response.status < 300:
+            self._log.debug("streaming response %s" % response.status)
+            return (response.status, self._iter_response_items(key, connection, response), response.getheaders())
+        try:
+            result = self._process_response(response)
+        finally:
+            self._release_connection(key, connection, response)
+        _notify_modification(method, url)
+        return result
+
+    def _iter_response_items(self, key, connection, response):
+        """
+        Generator decoding items of a json array in the response body as
+        they arrive. The connection is released once the body is consumed.
+        """
+        reader = DecompressingReader(response)
+        try:
+            for item in iter_json_array(reader):
+                yield item
+            # consume trailing whitespace so that the connection can be reused
+            reader.read()
+        finally:
+            self._release_connection(key, connection, response)
+
+    def _send_request(self, connection, reused, method, url, body, headers):
+        """
+        Send the request and wait for the response. A reused connection
+        that was meanwhile closed by the server is transparently replaced
+        with a new one. The request is sent again only when the server
+        could not have received it, or when repeating it is harmless.
+        @rtype: (HTTPConnection, HTTPResponse)
+        @return: tuple of the connection used and the response of the server
+        """
+        body_offset = body.tell() if isinstance(body, file) else None
+        try:
+            connection.request(method, url, body=body, headers=headers)
+            return (connection, connection.getresponse())
+        except self.STALE_CONNECTION_ERRORS, e:
+            connection_pool.discard(connection)
+            if not (reused and self._can_resend(method, body, e)):
+                raise
+            self._log.debug("connection to %s went stale, reconnecting" % self.host)
+
+        if body_offset is not None:
+            body.seek(body_offset)
+        elif isinstance(body, MultipartBody):
+            body.rewind()
+        connection = self._connect()
+        connection.request(method, url, body=body, headers=headers)
+        return (connection, connection.getresponse())
+
+    @classmethod
+    def _can_resend(cls, method, body, error):
+        """
+        Check whether a request that failed on a stale connection
+        can be sent again on a new one
+        @type error: Exception
+        @param error: error the request failed with
+        @rtype: bool
+        """
+        if not (body is None or isinstance(body, (basestring, file, MultipartBody))):
+            # other bodies can't be rewound to be sent again
+            return False
+        if isinstance(error, httplib.CannotSendRequest):
+            # nothing was sent yet
+            return True
+        if isinstance(error, httplib.BadStatusLine) and error.line in ('', repr('')):
+            # the server closed the connection without reading the request
+            return True
+        # the server might have processed the request before the failure
+        return method in cls.IDEMPOTENT_METHODS
+
+    def _should_compress(self, method, body):
+        """
+        Large json bodies of POST and PUT requests are sent gzipped
+        when request compression is enabled.
+        """
+        return self.compress_requests and method in ('POST', 'PUT') and \
+            isinstance(body, str) and len(body) >= self.COMPRESSION_THRESHOLD
+
+    @classmethod
+    def _compress_body(cls, body):
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        return compressor.compress(body) + compressor.flush()
+
+    @classmethod
+    def _release_connection(cls, key, connection, response):
+        """
+        Return the connection to the pool if it can serve another request
+        """
+        if response.isclosed() and not response.will_close:
+            connection_pool.release(key, connection)
+        else:
+            connection_pool.discard(connection)
 
 
     def _prepare_body(self, body, multipart):
@@ -257,7 +852,7 @@ class KatelloServer(object):
         @param body: data to encode
         @type multipart: boolean
         @param multipart: set True for multipart requests
-        @rtype: (string, string)
+        @rtype: (string, string or MultipartBody)
         @return: tuple of the content type and the encoded body
         """
         content_type = 'application/json'
@@ -278,7 +873,7 @@ class KatelloServer(object):
         @rtype: (int, string)
         @return: tuple of the response status and response body
         """
-        response_body = response.read()
+        response_body = DecompressingReader(response).read()
         try:
             response_body = json.loads(response_body, encoding='utf-8')
         except ValueError:
@@ -297,7 +892,7 @@ class KatelloServer(object):
         else:
             self._log.debug("processing empty response %s" % (response.status))
 
-        if response.status >= 300:
+        if response.status >= 300 and response.status != httplib.NOT_MODIFIED:
             # if the server has responded with a python traceback
             # try to split it out
             if isinstance(response_body, basestring) and not response_body.startswith('<html'): # pylint: disable=E1103
@@ -352,33 +947,13 @@ class KatelloServer(object):
         Encode data for httplib request
         @type data: any
         @param data: data to encode for the request
-        @rtype: (string, string)
-        @return: tuple of the content type and encoded data
+        @rtype: (string, MultipartBody)
+        @return: tuple of the content type and the streamed body
         """
         fields = self._flatten_to_multipart(None, data)
 
         boundary = '----------BOUNDARY_$'
-        lines = []
-
-        for (key, value) in fields:
-            if isinstance(value, (file)):
-                filename = value.name
-                content  = value.read()
-
-                lines.append('--' + boundary)
-                lines.append('Content-Disposition: form-data; name="%s"; filename="%s"' % (str(key), str(filename)))
-                lines.append('Content-Type: %s' % self._get_content_type(filename))
-                lines.append('')
-                lines.append(content)
-            else:
-                lines.append('--' + boundary)
-                lines.append('Content-Disposition: form-data; name="%s"' % str(key))
-                lines.append('')
-                lines.append(value)
-        lines.append('--' + boundary + '--')
-        lines.append('')
-
-        body = '\r\n'.join(lines)
+        body = MultipartBody(fields, boundary)
         content_type = 'multipart/form-data; boundary=%s' % boundary
         return content_type, body
 
@@ -408,7 +983,7 @@ class KatelloServer(object):
         """
         return self._request('DELETE', path, body=body)
 
-    def GET(self, path, queries=None, custom_headers=None):
+    def GET(self, path, queries=None, custom_headers=None, stream=False, cache=False, raw=False):
         """
         Send a GET request to the katello server.
         @type path: str
@@ -418,11 +993,20 @@ class KatelloServer(object):
                         query parameters in the request
         @type custom_headers: dict or iterable of tuple pairs
         @param custom_headers: custom headers
+        @type stream: boolean
+        @param stream: when True, the response body (a json array) is decoded
+                       incrementally and returned as a generator of its items
+        @type cache: boolean
+        @param cache: when True, the response is stored in the response cache
+                      and revalidated with conditional requests next time
+        @type raw: boolean
+        @param raw: when True, the response body is not decoded but returned
+                    as a L{ResponseStream} to be read as it arrives
         @rtype: (int, dict or None or str)
         @return: tuple of the http response status and the response body
         @raise ServerRequestError: if the request fails
         """
-        return self._request('GET', path, queries, custom_headers=custom_headers)
+        return self._request('GET', path, queries, custom_headers=custom_headers, stream=stream, cache=cache, raw=raw)
 
     def HEAD(self, path):
         """
@@ -17,12 +17,16 @@ import os
 import readline
 import re
 import sys
+import threading
+import time
+import Queue
 from cmd import Cmd
 import ConfigParser
 
 from katello.client.completion import Completion
 from katello.client.config import Config, ConfigFileError
 from katello.client.core.base import Command
+from katello.client.lib.utils.concurrency import ThreadLocalStream
 from katello.client.lib.utils.encoding import encode_stream, stdout_origin
 
 class KatelloShell(Cmd):
@@ -212,3 +216,206 @@ class KatelloShell(Cmd):
     def __replace_last_history_item(self, replace_with):
         self.__remove_last_history_item()
         readline.add_history(replace_with)
+
+
+class BatchShell(object):
+    """
+    Non-interactive counterpart of the L{KatelloShell}. Runs commands read
+    from a script line by line in a single process, so that the connection
+    to the server and caches of looked up records are shared by all the
+    commands. Empty lines and lines starting with # are skipped.
+
+    With more than one worker the commands are expected to be independent
+    and run concurrently. Every worker runs the commands with its own cli
+    created by the cli_factory, so that state of the actions and the active
+    server aren't shared between threads. Output of each command is
+    captured and printed at once, either in the order of the script
+    or as the commands finish.
+
+    @ivar admin_cli: cli the commands are run with
+    @ivar continue_on_error: keep running after a command fails
+    @ivar verbose: report exit code and duration of every command
+    @ivar workers: number of commands run at once
+    @ivar ordered: print output of concurrently run commands in the script order
+    @ivar cli_factory: function creating a cli for a worker
+    @ivar results: list of L{BatchResult}s of the executed commands
+    """
+
+    EXIT_COMMANDS = ("quit", "exit")
+
+    # pylint: disable=R0913
+    def __init__(self, admin_cli, continue_on_error=False, verbose=False, report_stream=None,
+                 workers=1, ordered=True, cli_factory=None):
+        self.admin_cli = admin_cli
+        self.continue_on_error = continue_on_error
+        self.verbose = verbose
+        self.report_stream = report_stream or sys.stderr
+        self.workers = workers
+        self.ordered = ordered
+        self.cli_factory = cli_factory
+        self.results = []
+        self.__output_lock = threading.Lock()
+        self.__pending = {}
+        self.__next_index = 0
+        self.__streams = None
+
+    def run(self, script):
+        """
+        Execute all commands of the script
+        @type script: iterable
+        @param script: lines of the script, eg. an open file
+        @rtype: int
+        @return: exit code of the first failed command or os.EX_OK
+        """
+        start = time.time()
+        commands = self.read_commands(script)
+        if self.workers > 1 and self.cli_factory is not None:
+            self.run_parallel(list(commands))
+        else:
+            for line_number, line in commands:
+                result = self.run_line(self.admin_cli, line_number, line)
+                self.report_result(result)
+                if result.failed() and not self.continue_on_error:
+                    break
+
+        self.print_summary(time.time() - start)
+        failed = self.failed_results()
+        return failed[0].exit_code if failed else os.EX_OK
+
+    @classmethod
+    def read_commands(cls, script):
+        """
+        @return: generator of tuples (line number, command)
+        """
+        for line_number, line in enumerate(script):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            if line.split()[0] in cls.EXIT_COMMANDS:
+                return
+            yield (line_number + 1, line)
+
+    def run_line(self, cli, line_number, line):
+        """
+        @rtype: BatchResult
+        """
+        start = time.time()
+        try:
+            exit_code = cli.main(line)
+        except SystemExit, se:
+            # some errors exit the cli, but only the command should end
+            exit_code = se.code
+        if not isinstance(exit_code, int):
+            exit_code = 1 if exit_code else os.EX_OK
+        result = BatchResult(line_number, line, exit_code, time.time() - start)
+        self.results.append(result)
+        return result
+
+    def run_parallel(self, commands):
+        """
+        Run the commands on a pool of workers. When a command fails and
+        the script shouldn't continue, no more commands are started.
+        """
+        queue = Queue.Queue()
+        for index, command in enumerate(commands):
+            queue.put((index, command))
+        stop = []
+
+        def worker(cli):
+            while not stop:
+                try:
+                    index, (line_number, line) = queue.get_nowait()
+                except Queue.Empty:
+                    return
+                for stream in self.__streams:
+                    stream.capture()
+                try:
+                    result = self.run_line(cli, line_number, line)
+                finally:
+                    output = [stream.release() for stream in self.__streams]
+                self.__emit(index, result, output)
+                if result.failed() and not self.continue_on_error:
+                    stop.append(result)
+
+        # the clis are created upfront, so that errors surface in the main thread
+        clis = [self.cli_factory() for __ in range(min(self.workers, len(commands)))]
+        self.__streams = (ThreadLocalStream(sys.stdout), ThreadLocalStream(sys.stderr))
+        sys.stdout, sys.stderr = self.__streams
+        try:
+            threads = [threading.Thread(target=worker, args=(cli,)) for cli in clis]
+            for thread in threads:
+                thread.daemon = True
+                thread.start()
+            for thread in threads:
+                # join with a timeout keeps the main thread responsive to Ctrl+C
+                while thread.is_alive():
+                    thread.join(0.1)
+        finally:
+            sys.stdout, sys.stderr = [stream.stream for stream in self.__streams]
+            # commands following a failed one may have finished before it
+            with self.__output_lock:
+                for index in sorted(self.__pending.keys()):
+                    self.__print_result(*self.__pending.pop(index))
+        self.results.sort(key=lambda result: result.line_number)
+
+    def __emit(self, index, result, output):
+        """
+        Print output of a command run by a worker
+        """
+        with self.__output_lock:
+            if not self.ordered:
+                self.__print_result(result, output)
+                return
+            self.__pending[index] = (result, output)
+            while self.__next_index in self.__pending:
+                self.__print_result(*self.__pending.pop(self.__next_index))
+                self.__next_index += 1
+
+    def __print_result(self, result, output):
+        for stream, chunks in zip(self.__streams, output):
+            for chunk in chunks:
+                stream.stream.write(chunk)
+            stream.stream.flush()
+        self.report_result(result)
+
+    def report_result(self, result):
+        if self.verbose or result.failed():
+            self.__report(_("line %(line)d: exit code %(code)d (%(duration).2fs): %(command)s") %
+                {'line': result.line_number, 'code': result.exit_code,
+                 'duration': result.duration, 'command': result.command})
+
+    def failed_results(self):
+        return [result for result in self.results if result.failed()]
+
+    def print_summary(self, elapsed):
+        total = sum([result.duration for result in self.results])
+        failed = self.failed_results()
+        self.__report(_("%(count)d commands executed in %(elapsed).2fs, %(failed)d failed") %
+            {'count': len(self.results), 'elapsed': elapsed, 'failed': len(failed)})
+        if not self.results:
+            return
+        slowest = max(self.results, key=lambda result: result.duration)
+        self.__report(_("average %(average).2fs per command, slowest %(slowest).2fs on line %(line)d") %
+            {'average': total / len(self.results), 'slowest': slowest.duration,
+             'line': slowest.line_number})
+        for result in failed:
+            self.__report(_("failed line %(line)d with exit code %(code)d: %(command)s") %
+                {'line': result.line_number, 'code': result.exit_code, 'command': result.command})
+
+    def __report(self, message):
+        print >> self.report_stream, message
+
+
+class BatchResult(object):
+    """
+    Outcome of a command executed by the L{BatchShell}
+    """
+
+    def __init__(self, line_number, command, exit_code, duration):
+        self.line_number = line_number
+        self.command = command
+        self.exit_code = exit_code
+        self.duration = duration
+
+    def failed(self):
+        return self.exit_code != os.EX_OK
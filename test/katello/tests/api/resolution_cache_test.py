@@ -0,0 +1,136 @@
+import unittest
+from mock import Mock
+
+from katello.client.api import utils
+from katello.client.api.utils import ResolutionCache, get_organization, get_repo
+from katello.client.api.organization import OrganizationAPI
+from katello.client.api.environment import EnvironmentAPI
+from katello.client.api.product import ProductAPI
+from katello.client.api.repo import RepoAPI
+
+
+class ResolutionCacheTest(unittest.TestCase):
+
+    KEY = ('product', None, 'get_product', ('ACME', 'Fedora'), ())
+
+    def setUp(self):
+        self.cache = ResolutionCache()
+
+    def test_returns_stored_value(self):
+        self.cache.store(self.KEY, {'id': 1})
+        self.assertEqual((True, {'id': 1}), self.cache.get(self.KEY))
+
+    def test_entries_expire(self):
+        self.cache.store(self.KEY, {'id': 1}, now=1000)
+        self.assertEqual((False, None), self.cache.get(self.KEY, now=1000 + ResolutionCache.TTL['product']))
+
+    def test_modification_of_entity_drops_its_entries(self):
+        self.cache.store(self.KEY, {'id': 1})
+        self.cache.invalidate_path('PUT', '/katello/api/organizations/ACME/products/1')
+        self.assertEqual((False, None), self.cache.get(self.KEY))
+
+    def test_modification_of_other_entity_keeps_entries(self):
+        self.cache.store(self.KEY, {'id': 1})
+        self.cache.invalidate_path('POST', '/katello/api/organizations/ACME/system_groups')
+        self.assertEqual((True, {'id': 1}), self.cache.get(self.KEY))
+
+    def test_modification_drops_dependent_entries(self):
+        key = ('repository', None, 'get_repo', ('ACME', 'repo'), ())
+        self.cache.store(key, {'id': 2})
+        self.cache.invalidate_path('DELETE', '/katello/api/organizations/ACME/environments/3')
+        self.assertEqual((False, None), self.cache.get(key))
+
+    def test_provider_modification_drops_products_and_repositories(self):
+        key = ('repository', None, 'get_repo_id', ('ACME', 'repo'), ())
+        self.cache.store(self.KEY, {'id': 1})
+        self.cache.store(key, 2)
+        self.cache.invalidate_path('POST', '/katello/api/providers/4/import_manifest')
+        self.assertEqual((False, None), self.cache.get(self.KEY))
+        self.assertEqual((False, None), self.cache.get(key))
+
+    def test_changeset_modification_drops_repositories(self):
+        key = ('repository', None, 'get_repo_id', ('ACME', 'repo'), ())
+        self.cache.store(key, 2)
+        self.cache.invalidate_path('POST', '/katello/api/changesets/5/apply')
+        self.assertEqual((False, None), self.cache.get(key))
+
+
+    def test_system_registration_keeps_entries(self):
+        self.cache.store(self.KEY, {'id': 1})
+        self.cache.invalidate_path('POST', '/katello/api/organizations/ACME/systems')
+        self.assertEqual((True, {'id': 1}), self.cache.get(self.KEY))
+
+    def test_package_action_keeps_entries(self):
+        self.cache.store(self.KEY, {'id': 1})
+        self.cache.invalidate_path('POST', '/katello/api/systems/1234-abcd/packages')
+        self.cache.invalidate_path('POST', '/katello/api/organizations/ACME/systems/1234-abcd/packages')
+        self.assertEqual((True, {'id': 1}), self.cache.get(self.KEY))
+
+    def test_organization_modification_drops_all_entries(self):
+        self.cache.store(self.KEY, {'id': 1})
+        self.cache.invalidate_path('PUT', '/katello/api/organizations/ACME/')
+        self.assertEqual((False, None), self.cache.get(self.KEY))
+
+    def test_repository_set_enabling_drops_repositories(self):
+        key = ('repository', None, 'get_repo_id', ('ACME', 'repo'), ())
+        self.cache.store(key, 2)
+        self.cache.invalidate_path('PUT', '/katello/api/organizations/ACME/products/1/repository_sets/3/enable')
+        self.assertEqual((False, None), self.cache.get(key))
+
+
+class CachedLookupTest(unittest.TestCase):
+
+    ORG = {'name': 'ACME', 'label': 'ACME'}
+
+    def setUp(self):
+        self.original = OrganizationAPI.organization
+        OrganizationAPI.organization = Mock(return_value=self.ORG)
+        utils.resolution_cache.enabled = True
+
+    def tearDown(self):
+        OrganizationAPI.organization = self.original
+        utils.resolution_cache.enabled = False
+        utils.resolution_cache.invalidate()
+
+    def test_repeated_lookup_is_served_from_cache(self):
+        get_organization('ACME')
+        get_organization('ACME')
+        self.assertEqual(1, OrganizationAPI.organization.call_count)
+
+    def test_callers_get_own_copies(self):
+        get_organization('ACME')['name'] = 'changed'
+        self.assertEqual('ACME', get_organization('ACME')['name'])
+
+    def test_disabled_cache_is_bypassed(self):
+        utils.resolution_cache.enabled = False
+        get_organization('ACME')
+        get_organization('ACME')
+        self.assertEqual(2, OrganizationAPI.organization.call_count)
+
+
+class CachedRepoLookupTest(unittest.TestCase):
+
+    def setUp(self):
+        self.originals = [(EnvironmentAPI, 'library_by_org'), (ProductAPI, 'product_by_name_or_label_or_id'),
+                          (RepoAPI, 'repos_by_env_product'), (RepoAPI, 'repo')]
+        self.originals = [(cls, name, getattr(cls, name)) for cls, name in self.originals]
+        EnvironmentAPI.library_by_org = Mock(return_value={'id': 1, 'name': 'Library'})
+        ProductAPI.product_by_name_or_label_or_id = Mock(return_value=[{'id': 2, 'name': 'Fedora'}])
+        RepoAPI.repos_by_env_product = Mock(return_value=[{'id': 3}])
+        RepoAPI.repo = Mock(side_effect=[{'id': 3, 'sync_state': 'running'}, {'id': 3, 'sync_state': 'finished'}])
+        utils.resolution_cache.enabled = True
+
+    def tearDown(self):
+        for cls, name, original in self.originals:
+            setattr(cls, name, original)
+        utils.resolution_cache.enabled = False
+        utils.resolution_cache.invalidate()
+
+    def test_repository_id_is_cached(self):
+        get_repo('ACME', 'repo', 'Fedora')
+        get_repo('ACME', 'repo', 'Fedora')
+        self.assertEqual(1, RepoAPI.repos_by_env_product.call_count)
+
+    def test_repository_details_are_fetched_every_time(self):
+        self.assertEqual('running', get_repo('ACME', 'repo', 'Fedora')['sync_state'])
+        self.assertEqual('finished', get_repo('ACME', 'repo', 'Fedora')['sync_state'])
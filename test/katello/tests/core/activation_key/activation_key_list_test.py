@@ -0,0 +1,45 @@
+import os
+from copy import deepcopy
+
+from katello.tests.core.action_test_utils import CLIActionTestCase
+from katello.tests.core.activation_key import activation_key_data as key_data
+from katello.tests.core.content_view_definition import content_view_definition_data as view_data
+from katello.client.core.activation_key import List
+from katello.client.api.content_view import ContentViewAPI
+
+import katello.client.core.activation_key
+
+
+class ActivationKeyListTest(CLIActionTestCase):
+
+    ORG = 'ACME'
+    VIEWS = view_data.VIEWS
+
+    OPTIONS = {
+        'org': ORG
+    }
+
+    def setUp(self):
+        self.set_action(List())
+        self.set_module(katello.client.core.activation_key)
+        self.mock_printer()
+
+        keys = deepcopy(key_data.ACTIVATION_KEYS)
+        for key in keys:
+            key['usage_count'] = 0
+            key['usage_limit'] = -1
+            key['content_view_id'] = self.VIEWS[0]['id']
+
+        self.mock_options(self.OPTIONS)
+        self.mock(self.action.api, 'activation_keys_by_organization', keys)
+        self.mock(ContentViewAPI, 'content_views_by_org', self.VIEWS)
+        self.mock(self.module, 'get_katello_mode', 'katello')
+
+    def test_it_fetches_content_views_once(self):
+        self.run_action(os.EX_OK)
+        ContentViewAPI.content_views_by_org.assert_called_once_with(self.ORG)
+
+    def test_it_prints_content_view_names(self):
+        self.run_action(os.EX_OK)
+        keys = self.action.printer.print_items.call_args[0][0]
+        self.assertEqual([self.VIEWS[0]['name']] * len(keys), [k['content_view'] for k in keys])
@@ -2,7 +2,8 @@ from unittest import TestCase
 from mock import Mock
 
 
-from katello.client.core.base import CommandContainer
+from katello.client.core.base import CommandContainer, Command, Action, LazyCommand, LazyModule
+from katello.client.config import Config
 
 
 
@@ -30,3 +31,68 @@ class AddSubcommandTest(TestCase):
 
     def test_it_raises_exception_when_subcmd_not_noud(self):
         self.assertRaises(Exception, self.cmd.get_command, "unknown_sub_cmd")
+
+
+class LazyCommandTest(TestCase):
+
+    def setUp(self):
+        self.cmd = CommandContainer()
+        self.lazy_cmd = LazyCommand('katello.client.core.base.Command')
+        self.sub_cmd = CommandContainer()
+        self.lazy_cmd.add_command("sub_cmd", self.sub_cmd)
+        self.cmd.add_command("lazy_cmd", self.lazy_cmd)
+
+    def test_it_lists_lazy_command_name(self):
+        self.assertEqual(["lazy_cmd"], self.cmd.get_command_names())
+
+    def test_it_loads_command_on_lookup(self):
+        self.assertTrue(isinstance(self.cmd.get_command("lazy_cmd"), Command))
+
+    def test_it_loads_command_only_once(self):
+        self.assertTrue(self.cmd.get_command("lazy_cmd") is self.cmd.get_command("lazy_cmd"))
+
+    def test_it_adds_subcommands_to_loaded_command(self):
+        self.assertTrue(self.cmd.get_command("lazy_cmd").get_command("sub_cmd") is self.sub_cmd)
+
+    def test_lazy_module_creates_lazy_commands(self):
+        lazy = LazyModule('katello.client.core.base').Command()
+        self.assertTrue(isinstance(lazy, LazyCommand))
+        self.assertEqual('katello.client.core.base.Command', lazy.path)
+
+
+class LazyUsageTest(TestCase):
+
+    def test_usage_is_built_when_displayed(self):
+        cmd = Command()
+        cmd.usage = Mock(return_value="Usage: katello")
+        parser = cmd.create_parser()
+        self.assertFalse(cmd.usage.called)
+        self.assertEqual("Usage: katello\n", parser.get_usage())
+
+
+class ParserCacheTest(TestCase):
+
+    def setUp(self):
+        self.action = Action()
+        Action.cache_parsers = True
+
+    def tearDown(self):
+        Action.cache_parsers = False
+
+    def test_parser_is_reused(self):
+        self.assertTrue(self.action.get_parser('ping') is self.action.get_parser('ping'))
+
+    def test_parser_is_rebuilt_after_options_are_saved(self):
+        parser = self.action.get_parser('ping')
+        Config.generation += 1
+        self.assertFalse(parser is self.action.get_parser('ping'))
+
+    def test_parser_is_not_cached_by_default(self):
+        Action.cache_parsers = False
+        self.assertFalse(self.action.get_parser('ping') is self.action.get_parser('ping'))
+
+    def test_reused_parser_gives_fresh_options(self):
+        self.action.setup_parser = lambda parser: parser.add_option('--name', dest='name')
+        self.action.process_options(self.action.get_parser('ping'), ['--name', 'first'])
+        self.action.process_options(self.action.get_parser('ping'), [])
+        self.assertEqual(None, self.action.opts.name)
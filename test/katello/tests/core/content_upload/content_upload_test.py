@@ -1,10 +1,20 @@
+import hashlib
 import os
+import shutil
+import socket
+import tempfile
+import threading
+from mock import ANY
 
 from katello.tests.core.content_upload.content_upload_data import CONTENT_UPLOADS
 from katello.tests.core.action_test_utils import CLIOptionTestCase, CLIActionTestCase
 
 import katello.client.core.repo
-from katello.client.core.repo import ContentUpload
+from katello.client.core.repo import ContentUpload, ContentUploadCleanup
+from katello.client.lib.upload_journal import UploadJournal, UploadJournalEntry
+from katello.client.lib.utils.checksum import MultiHash
+from katello.client.lib.ui.progress import TransferProgress
+from katello.client.server import ServerRequestError
 
 
 class RequiredCLIOptionsTests(CLIOptionTestCase):
@@ -26,7 +36,8 @@ class RequiredCLIOptionsTests(CLIOptionTestCase):
         ('--repo=fedora_17_x86_64', '--filepath=/tmp/bear-4.1-1.noarch.rpm', '--content_type=yum', '--product_id=5', '--org=acme', ),
         ('--repo_id=5', '--filepath=/tmp/jdob-valid-1.1.0.tar.gz', '--content_type=puppet', ),
         ('--repo=pforge', '--filepath=/tmp/jdob-valid-1.1.0.tar.gz', '--content_type=puppet', '--product=puppet', '--org=acme', ),
-        ('--repo=pforge', '--filepath=/tmp/jdob-valid-1.1.0.tar.gz', '--content_type=puppet', '--product_id=5', '--org=acme', )
+        ('--repo=pforge', '--filepath=/tmp/jdob-valid-1.1.0.tar.gz', '--content_type=puppet', '--product_id=5', '--org=acme', ),
+        ('--repo_id=1', '--filepath=/tmp/bear-4.1-1.noarch.rpm', '--content_type=yum', '--chunk=4096', '--concurrency=8', )
     ]
 
 
@@ -36,8 +47,13 @@ class ContentUploadTest(CLIActionTestCase):
         self.set_module(katello.client.core.repo)
         self.mock_printer()
         self.mock(self.module, 'generate_puppet_data', [{}, {}])
-        self.mock(self.module, 'generate_rpm_data', [{}, {}])
+        self.mock(self.module, 'generate_rpm_data', [{'checksumtype': 'sha256', 'checksum': None}, {}])
         self.mock(os.path, 'isfile', True)
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        super(ContentUploadTest, self).tearDown()
+        shutil.rmtree(self.directory)
 
     def test_yum_content_upload(self):
         content_upload = CONTENT_UPLOADS[0]
@@ -56,9 +72,12 @@ class ContentUploadTest(CLIActionTestCase):
 
         self.run_action()
         self.action.upload_api.create.assert_called_once_with(repo_id)
-        self.module.generate_rpm_data.assert_called_once()
-        self.action.send_content.assert_called_once_with(repo_id, content_upload["upload_id"], options["filepath"], None)
-        self.action.upload_api.import_into_repo.assert_called_once()
+        self.module.generate_rpm_data.assert_called_once_with(options["filepath"], False)
+        self.action.send_content.assert_called_once_with(repo_id, content_upload["upload_id"], options["filepath"],
+            ContentUpload.DEFAULT_CHUNK, None, None, ANY, self.upload)
+        # send_content is mocked, nothing was hashed
+        self.action.upload_api.import_into_repo.assert_called_once_with(repo_id, content_upload["upload_id"],
+            {'checksumtype': 'sha256', 'checksum': hashlib.sha256('').hexdigest()}, {})
         self.action.upload_api.delete.assert_called_once_with(repo_id, content_upload['upload_id'])
 
     def test_puppet_content_upload(self):
@@ -79,13 +98,15 @@ class ContentUploadTest(CLIActionTestCase):
         self.run_action()
         self.action.upload_api.create.assert_called_once_with(repo_id)
         self.module.generate_puppet_data.assert_called_once()
-        self.action.send_content.assert_called_once_with(repo_id, content_upload["upload_id"], options["filepath"], None)
+        self.action.send_content.assert_called_once_with(repo_id, content_upload["upload_id"], options["filepath"],
+            ContentUpload.DEFAULT_CHUNK, None, None, None, self.upload)
         self.action.upload_api.import_into_repo.assert_called_once()
         self.action.upload_api.delete.assert_called_once_with(repo_id, content_upload['upload_id'])
 
     def test_dir_content_upload(self):
         content_upload = CONTENT_UPLOADS[1]
-        puppet_dir = os.path.join(os.getcwd(), 'test/files/puppet')
+        puppet_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../../../files/puppet')
+        module = {'author': 'jdob', 'name': 'valid', 'version': '1.0.0'}
 
         options = {
             'upload_id': content_upload['upload_id'],
@@ -98,12 +119,16 @@ class ContentUploadTest(CLIActionTestCase):
 
         repo_id = 5
         self._setup_mocks(options, repo_id, content_upload)
+        self.mock(self.module, 'generate_puppet_data', [module, {}])
+        self.mock(self.module.PuppetModuleAPI, 'puppet_modules_by_repo', [])
 
-        self.run_action()
+        self.run_action(os.EX_OK)
         self.action.upload_api.create.assert_called_once_with(repo_id)
         self.module.generate_puppet_data.assert_called_once()
-        self.action.send_content.assert_called_once_with(repo_id, content_upload["upload_id"], options["filepath"], None)
-        self.action.upload_api.import_into_repo.assert_called_once()
+        self.action.send_content.assert_called_once_with(repo_id, content_upload["upload_id"],
+            os.path.join(puppet_dir, 'jdob-valid-1.0.0.tar.gz'), ContentUpload.DEFAULT_CHUNK,
+            ContentUpload.DEFAULT_CONCURRENCY, ANY, None, self.upload)
+        self.action.upload_api.import_into_repo.assert_called_once_with(repo_id, content_upload["upload_id"], module, {})
         self.action.upload_api.delete.assert_called_once_with(repo_id, content_upload['upload_id'])
 
     def test_returns_ok(self):
@@ -126,6 +151,244 @@ class ContentUploadTest(CLIActionTestCase):
         self.mock_options(options)
         self.mock(self.module, 'get_repo', {'id': repo_id})
         self.mock(self.action.upload_api, 'create', content_upload)
-        self.mock(self.action, 'send_content', None)
+        self.mock(self.action, 'send_content', 1024)
         self.mock(self.action.upload_api, 'import_into_repo', content_upload)
         self.mock(self.action.upload_api, 'delete', content_upload)
+        self.action.journal = UploadJournal(self.directory)
+        self.upload = UploadJournalEntry(os.path.join(self.directory, 'upload.journal'),
+            {'upload_id': content_upload['upload_id'], 'repo_id': repo_id, 'chunk': ContentUpload.DEFAULT_CHUNK})
+        self.mock(self.action.journal, 'find', None)
+        self.mock(self.action.journal, 'start').return_value = self.upload
+
+
+class DirectoryUploadTest(CLIActionTestCase):
+
+    def setUp(self):
+        self.set_action(ContentUpload())
+        self.set_module(katello.client.core.repo)
+        self.mock_printer()
+        self.directory = tempfile.mkdtemp()
+        os.mkdir(os.path.join(self.directory, 'sub'))
+        self.paths = [os.path.join(self.directory, name) for name in ('a.rpm', 'b.rpm', 'sub/c.rpm', 'sub/d.rpm')]
+        for path in self.paths:
+            f = open(path, 'w')
+            f.write(os.path.basename(path)[0])
+            f.close()
+
+        self.mock(self.module, 'generate_rpm_data').side_effect = self.generate_rpm_data
+        self.mock(self.module.PackageAPI, 'packages_by_repo', [{'checksum': 'b'}, {'checksum': 'x'}])
+        self.mock(self.action.upload_api, 'create', {'upload_id': 'abc'})
+        self.mock(self.action.upload_api, 'import_into_repo')
+        self.mock(self.action.upload_api, 'delete')
+        self.mock(self.action, 'send_content', 1)
+        self.journal_directory = tempfile.mkdtemp()
+        self.action.journal = UploadJournal(self.journal_directory)
+
+    def tearDown(self):
+        super(DirectoryUploadTest, self).tearDown()
+        shutil.rmtree(self.directory)
+        shutil.rmtree(self.journal_directory)
+
+    @classmethod
+    def generate_rpm_data(cls, path, checksum=True):
+        # d.rpm has the same content as c.rpm
+        checksum = os.path.basename(path).replace('d', 'c')[0]
+        return {'checksum': checksum}, {}
+
+    def test_collects_files_from_all_subdirectories(self):
+        self.assertEqual(sorted(self.paths), ContentUpload.collect_files(self.directory))
+
+    def test_reads_units_in_pool_of_processes(self):
+        units = ContentUpload.read_units('yum', self.paths, processes=2)
+        self.assertEqual(self.paths, [path for path, __, __ in units])
+        self.assertEqual(['a', 'b', 'c', 'c'], [unit_key['checksum'] for __, unit_key, __ in units])
+
+    def test_skips_units_already_in_repository(self):
+        self.assertEqual(os.EX_OK, self.action.upload_directory(self.directory, 1, 'yum', None, None))
+        sent = sorted([call[0][2] for call in self.action.send_content.call_args_list])
+        self.assertEqual([self.paths[0], self.paths[2]], sent)
+        self.assertEqual(2, self.action.upload_api.import_into_repo.call_count)
+
+    def test_reports_failed_uploads(self):
+        self.action.upload_api.import_into_repo.side_effect = ServerRequestError(500, 'failed', None)
+        self.assertEqual(os.EX_DATAERR, self.action.upload_directory(self.directory, 1, 'yum', None, None))
+
+
+    def test_continues_after_transport_error_of_a_file(self):
+        def send_content(repo_id, upload_id, path, *args):
+            if path == self.paths[0]:
+                raise socket.error(104, 'Connection reset by peer')
+            return 1
+        self.action.send_content.side_effect = send_content
+        self.assertEqual(os.EX_DATAERR, self.action.upload_directory(self.directory, 1, 'yum', None, None))
+        self.assertEqual(1, self.action.upload_api.import_into_repo.call_count)
+
+
+class ResumeUploadTest(CLIActionTestCase):
+
+    def setUp(self):
+        self.set_action(ContentUpload())
+        self.set_module(katello.client.core.repo)
+        self.mock_printer()
+        self.directory = tempfile.mkdtemp()
+        self.action.journal = UploadJournal(os.path.join(self.directory, 'journal'))
+        self.path = os.path.join(self.directory, 'content.bin')
+        self.content = os.urandom(10000)
+        self.write(self.content)
+
+        self.upload_ids = []
+        self.received = []
+        self.fail_at = None
+        self.mock(self.action.upload_api, 'create').side_effect = self.create
+        self.mock(self.action.upload_api, 'upload_bits').side_effect = self.upload_bits
+        self.mock(self.action.upload_api, 'delete')
+
+    def tearDown(self):
+        super(ResumeUploadTest, self).tearDown()
+        shutil.rmtree(self.directory)
+
+    def write(self, content):
+        f = open(self.path, 'wb')
+        f.write(content)
+        f.close()
+
+    def create(self, repo_id):
+        self.upload_ids.append('upload-%d' % len(self.upload_ids))
+        return {'upload_id': self.upload_ids[-1]}
+
+    def upload_bits(self, repo_id, upload_id, offset, content):
+        if offset == self.fail_at:
+            raise self.error
+        self.received.append((upload_id, offset))
+
+    def interrupt(self, offset, error=None):
+        self.fail_at, self.error = offset, error or socket.error('connection reset')
+        self.assertRaises(type(self.error), self.action.transfer_file, 1, self.path, 1024, 1)
+        self.fail_at = None
+        self.received = []
+
+    def test_interrupted_upload_resumes_from_acknowledged_chunks(self):
+        self.interrupt(3072)
+        upload, size, checksum = self.action.transfer_file(1, self.path, 1024, 1, checksum_type='sha256')
+        self.assertEqual(['upload-0'], self.upload_ids)
+        self.assertEqual([('upload-0', offset) for offset in range(3072, 10000, 1024)], self.received)
+        self.assertEqual(10000, size)
+        self.assertEqual(hashlib.sha256(self.content).hexdigest(), checksum)
+
+    def test_changed_file_is_uploaded_again(self):
+        self.interrupt(3072)
+        self.write(os.urandom(10000))
+        self.action.transfer_file(1, self.path, 1024, 1)
+        self.action.upload_api.delete.assert_called_once_with(1, 'upload-0')
+        self.assertEqual([('upload-1', offset) for offset in range(0, 10000, 1024)], self.received)
+
+    def test_upload_dropped_by_server_is_uploaded_again(self):
+        self.interrupt(3072)
+        self.mock(self.action.upload_api, 'upload_bits').side_effect = self.fail_once
+        self.action.transfer_file(1, self.path, 1024, 1)
+        self.assertEqual(['upload-0', 'upload-1'], self.upload_ids)
+        self.assertEqual([('upload-1', offset) for offset in range(0, 10000, 1024)], self.received)
+
+    def test_progress_of_upload_dropped_by_server_starts_over(self):
+        self.interrupt(3072)
+        self.mock(self.action.upload_api, 'upload_bits').side_effect = self.fail_after_chunks
+        progress = TransferProgress(None)
+        self.action.transfer_file(1, self.path, 1024, 1, progress.update)
+        self.assertEqual(10000, progress.transferred)
+
+    def fail_after_chunks(self, repo_id, upload_id, offset, content):
+        # the server drops the resumed upload after accepting some of its chunks
+        if upload_id == 'upload-0' and offset >= 6144:
+            raise ServerRequestError(404, 'not found', None)
+        self.received.append((upload_id, offset))
+
+    def fail_once(self, repo_id, upload_id, offset, content):
+        if upload_id == 'upload-0':
+            raise ServerRequestError(404, 'not found', None)
+        self.received.append((upload_id, offset))
+
+    def test_finished_upload_is_removed_from_journal(self):
+        self.mock(self.module, 'generate_rpm_data', [{'checksumtype': 'sha256', 'checksum': None}, {}])
+        self.mock(self.action.upload_api, 'import_into_repo')
+        self.action.send_file(self.path, 1, 'yum', 1024)
+        self.assertEqual([], self.action.journal.entries())
+
+
+class ContentUploadCleanupTest(CLIActionTestCase):
+
+    def setUp(self):
+        self.set_action(ContentUploadCleanup())
+        self.set_module(katello.client.core.repo)
+        self.mock_printer()
+        self.mock_options({})
+        self.directory = tempfile.mkdtemp()
+        self.action.journal = UploadJournal(self.directory)
+        self.uploads = [self.action.journal.start(None, repo_id, __file__, 'upload-%d' % repo_id, 1024)
+                        for repo_id in (1, 2)]
+        self.mock(self.action.upload_api, 'delete')
+
+    def tearDown(self):
+        super(ContentUploadCleanupTest, self).tearDown()
+        shutil.rmtree(self.directory)
+
+    def test_removes_unfinished_uploads(self):
+        self.run_action(os.EX_OK)
+        self.assertEqual([], self.action.journal.entries())
+        self.assertEqual(2, self.action.upload_api.delete.call_count)
+
+    def test_removes_uploads_dropped_by_server(self):
+        self.action.upload_api.delete.side_effect = ServerRequestError(404, 'not found', None)
+        self.run_action(os.EX_OK)
+        self.assertEqual([], self.action.journal.entries())
+
+    def test_keeps_recent_uploads(self):
+        self.mock_options({'older_than': 1})
+        os.utime(self.uploads[0].path, (0, 0))
+        self.run_action(os.EX_OK)
+        self.action.upload_api.delete.assert_called_once_with(1, 'upload-1')
+        self.assertEqual(['upload-2'], [upload.upload_id for upload in self.action.journal.entries()])
+
+
+class SendContentTest(CLIActionTestCase):
+
+    def setUp(self):
+        self.set_action(ContentUpload())
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'content.bin')
+        self.content = ''.join([chr(i % 256) for i in range(10000)])
+        f = open(self.path, 'wb')
+        f.write(self.content)
+        f.close()
+
+        self.lock = threading.Lock()
+        self.received = {}
+        self.mock(self.action.upload_api, 'upload_bits').side_effect = self.upload_bits
+
+    def tearDown(self):
+        super(SendContentTest, self).tearDown()
+        shutil.rmtree(self.directory)
+
+    def upload_bits(self, repo_id, upload_id, offset, content):
+        with self.lock:
+            self.received[offset] = content
+
+    def test_sends_all_chunks_with_offsets(self):
+        size = self.action.send_content(1, 'abc', self.path, 1024, 4)
+        self.assertEqual(10000, size)
+        self.assertEqual(range(0, 10000, 1024), sorted(self.received.keys()))
+        self.assertEqual(self.content, ''.join([self.received[offset] for offset in sorted(self.received.keys())]))
+
+    def test_uses_default_chunk_size(self):
+        self.action.send_content(1, 'abc', self.path)
+        self.assertEqual([0], self.received.keys())
+
+    def test_reports_sent_bytes(self):
+        sent = []
+        self.action.send_content(1, 'abc', self.path, 4096, 2, sent.append)
+        self.assertEqual([1808, 4096, 4096], sorted(sent))
+
+    def test_hashes_content_while_sending(self):
+        hashes = MultiHash(['sha256', 'sha1'])
+        self.action.send_content(1, 'abc', self.path, 1024, 4, hashes=hashes)
+        self.assertEqual(hashlib.sha256(self.content).hexdigest(), hashes.hexdigest('sha256'))
+        self.assertEqual(hashlib.sha1(self.content).hexdigest(), hashes.hexdigest('sha1'))
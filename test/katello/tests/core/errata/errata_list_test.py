@@ -12,6 +12,7 @@ from katello.tests.core.repo.repo_data import REPOS
 from katello.client.api import utils
 import katello.client.core.errata
 from katello.client.core.errata import List
+from katello.client.lib.utils.paging import DEFAULT_PER_PAGE
 
 
 
@@ -24,6 +25,8 @@ class RequiredCLIOptionsTests(CLIOptionTestCase):
         ('--repo=repo-123', '--org=org-123'),
         ('--repo=repo-123', '--repo_id=123'),
         ('--product=product-123', ),
+        ('--repo_id=repo-123', '--limit=-1'),
+        ('--repo_id=repo-123', '--offset=-5'),
         (),
     ]
 
@@ -34,6 +37,7 @@ class RequiredCLIOptionsTests(CLIOptionTestCase):
         ('--org=org-123', '--environment=env-123', '--product=product-123', '--repo=repo-123', '--content_view=c1'),
         ('--type=enhancements', '--repo_id=repo-123'),
         ('--severity=critical', '--repo_id=repo-123'),
+        ('--repo_id=repo-123', '--limit=10', '--offset=20'),
     ]
 
 
@@ -96,7 +100,8 @@ class ErrataListTest(CLIActionTestCase):
     def test_it_prints_errata(self):
         self.mock_options(self.OPTIONS_BY_PRODUCT_AND_REPO)
         self.run_action()
-        self.action.printer.print_items.assert_called_once_with(ERRATA_BY_REPO)
+        self.assertEqual(1, self.action.printer.print_items.call_count)
+        self.assertEqual(ERRATA_BY_REPO, list(self.action.printer.print_items.call_args[0][0]))
 
     def test_it_uses_library_when_no_env_is_specified(self):
         self.mock_options(self.OPTIONS_BY_ORG)
@@ -113,7 +118,7 @@ class ErrataListTest(CLIActionTestCase):
         self.run_action()
         self.module.get_environment.assert_called_once_with(self.OPTIONS_BY_ORG_AND_PRODUCT['org'], None)
         self.module.get_product.assert_called_once_with(self.OPTIONS_BY_ORG_AND_PRODUCT['org'], self.OPTIONS_BY_ORG_AND_PRODUCT['product'], None, None)
-        self.action.api.errata_filter.assert_called_once_with(repo_id=None, type_in=None, environment_id=self.ENV['id'], prod_id=self.PRODUCT['id'], severity=None)
+        self.action.api.errata_filter.assert_called_once_with(repo_id=None, type_in=None, environment_id=self.ENV['id'], prod_id=self.PRODUCT['id'], severity=None, stream=True, page=1, per_page=DEFAULT_PER_PAGE)
 
     def test_it_searches_for_content_view_id_when_content_view_specified(self):
         self.mock_options(self.OPTIONS_BY_PRODUCT_REPO_CV)
@@ -126,9 +131,19 @@ class ErrataListTest(CLIActionTestCase):
     def test_it_supports_filtering_by_type(self):
         self.mock_options(self.OPTIONS_BY_TYPE)
         self.run_action()
-        self.action.api.errata_filter.assert_called_once_with(repo_id=self.REPO['id'], type_in=self.OPTIONS_BY_TYPE['type'], environment_id=None, prod_id=None, severity=None)
+        self.action.api.errata_filter.assert_called_once_with(repo_id=self.REPO['id'], type_in=self.OPTIONS_BY_TYPE['type'], environment_id=None, prod_id=None, severity=None, stream=True, page=1, per_page=DEFAULT_PER_PAGE)
 
     def test_it_supports_filtering_by_severity(self):
         self.mock_options(self.OPTIONS_BY_SEVERITY)
         self.run_action()
-        self.action.api.errata_filter.assert_called_once_with(repo_id=self.REPO['id'], type_in=None, environment_id=None, prod_id=None, severity=self.OPTIONS_BY_SEVERITY['severity'])
+        self.action.api.errata_filter.assert_called_once_with(repo_id=self.REPO['id'], type_in=None, environment_id=None, prod_id=None, severity=self.OPTIONS_BY_SEVERITY['severity'], stream=True, page=1, per_page=DEFAULT_PER_PAGE)
+
+    def test_it_requests_the_page_with_the_offset(self):
+        self.mock_options(dict(self.OPTIONS_BY_TYPE, offset=12, limit=5))
+        self.run_action()
+        self.action.api.errata_filter.assert_any_call(repo_id=self.REPO['id'], type_in=self.OPTIONS_BY_TYPE['type'], environment_id=None, prod_id=None, severity=None, stream=True, page=3, per_page=5)
+
+    def test_it_prints_errata_from_the_offset(self):
+        self.mock_options(dict(self.OPTIONS_BY_PRODUCT_AND_REPO, offset=1))
+        self.run_action()
+        self.assertEqual(ERRATA_BY_REPO[1:], list(self.action.printer.print_items.call_args[0][0]))
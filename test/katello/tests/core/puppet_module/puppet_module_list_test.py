@@ -5,6 +5,7 @@ from katello.tests.core.action_test_utils import CLIOptionTestCase, CLIActionTes
 
 import katello.client.core.puppet_module
 from katello.client.core.puppet_module import List
+from katello.client.lib.utils.paging import DEFAULT_PER_PAGE
 
 
 class RequiredCLIOptionsTests(CLIOptionTestCase):
@@ -16,12 +17,14 @@ class RequiredCLIOptionsTests(CLIOptionTestCase):
         ('--repo=pforge', '--org=acme', ),
         ('--repo=pforge', '--product=puppet', ),
         ('--repo_id=1', '--id=abc123', ),
+        ('--repo_id=1', '--limit=-1', ),
     ]
 
     allowed_options = [
         ('--repo_id=1', ),
         ('--repo=pforge', '--product=puppet', '--org=acme', ),
-        ('--repo=pforge', '--product_id=5', '--org=acme', )
+        ('--repo=pforge', '--product_id=5', '--org=acme', ),
+        ('--repo_id=1', '--limit=0', '--offset=3', )
     ]
 
 
@@ -47,7 +50,7 @@ class PuppetListTest(CLIActionTestCase):
 
     def test_finds_org(self):
         self.run_action()
-        self.action.api.puppet_modules_by_repo.assert_called_once_with(self.REPO_ID)
+        self.action.api.puppet_modules_by_repo.assert_called_once_with(self.REPO_ID, page=1, per_page=DEFAULT_PER_PAGE)
 
     def test_returns_ok(self):
         self.run_action(os.EX_OK)
@@ -0,0 +1,111 @@
+import os
+import socket
+from mock import Mock
+
+from katello.tests.core.action_test_utils import CLIOptionTestCase, CLIActionTestCase
+from katello.tests.core.repo import repo_data
+
+import katello.client.core.repo
+from katello.client.core.repo import BulkSync
+from katello.client.api.task_status import TaskStatusAPI
+from katello.client.server import ServerRequestError
+
+
+class RequiredCLIOptionsTests(CLIOptionTestCase):
+
+    action = BulkSync()
+
+    disallowed_options = [
+        (),
+        ('--name=repo*', ),
+        ('--org=ACME', '--file=repos.txt', '--name=repo*'),
+        ('--org=ACME', '--file=repos.txt', '--product=product1'),
+        ('--org=ACME', '--concurrency=0'),
+    ]
+
+    allowed_options = [
+        ('--org=ACME', ),
+        ('--org=ACME', '--name=repo*', '--product=product1'),
+        ('--org=ACME', '--file=repos.txt', '--concurrency=8'),
+    ]
+
+
+class BulkSyncTest(CLIActionTestCase):
+
+    ORG = 'ACME'
+    ENV = {'id': 1, 'name': 'Library'}
+    REPOS = [
+        {'id': 1, 'name': 'fedora-18'},
+        {'id': 2, 'name': 'fedora-19'},
+        {'id': 3, 'name': 'rhel-6'}
+    ]
+
+    OPTIONS = {
+        'org': ORG,
+        'concurrency': 2
+    }
+
+    def setUp(self):
+        self.set_action(BulkSync())
+        self.set_module(katello.client.core.repo)
+        self.mock_printer()
+
+        self.mock_options(self.OPTIONS)
+        self.mock(self.module, 'get_environment', self.ENV)
+        self.mock(self.action.api, 'repos_by_org_env', self.REPOS)
+        self.mock(self.action.api, 'sync', repo_data.SYNC_RESULT_WITHOUT_ERROR)
+        self.mock(self.module.time, 'sleep')
+        self.mock(self.module, 'ProgressBar', Mock())
+
+    def test_syncs_all_repos_in_org(self):
+        self.run_action(os.EX_OK)
+        self.assertEqual([1, 2, 3], sorted(c[0][0] for c in self.action.api.sync.call_args_list))
+
+    def test_filters_repos_by_name_pattern(self):
+        self.mock_options(dict(self.OPTIONS, name='fedora*'))
+        self.run_action(os.EX_OK)
+        self.assertEqual([1, 2], sorted(c[0][0] for c in self.action.api.sync.call_args_list))
+
+    def test_prints_summary_in_order_of_repos(self):
+        self.run_action(os.EX_OK)
+        results = self.action.printer.print_items.call_args[0][0]
+        self.assertEqual([1, 2, 3], [r['id'] for r in results])
+
+    def test_limits_number_of_running_syncs(self):
+        calls = []
+        def sync(repo_id):
+            calls.append('sync')
+            return [{'uuid': repo_id, 'state': 'running'}]
+        def status(uuid):
+            calls.append('status')
+            return repo_data.SYNC_RESULT_WITHOUT_ERROR[0]
+        self.mock(self.action.api, 'sync').side_effect = sync
+        self.mock(TaskStatusAPI, 'status').side_effect = status
+        self.mock_options(dict(self.OPTIONS, concurrency=1))
+        self.run_action(os.EX_OK)
+        self.assertEqual(['sync', 'status'] * 3, calls)
+
+    def test_returns_error_if_any_sync_failed(self):
+        self.mock(self.action.api, 'sync').side_effect = lambda repo_id: \
+            repo_data.SYNC_RESULT_WITH_ERROR if repo_id == 2 else repo_data.SYNC_RESULT_WITHOUT_ERROR
+        self.run_action(os.EX_DATAERR)
+
+    def test_polling_error_fails_only_its_repo(self):
+        self.mock(self.action.api, 'sync').side_effect = lambda repo_id: [{'uuid': repo_id, 'state': 'running'}]
+        def status(uuid):
+            if uuid == 1:
+                raise ServerRequestError(500, "Internal error")
+            if uuid == 2:
+                raise socket.error("Connection reset by peer")
+            return repo_data.SYNC_RESULT_WITHOUT_ERROR[0]
+        self.mock(TaskStatusAPI, 'status').side_effect = status
+        self.run_action(os.EX_DATAERR)
+        results = self.action.printer.print_items.call_args[0][0]
+        self.assertEqual([_("failed"), _("failed"), _("synchronized")], [r['result'] for r in results])
+        self.assertTrue("Internal error" in results[0]['errors'])
+        self.assertTrue("Connection reset by peer" in results[1]['errors'])
+
+    def test_returns_error_when_no_repo_matches(self):
+        self.mock_options(dict(self.OPTIONS, name='ubuntu*'))
+        self.run_action(os.EX_DATAERR)
+        self.assertFalse(self.action.api.sync.called)
@@ -0,0 +1,38 @@
+import os
+import sys
+from StringIO import StringIO
+from mock import Mock
+
+from katello.tests.core.action_test_utils import CLIActionTestCase
+
+import katello.client.core.shell_command
+from katello.client.core.base import Action
+from katello.client.core.shell_command import ShellAction
+
+
+class ShellActionTest(CLIActionTestCase):
+
+    def setUp(self):
+        self.set_action(ShellAction(Mock()))
+        self.set_module(katello.client.core.shell_command)
+        self.mock(self.module, 'KatelloShell', Mock())
+        self.mock(self.action, 'run_script', os.EX_OK)
+        self.stdin = sys.stdin
+        sys.stdin = StringIO("org list\n")
+
+    def tearDown(self):
+        sys.stdin = self.stdin
+        Action.cache_parsers = False
+        super(ShellActionTest, self).tearDown()
+
+    def test_runs_interactive_shell_when_stdin_isnt_a_terminal(self):
+        self.mock_options({})
+        self.run_action(os.EX_OK)
+        self.assertTrue(self.module.KatelloShell.called)
+        self.assertFalse(self.action.run_script.called)
+
+    def test_runs_script_from_stdin_when_requested(self):
+        self.mock_options({'file': '-'})
+        self.run_action(os.EX_OK)
+        self.action.run_script.assert_called_once_with('-')
+        self.assertFalse(self.module.KatelloShell.called)
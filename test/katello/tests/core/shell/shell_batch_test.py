@@ -0,0 +1,127 @@
+import os
+import sys
+import time
+import unittest
+from StringIO import StringIO
+from mock import Mock
+
+from katello.client.shell import BatchShell
+
+
+SCRIPT = """
+# create the organization first
+org create --name ACME
+provider list --org ACME
+
+org delete --name ACME
+"""
+
+
+class BatchShellTest(unittest.TestCase):
+
+    def setUp(self):
+        self.admin_cli = Mock()
+        self.admin_cli.main.return_value = os.EX_OK
+        self.report = StringIO()
+
+    def run_script(self, script=SCRIPT, continue_on_error=False):
+        self.batch = BatchShell(self.admin_cli, continue_on_error, report_stream=self.report)
+        return self.batch.run(StringIO(script))
+
+    def executed(self):
+        return [call[0][0] for call in self.admin_cli.main.call_args_list]
+
+    def test_runs_all_commands_skipping_comments_and_empty_lines(self):
+        self.assertEqual(os.EX_OK, self.run_script())
+        self.assertEqual(["org create --name ACME", "provider list --org ACME", "org delete --name ACME"],
+            self.executed())
+
+    def test_records_line_numbers_and_exit_codes(self):
+        self.admin_cli.main.side_effect = [os.EX_OK, 65, os.EX_OK]
+        self.run_script(continue_on_error=True)
+        self.assertEqual([(3, 0), (4, 65), (6, 0)],
+            [(result.line_number, result.exit_code) for result in self.batch.results])
+
+    def test_stops_on_first_error(self):
+        self.admin_cli.main.side_effect = [os.EX_OK, 65, os.EX_OK]
+        self.assertEqual(65, self.run_script())
+        self.assertEqual(2, len(self.executed()))
+
+    def test_continues_on_error_when_requested(self):
+        self.admin_cli.main.side_effect = [os.EX_OK, 65, os.EX_OK]
+        self.assertEqual(65, self.run_script(continue_on_error=True))
+        self.assertEqual(3, len(self.executed()))
+
+    def test_system_exit_ends_only_the_command(self):
+        self.admin_cli.main.side_effect = [SystemExit(1), os.EX_OK, os.EX_OK]
+        self.assertEqual(1, self.run_script(continue_on_error=True))
+        self.assertEqual(3, len(self.executed()))
+
+    def test_exit_command_ends_the_script(self):
+        self.run_script("org list\nexit\norg delete --name ACME\n")
+        self.assertEqual(["org list"], self.executed())
+
+    def test_prints_summary(self):
+        self.admin_cli.main.side_effect = [os.EX_OK, 65, os.EX_OK]
+        self.run_script(continue_on_error=True)
+        report = self.report.getvalue()
+        self.assertTrue("3 commands executed" in report)
+        self.assertTrue("failed line 4 with exit code 65: provider list --org ACME" in report)
+
+
+class ParallelBatchShellTest(unittest.TestCase):
+
+    SCRIPT = "\n".join(["system update --name host%d" % i for i in range(20)])
+
+    def setUp(self):
+        self.report = StringIO()
+        self.clis = []
+        self.failing = set()
+
+    def create_cli(self):
+        cli = Mock()
+        cli.main.side_effect = self.run_command
+        self.clis.append(cli)
+        return cli
+
+    def run_command(self, line):
+        number = int(line.split("host")[1])
+        # later commands finish sooner
+        time.sleep(0.001 * (20 - number))
+        print "updated host%d" % number
+        return 65 if number in self.failing else os.EX_OK
+
+    def run_script(self, ordered=True, continue_on_error=True):
+        stdout = sys.stdout
+        sys.stdout = StringIO()
+        try:
+            batch = BatchShell(Mock(), continue_on_error, report_stream=self.report,
+                workers=4, ordered=ordered, cli_factory=self.create_cli)
+            self.exit_code = batch.run(StringIO(self.SCRIPT))
+            return sys.stdout.getvalue().splitlines()
+        finally:
+            sys.stdout = stdout
+
+    def test_every_worker_gets_its_own_cli(self):
+        self.run_script()
+        self.assertEqual(4, len(self.clis))
+        self.assertEqual(20, sum([cli.main.call_count for cli in self.clis]))
+
+    def test_output_keeps_script_order(self):
+        self.assertEqual(["updated host%d" % i for i in range(20)], self.run_script())
+
+    def test_unordered_output_isnt_interleaved(self):
+        output = self.run_script(ordered=False)
+        self.assertEqual(sorted(["updated host%d" % i for i in range(20)]), sorted(output))
+
+    def test_returns_exit_code_of_first_failed_line(self):
+        self.failing = set([7, 3])
+        self.run_script()
+        self.assertEqual(65, self.exit_code)
+        self.assertTrue("failed line 4 with exit code 65" in self.report.getvalue())
+
+    def test_stops_starting_commands_after_failure(self):
+        self.failing = set([0])
+        output = self.run_script(continue_on_error=False)
+        self.assertTrue(len(output) < 20)
+        self.assertEqual("updated host0", output[0])
@@ -0,0 +1,43 @@
+import ConfigParser
+from unittest import TestCase
+from mock import Mock
+
+from katello.client import server
+from katello.client.api.utils import resolution_cache
+from katello.client.cli.base import KatelloCLI
+from katello.client.config import Config
+
+
+class SetupConnectionPoolTest(TestCase):
+
+    def setUp(self):
+        self.parser = Config.parser
+        self.max_per_host = server.connection_pool.max_per_host
+        self.active_server = server.active_server
+        Config.parser = ConfigParser.RawConfigParser()
+        Config.parser.add_section('server')
+        Config.parser.set('server', 'keepalive_connections', '2')
+        Config.parser.set('server', 'http_cache', 'false')
+
+    def tearDown(self):
+        Config.parser = self.parser
+        server.connection_pool.max_per_host = self.max_per_host
+        server.active_server = self.active_server
+        server._thread_servers.__dict__.pop('server', None)
+        resolution_cache.enabled = False
+
+    def setup_server(self, thread_local_server):
+        cli = KatelloCLI()
+        cli.thread_local_server = thread_local_server
+        cli.opts = Mock(host='localhost', port='443', scheme='https', path='/katello/api')
+        cli.setup_server()
+
+    def test_configures_pool_of_main_cli(self):
+        self.setup_server(False)
+        self.assertEqual(2, server.connection_pool.max_per_host)
+
+    def test_worker_cli_keeps_capacity_raised_for_the_workers(self):
+        server.connection_pool.max_per_host = 2
+        server.connection_pool.ensure_capacity(8)
+        self.setup_server(True)
+        self.assertEqual(8, server.connection_pool.max_per_host)
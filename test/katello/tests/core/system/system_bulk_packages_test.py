@@ -0,0 +1,145 @@
+import os
+import shutil
+import tempfile
+from mock import Mock
+
+from katello.tests.core.action_test_utils import CLIOptionTestCase, CLIActionTestCase
+
+import katello.client.core.system
+from katello.client.core.system import BulkPackages
+from katello.client.server import ServerRequestError
+
+
+class RequiredCLIOptionsTests(CLIOptionTestCase):
+
+    action = BulkPackages()
+
+    disallowed_options = [
+        ('--org=ACME', '--install=zsh'),
+        ('--org=ACME', '--search=name:web*'),
+        ('--org=ACME', '--search=name:web*', '--install=zsh', '--remove=vim'),
+        ('--org=ACME', '--search=name:web*', '--file=systems.txt', '--install=zsh'),
+        ('--org=ACME', '--environment=Dev', '--update=zsh', '--concurrency=0'),
+    ]
+
+    allowed_options = [
+        ('--org=ACME', '--search=name:web*', '--install=zsh'),
+        ('--org=ACME', '--environment=Dev', '--update=--all'),
+        ('--org=ACME', '--file=systems.txt', '--remove_groups=web', '--concurrency=16'),
+    ]
+
+
+class BulkPackagesTest(CLIActionTestCase):
+
+    ORG = 'ACME'
+    SYSTEMS = [
+        {'name': 'web1', 'uuid': 'uuid-1'},
+        {'name': 'web2', 'uuid': 'uuid-2'},
+        {'name': 'db1', 'uuid': 'uuid-3'}
+    ]
+
+    OPTIONS = {
+        'org': ORG,
+        'search': 'name:*',
+        'install': ['zsh'],
+        'concurrency': 2
+    }
+
+    def setUp(self):
+        self.set_action(BulkPackages())
+        self.set_module(katello.client.core.system)
+        self.mock_printer()
+        self.mock_options(self.OPTIONS)
+
+        self.mock(self.action.api, 'systems_by_org', self.SYSTEMS)
+        self.mock(self.action.api, 'install_packages').side_effect = self.start_task
+        self.mock(self.action.api, 'update_packages').side_effect = self.start_task
+        self.mock(self.module.time, 'sleep')
+        self.mock(self.module, 'ProgressBar', Mock())
+        self.status_api = Mock()
+        self.status_api.status.side_effect = self.task_status
+        self.mock(self.module.SystemAsyncTask, 'status_api').return_value = self.status_api
+        self.final_states = {}
+
+    def start_task(self, system_id, packages):
+        if system_id == 'uuid-2' and self.final_states.get(system_id) == 'not started':
+            raise ServerRequestError(500, 'server error', None)
+        return {'uuid': 'task-' + system_id, 'state': 'waiting', 'result_description': None}
+
+    def task_status(self, task_id):
+        system_id = task_id[len('task-'):]
+        state = self.final_states.get(system_id, 'finished')
+        return {'uuid': task_id, 'state': state, 'result_description': 'description of ' + system_id}
+
+    def results(self):
+        return dict((r['name'], r['result']) for r in self.action.printer.print_items.call_args[0][0])
+
+    def test_starts_action_on_all_systems(self):
+        self.run_action(os.EX_OK)
+        self.assertEqual(['uuid-1', 'uuid-2', 'uuid-3'],
+            sorted([c[0][0] for c in self.action.api.install_packages.call_args_list]))
+        self.assertEqual(['zsh'], self.action.api.install_packages.call_args[0][1])
+
+    def test_passes_search_query(self):
+        self.run_action()
+        self.action.api.systems_by_org.assert_called_once_with(self.ORG, {'search': 'name:*'})
+
+    def test_polls_every_task_until_finished(self):
+        self.run_action()
+        self.assertEqual(['task-uuid-1', 'task-uuid-2', 'task-uuid-3'],
+            sorted([c[0][0] for c in self.status_api.status.call_args_list]))
+
+    def test_reports_outcome_per_system(self):
+        self.final_states = {'uuid-1': 'failed', 'uuid-2': 'not started'}
+        self.run_action(os.EX_DATAERR)
+        self.assertEqual({'web1': 'failed', 'web2': 'failed to start', 'db1': 'finished'}, self.results())
+
+    def test_update_all_packages(self):
+        self.mock_options({'org': self.ORG, 'search': 'name:*', 'update': ['--all'], 'concurrency': 2})
+        self.run_action(os.EX_OK)
+        self.assertEqual([], self.action.api.update_packages.call_args[0][1])
+
+    def find_systems(self, org_name, query):
+        if 'name' in query:
+            return [s for s in self.SYSTEMS if s['name'] == query['name']]
+        if query.get('search', '').startswith('uuid:'):
+            return [s for s in self.SYSTEMS if s['uuid'] == query['search'][len('uuid:'):]]
+        return self.SYSTEMS
+
+    def run_with_file(self, content, expected_code=os.EX_OK):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'systems.txt')
+            f = open(path, 'w')
+            f.write(content)
+            f.close()
+            self.mock_options({'org': self.ORG, 'file': path, 'install': ['zsh'], 'concurrency': 2})
+            self.action.api.systems_by_org.side_effect = self.find_systems
+            self.run_action(expected_code)
+        finally:
+            shutil.rmtree(directory)
+
+    def test_selects_systems_from_file(self):
+        self.run_with_file("# systems to patch\nweb1\nuuid-3\n")
+        self.assertEqual(['uuid-1', 'uuid-3'],
+            sorted([c[0][0] for c in self.action.api.install_packages.call_args_list]))
+
+    def test_looks_up_systems_from_file_by_name(self):
+        self.run_with_file("web1\nweb2\n")
+        self.assertEqual([{'name': 'web1'}, {'name': 'web2'}],
+            sorted([c[0][1] for c in self.action.api.systems_by_org.call_args_list]))
+
+    def test_fails_when_name_from_file_is_ambiguous(self):
+        self.SYSTEMS = self.SYSTEMS + [{'name': 'web1', 'uuid': 'uuid-4'}]
+        self.run_with_file("web1\ndb1\n", os.EX_DATAERR)
+        self.assertFalse(self.action.api.install_packages.called)
+
+    def test_selects_system_with_ambiguous_name_by_uuid(self):
+        self.SYSTEMS = self.SYSTEMS + [{'name': 'web1', 'uuid': 'uuid-4'}]
+        self.run_with_file("uuid-4\ndb1\n")
+        self.assertEqual(['uuid-3', 'uuid-4'],
+            sorted([c[0][0] for c in self.action.api.install_packages.call_args_list]))
+
+    def test_fails_when_system_from_file_is_missing(self):
+        self.run_with_file("web1\nweb9\n", os.EX_DATAERR)
+        self.assertFalse(self.action.api.install_packages.called)
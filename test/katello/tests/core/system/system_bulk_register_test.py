@@ -0,0 +1,190 @@
+import os
+import shutil
+import socket
+import tempfile
+from mock import Mock
+
+from katello.tests.core.action_test_utils import CLIOptionTestCase, CLIActionTestCase
+
+import katello.client.core.system
+from katello.client.core.system import BulkRegister
+from katello.client.server import ServerRequestError
+
+
+class RequiredCLIOptionsTests(CLIOptionTestCase):
+
+    action = BulkRegister()
+
+    disallowed_options = [
+        ('--org=ACME', '--file=systems.csv'),
+        ('--org=ACME', '--output=uuids.csv'),
+        ('--file=systems.csv', '--output=uuids.csv'),
+        ('--org=ACME', '--file=systems.csv', '--output=uuids.csv', '--environment=Dev', '--activationkey=key1'),
+        ('--org=ACME', '--file=systems.csv', '--output=uuids.csv', '--concurrency=0'),
+    ]
+
+    allowed_options = [
+        ('--org=ACME', '--file=systems.csv', '--output=uuids.csv'),
+        ('--org=ACME', '--file=systems.json', '--output=uuids.csv', '--activationkey=key1', '--concurrency=8'),
+    ]
+
+    def setUp(self):
+        self.mock(katello.client.cli.base, 'get_katello_mode', self.mode)
+        self.mock(katello.client.core.system, 'get_katello_mode', self.mode)
+
+
+class BulkRegisterTest(CLIActionTestCase):
+
+    ORG = 'ACME'
+    ENVIRONMENTS = {
+        'Dev': {'id': 2, 'name': 'Dev'},
+        'Prod': {'id': 3, 'name': 'Prod'}
+    }
+
+    CSV = "\n".join([
+        "name,environment,activationkey,fact.cpu.cpu_socket(s)",
+        "host1,Dev,,2",
+        "host2,Prod,,",
+        "host3,,key1,",
+        "host4,Dev,,4"
+    ])
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.manifest = self.write_file('systems.csv', self.CSV)
+        self.output = os.path.join(self.directory, 'uuids.csv')
+
+        self.set_action(BulkRegister())
+        self.set_module(katello.client.core.system)
+        self.mock_printer()
+        self.mock_options({
+            'org': self.ORG,
+            'file': self.manifest,
+            'output': self.output,
+            'concurrency': 2
+        })
+
+        self.mock(self.module, 'get_katello_mode', 'katello')
+        self.mock(self.module, 'get_environment').side_effect = lambda org, name: self.ENVIRONMENTS[name]
+        self.mock(self.module, 'ActivationKeyAPI', Mock()).return_value.activation_keys_by_organization.return_value = \
+            [{'name': 'key1'}]
+        self.mock(self.module, 'ProgressBar', Mock())
+        self.mock(self.action.api, 'register').side_effect = self.register
+
+    def tearDown(self):
+        super(BulkRegisterTest, self).tearDown()
+        shutil.rmtree(self.directory)
+
+    def write_file(self, name, content):
+        path = os.path.join(self.directory, name)
+        f = open(path, 'w')
+        f.write(content)
+        f.close()
+        return path
+
+    def register(self, name, *args):
+        if name == 'host2':
+            raise ServerRequestError(500, 'server error', None)
+        return {'uuid': 'uuid-' + name}
+
+    def registered(self):
+        return sorted([c[0][0] for c in self.action.api.register.call_args_list])
+
+    def read_output(self):
+        f = open(self.output)
+        lines = f.read().splitlines()
+        f.close()
+        return lines
+
+    def test_registers_all_systems(self):
+        self.run_action(os.EX_DATAERR)
+        self.assertEqual(['host1', 'host2', 'host3', 'host4'], self.registered())
+
+    def test_resolves_each_environment_once(self):
+        self.run_action()
+        self.assertEqual(2, self.module.get_environment.call_count)
+
+    def test_passes_environment_ids_keys_and_facts(self):
+        self.run_action()
+        calls = dict((c[0][0], c[0]) for c in self.action.api.register.call_args_list)
+        self.assertEqual(2, calls['host1'][2])
+        self.assertEqual({'cpu.cpu_socket(s)': '2'}, calls['host1'][7])
+        self.assertEqual(None, calls['host3'][2])
+        self.assertEqual('key1', calls['host3'][3])
+
+    def test_writes_results_of_all_systems(self):
+        self.run_action()
+        self.assertEqual(['name,uuid,result,errors', 'host1,uuid-host1,registered,', 'host2,,failed,server error',
+            'host3,uuid-host3,registered,', 'host4,uuid-host4,registered,'],
+            [self.read_output()[0]] + sorted(self.read_output()[1:]))
+
+    def test_resumes_registration(self):
+        self.write_file('uuids.csv', "name,uuid,result,errors\nhost1,uuid-host1,registered,\n" \
+            "host2,,failed,server error\nhost3,uuid-host3,registered,\n")
+        self.run_action()
+        self.assertEqual(['host2', 'host4'], self.registered())
+
+    def test_resumes_registration_with_output_of_earlier_version(self):
+        self.write_file('uuids.csv', "name,uuid\nhost1,uuid-host1\nhost3,uuid-host3\n")
+        self.run_action()
+        self.assertEqual(['host2', 'host4'], self.registered())
+        self.assertEqual(['name,uuid', 'host1,uuid-host1', 'host3,uuid-host3', 'host2,', 'host4,uuid-host4'],
+            self.read_output()[:3] + sorted(self.read_output()[3:]))
+
+    def test_unexpected_error_fails_only_its_system(self):
+        def register(name, *args):
+            if name == 'host3':
+                return {}
+            if name == 'host4':
+                raise socket.error('Connection reset by peer')
+            return {'uuid': 'uuid-' + name}
+        self.action.api.register.side_effect = register
+        self.run_action(os.EX_DATAERR)
+        results = self.action.printer.print_items.call_args[0][0]
+        self.assertEqual(['registered', 'registered', 'failed', 'failed'], [r['result'] for r in results])
+        self.assertEqual(['name,uuid,result,errors', 'host1,uuid-host1,registered,', 'host2,uuid-host2,registered,',
+            "host3,,failed,'uuid'", 'host4,,failed,Connection reset by peer'],
+            [self.read_output()[0]] + sorted(self.read_output()[1:]))
+
+    def test_joins_activation_keys_listed_in_json_manifest(self):
+        self.mock(self.module, 'ActivationKeyAPI', Mock()).return_value.activation_keys_by_organization.return_value = \
+            [{'name': 'key1'}, {'name': 'key2'}]
+        self.mock_options({
+            'org': self.ORG,
+            'file': self.write_file('systems.json', '[{"name": "host5", "activationkey": ["key1", "key2"]}]'),
+            'output': self.output
+        })
+        self.run_action(os.EX_OK)
+        self.assertEqual('key1,key2', self.action.api.register.call_args[0][3])
+
+    def test_rejects_records_with_invalid_values(self):
+        self.mock_options({
+            'org': self.ORG,
+            'file': self.write_file('systems.json', '[{"name": ["host5"]}, "host6", {"name": "host7", "facts": 1}]'),
+            'output': self.output,
+            'environment': 'Prod'
+        })
+        self.run_action(os.EX_DATAERR)
+        self.assertEqual([], self.registered())
+
+    def test_reads_json_manifest(self):
+        self.mock_options({
+            'org': self.ORG,
+            'file': self.write_file('systems.json', '[{"name": "host5", "facts": {"a": "b"}}]'),
+            'output': self.output,
+            'environment': 'Prod'
+        })
+        self.run_action(os.EX_OK)
+        args = self.action.api.register.call_args[0]
+        self.assertEqual(('host5', self.ORG, 3), args[:3])
+        self.assertEqual({'a': 'b'}, args[7])
+
+    def test_rejects_invalid_records(self):
+        self.write_file('systems.csv', "name,environment\nhost1,\nhost2,Dev\n")
+        self.run_action(os.EX_DATAERR)
+        self.assertEqual([], self.registered())
+
+    def test_fails_on_unknown_activation_key(self):
+        self.write_file('systems.csv', "name,activationkey\nhost1,key2\n")
+        self.run_action(os.EX_DATAERR)
+        self.assertEqual([], self.registered())
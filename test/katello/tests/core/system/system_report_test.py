@@ -1,5 +1,7 @@
 import unittest
+from StringIO import StringIO
 import os
+import sys
 
 from katello.tests.core.action_test_utils import CLIOptionTestCase, CLIActionTestCase
 from katello.tests.core.organization import organization_data
@@ -8,6 +10,10 @@ import katello.client.core.system
 from katello.client.core.system import Report
 from katello.client.lib.utils.io import convert_to_mime_type
 
+
+class ReportStream(StringIO):
+    length = None
+
 class RequiredCLIOptionsTests(CLIOptionTestCase):
     #requires: organization
     #optional: environment (defaults to Library)
@@ -33,8 +39,8 @@ class SystemReportTest(CLIActionTestCase):
     def setUp(self):
         self.set_action(Report())
         self.set_module(katello.client.core.system)
-        self.mock(self.action.api, 'report_by_org', ('', ''))
-        self.mock(self.action.api, 'report_by_env', ('', ''))
+        self.mock(self.action.api, 'report_by_org', (ReportStream(''), []))
+        self.mock(self.action.api, 'report_by_env', (ReportStream(''), []))
         self.mock(self.module, 'save_report')
         self.mock(self.module, 'get_katello_mode', 'katello')
         self.mock(self.module, 'get_environment', self.ENV)
@@ -43,12 +49,12 @@ class SystemReportTest(CLIActionTestCase):
     def test_it_calls_report_api_with_default_format(self):
         self.mock_options({'org': self.ORG_ID})
         self.run_action()
-        self.action.api.report_by_org.assert_called_once_with(self.ORG_ID, 'text/plain')
+        self.action.api.report_by_org.assert_called_once_with(self.ORG_ID, 'text/plain', stream=True)
 
     def test_it_uses_format_parameter(self):
         self.mock_options({'org': self.ORG_ID, 'format': 'pdf'})
         self.run_action()
-        self.action.api.report_by_org.assert_called_once_with(self.ORG_ID, convert_to_mime_type('pdf'))
+        self.action.api.report_by_org.assert_called_once_with(self.ORG_ID, convert_to_mime_type('pdf'), stream=True)
 
     def test_it_saves_pdf_report(self):
         self.mock_options({'org': self.ORG_ID, 'format': 'pdf'})
@@ -58,4 +64,16 @@ class SystemReportTest(CLIActionTestCase):
     def test_it_calls_report_by_env_api(self):
         self.mock_options({'org': self.ORG_ID, 'environment': self.ENV_NAME})
         self.run_action()
-        self.action.api.report_by_env.assert_called_once_with(self.ENV_ID, 'text/plain')
+        self.action.api.report_by_env.assert_called_once_with(self.ENV_ID, 'text/plain', stream=True)
+
+    def test_it_ends_text_report_with_new_line(self):
+        self.mock_options({'org': self.ORG_ID})
+        self.mock(self.action.api, 'report_by_org', (ReportStream('report'), []))
+        stdout = sys.stdout
+        sys.stdout = StringIO()
+        try:
+            self.run_action()
+            output = sys.stdout.getvalue()
+        finally:
+            sys.stdout = stdout
+        self.assertEqual('report\n', output)
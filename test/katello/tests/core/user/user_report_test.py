@@ -1,5 +1,7 @@
 import unittest
+from StringIO import StringIO
 import os
+import sys
 
 from katello.tests.core.action_test_utils import CLIOptionTestCase, CLIActionTestCase
 
@@ -7,12 +9,16 @@ import katello.client.core.user
 from katello.client.core.user import Report
 from katello.client.lib.utils.io import convert_to_mime_type
 
+
+class ReportStream(StringIO):
+    length = None
+
 class UserReportTest(CLIActionTestCase):
 
     def setUp(self):
         self.set_action(Report())
         self.set_module(katello.client.core.user)
-        self.mock(self.action.api, 'report', ('', ''))
+        self.mock(self.action.api, 'report', (ReportStream(''), []))
         self.mock(self.module, 'save_report')
 
     def tearDown(self):
@@ -20,14 +26,32 @@ class UserReportTest(CLIActionTestCase):
 
     def test_it_calls_report_api_with_default_format(self):
         self.run_action()
-        self.action.api.report.assert_called_once_with('text/plain')
+        self.action.api.report.assert_called_once_with('text/plain', stream=True)
 
     def test_it_uses_format_parameter(self):
         self.mock_options({'format': 'pdf'})
         self.run_action()
-        self.action.api.report.assert_called_once_with(convert_to_mime_type('pdf'))
+        self.action.api.report.assert_called_once_with(convert_to_mime_type('pdf'), stream=True)
 
     def test_it_saves_pdf_report(self):
         self.mock_options({'format': 'pdf'})
         self.run_action()
         self.module.save_report.assert_called_once()
+
+    def test_it_saves_pdf_report_to_attachment_file(self):
+        self.mock(self.action.api, 'report', (ReportStream('%PDF'), [('Content-Disposition', 'attachment; filename="users.pdf"')]))
+        self.mock_options({'format': 'pdf'})
+        self.run_action()
+        self.assertEqual('users.pdf', self.module.save_report.call_args[0][1])
+
+    def test_it_ends_text_report_with_new_line(self):
+        self.mock_options({})
+        self.mock(self.action.api, 'report', (ReportStream('report'), []))
+        stdout = sys.stdout
+        sys.stdout = StringIO()
+        try:
+            self.run_action()
+            output = sys.stdout.getvalue()
+        finally:
+            sys.stdout = stdout
+        self.assertEqual('report\n', output)
@@ -0,0 +1,34 @@
+import threading
+import unittest
+
+from katello.client import server
+from katello.client.server import KatelloServer
+
+
+class ActiveServerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.original = server.active_server
+        self.global_server = KatelloServer('localhost')
+        server.set_active_server(self.global_server)
+
+    def tearDown(self):
+        server.active_server = self.original
+
+    def in_thread(self, function):
+        results = []
+        thread = threading.Thread(target=lambda: results.append(function()))
+        thread.start()
+        thread.join()
+        return results[0]
+
+    def test_threads_use_global_server_by_default(self):
+        self.assertTrue(self.in_thread(server.get_active_server) is self.global_server)
+
+    def test_thread_local_server_is_used_only_by_its_thread(self):
+        thread_server = KatelloServer('worker')
+        def set_and_get():
+            server.set_active_server(thread_server, thread_local=True)
+            return server.get_active_server()
+        self.assertTrue(self.in_thread(set_and_get) is thread_server)
+        self.assertTrue(server.get_active_server() is self.global_server)
@@ -0,0 +1,62 @@
+import unittest
+from mock import Mock
+
+from katello.client.server import ConnectionPool, KatelloServer, BasicAuthentication
+
+
+class ConnectionPoolTest(unittest.TestCase):
+
+    KEY = ('localhost', 443, 'https', 'NoAuthentication')
+
+    def setUp(self):
+        self.pool = ConnectionPool(max_per_host=2, idle_timeout=60)
+        self.factory = Mock(side_effect=lambda: Mock())
+
+    def test_creates_new_connection_when_pool_is_empty(self):
+        connection, reused = self.pool.acquire(self.KEY, self.factory)
+        self.assertFalse(reused)
+        self.assertEqual(1, self.factory.call_count)
+
+    def test_reuses_released_connection(self):
+        connection, __ = self.pool.acquire(self.KEY, self.factory)
+        self.pool.release(self.KEY, connection)
+        reused_connection, reused = self.pool.acquire(self.KEY, self.factory)
+        self.assertTrue(reused)
+        self.assertTrue(reused_connection is connection)
+        self.assertEqual(1, self.factory.call_count)
+
+    def test_does_not_share_connections_between_keys(self):
+        connection, __ = self.pool.acquire(self.KEY, self.factory)
+        self.pool.release(self.KEY, connection)
+        __, reused = self.pool.acquire(('otherhost', 443, 'https', 'NoAuthentication'), self.factory)
+        self.assertFalse(reused)
+
+    def test_closes_connections_over_the_limit(self):
+        connections = [self.pool.acquire(self.KEY, self.factory)[0] for __ in range(3)]
+        for connection in connections:
+            self.pool.release(self.KEY, connection)
+        self.assertFalse(connections[0].close.called)
+        self.assertFalse(connections[1].close.called)
+        self.assertTrue(connections[2].close.called)
+
+    def test_evicts_idle_connections(self):
+        self.pool.idle_timeout = -1
+        connection, __ = self.pool.acquire(self.KEY, self.factory)
+        self.pool.release(self.KEY, connection)
+        __, reused = self.pool.acquire(self.KEY, self.factory)
+        self.assertFalse(reused)
+        self.assertTrue(connection.close.called)
+
+    def test_clear_closes_idle_connections(self):
+        connection, __ = self.pool.acquire(self.KEY, self.factory)
+        self.pool.release(self.KEY, connection)
+        self.pool.clear()
+        self.assertTrue(connection.close.called)
+
+
+class ConnectionKeyTest(unittest.TestCase):
+
+    def test_key_contains_server_and_auth_identification(self):
+        s = KatelloServer('localhost', 443, 'https', '/katello')
+        s.set_auth_method(BasicAuthentication('admin', 'admin'))
+        self.assertEqual(('localhost', 443, 'https', 'BasicAuthentication', 'admin'), s._connection_key())
@@ -0,0 +1,79 @@
+import unittest
+import zlib
+from StringIO import StringIO
+
+from katello.client.server import DecompressingReader, KatelloServer
+
+
+class FakeResponse(StringIO):
+
+    def __init__(self, body, encoding=None):
+        StringIO.__init__(self, body)
+        self.encoding = encoding
+
+    def getheader(self, name, default=None):
+        if name == 'content-encoding':
+            return self.encoding
+        return default
+
+
+class DecompressingReaderTest(unittest.TestCase):
+
+    BODY = '[' + ','.join(['{"name": "system_%i"}' % i for i in range(10000)]) + ']'
+
+    def compress(self, wbits):
+        compressor = zlib.compressobj(6, zlib.DEFLATED, wbits)
+        return compressor.compress(self.BODY) + compressor.flush()
+
+    def test_reads_plain_body(self):
+        self.assertEqual(self.BODY, DecompressingReader(FakeResponse(self.BODY)).read())
+
+    def test_decompresses_gzip(self):
+        response = FakeResponse(self.compress(16 + zlib.MAX_WBITS), 'gzip')
+        self.assertEqual(self.BODY, DecompressingReader(response).read())
+
+    def test_decompresses_deflate(self):
+        response = FakeResponse(self.compress(zlib.MAX_WBITS), 'deflate')
+        self.assertEqual(self.BODY, DecompressingReader(response).read())
+
+    def test_decompresses_raw_deflate(self):
+        response = FakeResponse(self.compress(-zlib.MAX_WBITS), 'deflate')
+        self.assertEqual(self.BODY, DecompressingReader(response).read())
+
+    def test_reads_in_blocks(self):
+        reader = DecompressingReader(FakeResponse(self.compress(16 + zlib.MAX_WBITS), 'gzip'))
+        blocks = []
+        block = reader.read(1000)
+        while block:
+            self.assertTrue(len(block) <= 1000)
+            blocks.append(block)
+            block = reader.read(1000)
+        self.assertEqual(self.BODY, ''.join(blocks))
+
+    def test_reads_rest_after_block(self):
+        reader = DecompressingReader(FakeResponse(self.compress(16 + zlib.MAX_WBITS), 'gzip'))
+        block = reader.read(1000)
+        self.assertEqual(self.BODY, block + reader.read())
+
+
+class RequestCompressionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = KatelloServer('localhost')
+
+    def test_accepts_compressed_responses_by_default(self):
+        self.assertEqual('gzip, deflate', self.server.headers['Accept-Encoding'])
+
+    def test_compression_can_be_disabled(self):
+        self.server.set_compression(False)
+        self.assertFalse('Accept-Encoding' in self.server.headers)
+
+    def test_compresses_only_large_bodies(self):
+        self.server.set_compression(True, True)
+        self.assertFalse(self.server._should_compress('POST', '{}'))
+        self.assertTrue(self.server._should_compress('POST', ' ' * KatelloServer.COMPRESSION_THRESHOLD))
+        self.assertFalse(self.server._should_compress('GET', ' ' * KatelloServer.COMPRESSION_THRESHOLD))
+
+    def test_compressed_body_is_gzip(self):
+        body = ' ' * KatelloServer.COMPRESSION_THRESHOLD
+        self.assertEqual(body, zlib.decompress(self.server._compress_body(body), 16 + zlib.MAX_WBITS))
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+import cgi
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from BaseHTTPServer import BaseHTTPRequestHandler
+
+try:
+    import json
+except ImportError:
+    import simplejson as json
+
+from katello.client import server
+from katello.client.server import KatelloServer, MultipartBody
+from katello.tests.server.server_concurrency_test import ThreadedHTTPServer
+
+
+class FormHandler(BaseHTTPRequestHandler):
+    """
+    Responds with checksums of the posted form fields
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        form = cgi.FieldStorage(fp=self.rfile, headers=self.headers,
+            environ={'REQUEST_METHOD': 'POST', 'CONTENT_TYPE': self.headers.getheader('content-type')})
+        response = json.dumps(dict((key, hashlib.sha1(form[key].value).hexdigest()) for key in form.keys()))
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def log_message(self, *args):
+        pass
+
+
+class MultipartBodyTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'manifest.zip')
+        self.content = os.urandom(1024) * 300
+        f = open(self.path, 'wb')
+        f.write(self.content)
+        f.close()
+        self.file = open(self.path, 'rb')
+
+    def tearDown(self):
+        self.file.close()
+        shutil.rmtree(self.directory)
+
+    def body(self):
+        return MultipartBody([('offset', '10'), ('name', u'človek'), ('import', self.file)], 'B')
+
+    def test_encodes_fields_and_files(self):
+        expected = '\r\n'.join([
+            '--B', 'Content-Disposition: form-data; name="offset"', '', '10',
+            '--B', 'Content-Disposition: form-data; name="name"', '', u'človek'.encode('utf-8'),
+            '--B', 'Content-Disposition: form-data; name="import"; filename="%s"' % self.path,
+            'Content-Type: application/zip', '', self.content,
+            '--B--', ''])
+        self.assertEqual(expected, self.body().read())
+
+    def test_length_is_known_upfront(self):
+        body = self.body()
+        length = len(body)
+        self.assertEqual(length, len(body.read()))
+
+    def test_file_is_read_in_blocks(self):
+        body = self.body()
+        blocks = list(body)
+        self.assertTrue(max([len(block) for block in blocks]) <= MultipartBody.BLOCK_SIZE)
+        self.assertEqual(len(body), sum([len(block) for block in blocks]))
+
+    def test_read_returns_at_most_size_bytes(self):
+        body = self.body()
+        data = []
+        block = body.read(8192)
+        while block:
+            self.assertTrue(len(block) <= 8192)
+            data.append(block)
+            block = body.read(8192)
+        self.assertEqual(len(body), len(''.join(data)))
+
+    def test_rewind_starts_from_beginning(self):
+        body = self.body()
+        first = body.read()
+        body.rewind()
+        self.assertEqual(first, body.read())
+
+
+class MultipartRequestTest(unittest.TestCase):
+
+    def setUp(self):
+        self.http_server = ThreadedHTTPServer(('127.0.0.1', 0), FormHandler)
+        self.server_thread = threading.Thread(target=self.http_server.serve_forever)
+        self.server_thread.daemon = True
+        self.server_thread.start()
+        self.path = tempfile.mktemp()
+        self.content = os.urandom(1024) * 1000
+        f = open(self.path, 'wb')
+        f.write(self.content)
+        f.close()
+
+    def tearDown(self):
+        self.http_server.shutdown()
+        self.http_server.server_close()
+        server.connection_pool.clear()
+        os.remove(self.path)
+
+    def test_file_is_streamed_to_server(self):
+        katello_server = KatelloServer('127.0.0.1', self.http_server.server_address[1], 'http')
+        f = open(self.path, 'rb')
+        try:
+            status, body, __ = katello_server.POST('/api/providers/1/import_manifest', {'import': f, 'force': 'true'},
+                multipart=True)
+        finally:
+            f.close()
+        self.assertEqual(200, status)
+        self.assertEqual({'import': hashlib.sha1(self.content).hexdigest(), 'force': hashlib.sha1('true').hexdigest()},
+            body)
@@ -0,0 +1,61 @@
+import threading
+import unittest
+from BaseHTTPServer import BaseHTTPRequestHandler
+
+from katello.client import server
+from katello.client.server import KatelloServer, ResponseStream
+from katello.tests.server.server_concurrency_test import ThreadedHTTPServer
+
+REPORT = 'x' * (1024 * 1024) + 'end'
+
+
+class ReportHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/pdf')
+        self.send_header('Content-Disposition', 'attachment; filename="report.pdf"')
+        self.send_header('Content-Length', str(len(REPORT)))
+        self.end_headers()
+        self.wfile.write(REPORT)
+
+    def log_message(self, *args):
+        pass
+
+
+class ResponseStreamTest(unittest.TestCase):
+
+    def setUp(self):
+        self.http_server = ThreadedHTTPServer(('127.0.0.1', 0), ReportHandler)
+        self.server_thread = threading.Thread(target=self.http_server.serve_forever)
+        self.server_thread.daemon = True
+        self.server_thread.start()
+        self.katello_server = KatelloServer('127.0.0.1', self.http_server.server_address[1], 'http')
+
+    def tearDown(self):
+        self.http_server.shutdown()
+        self.http_server.server_close()
+        server.connection_pool.clear()
+
+    def test_body_is_read_in_blocks(self):
+        status, body, headers = self.katello_server.GET('/api/users/report', raw=True)
+        self.assertEqual(200, status)
+        self.assertTrue(isinstance(body, ResponseStream))
+        self.assertEqual(len(REPORT), body.length)
+        blocks = []
+        block = body.read(65536)
+        while block:
+            self.assertTrue(len(block) <= 65536)
+            blocks.append(block)
+            block = body.read(65536)
+        body.close()
+        self.assertEqual(REPORT, ''.join(blocks))
+
+    def test_next_request_follows_read_body(self):
+        status, body, headers = self.katello_server.GET('/api/users/report', raw=True)
+        body.read()
+        body.close()
+        status, body, headers = self.katello_server.GET('/api/users/report', raw=True)
+        self.assertEqual(REPORT, body.read())
+        body.close()
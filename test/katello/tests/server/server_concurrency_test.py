@@ -0,0 +1,112 @@
+import base64
+import threading
+import unittest
+from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+from SocketServer import ThreadingMixIn
+
+try:
+    import json
+except ImportError:
+    import simplejson as json
+
+from katello.client import server
+from katello.client.server import KatelloServer, BasicAuthentication
+
+
+class EchoHandler(BaseHTTPRequestHandler):
+    """
+    Responds with the request it received, keeps the connections alive
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.echo(None)
+
+    def do_POST(self):
+        self.echo(self.rfile.read(int(self.headers.getheader('content-length'))))
+
+    def echo(self, body):
+        response = json.dumps({
+            'path': self.path,
+            'authorization': self.headers.getheader('authorization'),
+            'request_id': self.headers.getheader('x-request-id'),
+            'body': body and json.loads(body)
+        })
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def log_message(self, *args):
+        pass
+
+
+class ThreadedHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class ServerConcurrencyTest(unittest.TestCase):
+    """
+    Drives many requests in parallel against a local stand-in server and
+    checks that no request sees headers or bodies of another one.
+    """
+
+    THREADS = 8
+    REQUESTS = 40
+
+    def setUp(self):
+        self.http_server = ThreadedHTTPServer(('127.0.0.1', 0), EchoHandler)
+        self.port = self.http_server.server_address[1]
+        self.server_thread = threading.Thread(target=self.http_server.serve_forever)
+        self.server_thread.daemon = True
+        self.server_thread.start()
+        self.errors = []
+
+    def tearDown(self):
+        self.http_server.shutdown()
+        self.http_server.server_close()
+        server.connection_pool.clear()
+
+    def create_server(self, username):
+        katello_server = KatelloServer('127.0.0.1', self.port, 'http', '/katello')
+        katello_server.set_auth_method(BasicAuthentication(username, 'secret'))
+        return katello_server
+
+    def drive(self, katello_server, username, worker):
+        try:
+            for i in range(self.REQUESTS):
+                request_id = '%d-%d' % (worker, i)
+                queries = {'id': request_id}
+                if i % 2:
+                    status, body, __ = katello_server.POST('/api/systems/', {'id': request_id},
+                        custom_headers={'X-Request-Id': request_id})
+                    self.assertEqual({'id': request_id}, body['body'])
+                else:
+                    status, body, __ = katello_server.GET('/api/systems/', queries,
+                        custom_headers={'X-Request-Id': request_id})
+                    self.assertEqual({'id': request_id}, queries)
+                self.assertEqual(200, status)
+                self.assertEqual(request_id, body['request_id'])
+                self.assertTrue('/api/systems/' in body['path'])
+                self.assertEqual('Basic ' + base64.b64encode(username + ':secret'), body['authorization'])
+        except Exception, e: # pylint: disable=W0703
+            self.errors.append(e)
+
+    def run_workers(self, servers):
+        threads = [threading.Thread(target=self.drive, args=(katello_server, username, worker))
+                   for worker, (katello_server, username) in enumerate(servers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual([], self.errors)
+
+    def test_shared_server(self):
+        katello_server = self.create_server('admin')
+        self.run_workers([(katello_server, 'admin')] * self.THREADS)
+        self.assertFalse('content-length' in katello_server.headers)
+        self.assertFalse('Authorization' in katello_server.headers)
+
+    def test_server_per_thread(self):
+        self.run_workers([(self.create_server('user%d' % i), 'user%d' % i) for i in range(self.THREADS)])
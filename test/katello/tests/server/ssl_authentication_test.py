@@ -0,0 +1,50 @@
+import os
+import tempfile
+import unittest
+
+from mock import Mock
+
+from katello.tests.test_utils import EasyMock
+
+import katello.client.server
+from katello.client.server import SSLAuthentication
+
+
+class SSLContextCacheTest(unittest.TestCase, EasyMock):
+
+    def setUp(self):
+        self.certfile = tempfile.NamedTemporaryFile()
+        self.keyfile = tempfile.NamedTemporaryFile()
+        self.mock(katello.client.server.SSL, 'Context').return_value = Mock()
+        self.mock(katello.client.server, 'ResumableHTTPSConnection')
+        SSLAuthentication._contexts.clear()
+        self.auth = SSLAuthentication(self.certfile.name, self.keyfile.name)
+
+    def tearDown(self):
+        self.restore_mocks()
+        SSLAuthentication._contexts.clear()
+        self.certfile.close()
+        self.keyfile.close()
+
+    def test_context_is_created_only_once(self):
+        self.auth.connect('localhost', 443, 'https')
+        self.auth.connect('localhost', 443, 'https')
+        self.assertEqual(1, katello.client.server.SSL.Context.call_count)
+
+    def test_context_is_shared_between_instances(self):
+        self.auth.connect('localhost', 443, 'https')
+        SSLAuthentication(self.certfile.name, self.keyfile.name).connect('localhost', 443, 'https')
+        self.assertEqual(1, katello.client.server.SSL.Context.call_count)
+
+    def test_context_is_reloaded_when_certificate_changes(self):
+        self.auth.connect('localhost', 443, 'https')
+        stat = os.stat(self.certfile.name)
+        os.utime(self.certfile.name, (stat.st_atime, stat.st_mtime + 10))
+        self.auth.connect('localhost', 443, 'https')
+        self.assertEqual(2, katello.client.server.SSL.Context.call_count)
+
+    def test_connections_share_session_cache(self):
+        self.auth.connect('localhost', 443, 'https')
+        self.auth.connect('localhost', 443, 'https')
+        calls = katello.client.server.ResumableHTTPSConnection.call_args_list
+        self.assertTrue(calls[0][0][2] is calls[1][0][2])
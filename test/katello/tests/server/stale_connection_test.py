@@ -0,0 +1,60 @@
+import httplib
+import socket
+import unittest
+from mock import Mock
+
+from katello.client import server
+from katello.client.server import KatelloServer, MultipartBody
+
+
+class StaleConnectionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = KatelloServer('localhost')
+        self.stale = Mock()
+        self.fresh = Mock()
+        self.fresh.getresponse.return_value = 'response'
+        self.server._connect = Mock(return_value=self.fresh)
+        self.discard = server.connection_pool.discard
+        server.connection_pool.discard = Mock()
+
+    def tearDown(self):
+        server.connection_pool.discard = self.discard
+
+    def send(self, method, error, body=None, reused=True):
+        self.stale.getresponse.side_effect = error
+        return self.server._send_request(self.stale, reused, method, '/api/systems', body, {})
+
+    def test_resends_request_that_couldnt_be_sent(self):
+        self.stale.request.side_effect = httplib.CannotSendRequest()
+        self.assertEqual((self.fresh, 'response'), self.send('POST', None))
+        server.connection_pool.discard.assert_called_once_with(self.stale)
+
+    def test_resends_request_the_server_didnt_read(self):
+        self.assertEqual((self.fresh, 'response'), self.send('POST', httplib.BadStatusLine('')))
+
+    def test_resends_get_after_error_of_the_response(self):
+        self.assertEqual((self.fresh, 'response'), self.send('GET', socket.error(104, 'Connection reset by peer')))
+
+    def test_doesnt_resend_post_after_error_of_the_response(self):
+        self.assertRaises(socket.timeout, self.send, 'POST', socket.timeout())
+        self.assertFalse(self.fresh.request.called)
+
+    def test_doesnt_resend_put_after_partial_status_line(self):
+        self.assertRaises(httplib.BadStatusLine, self.send, 'PUT', httplib.BadStatusLine('HTT'))
+        self.assertFalse(self.fresh.request.called)
+
+    def test_doesnt_resend_on_new_connection(self):
+        self.stale.request.side_effect = httplib.CannotSendRequest()
+        self.assertRaises(httplib.CannotSendRequest, self.send, 'GET', None, reused=False)
+
+    def test_rewinds_multipart_body(self):
+        body = MultipartBody([('name', 'value')], 'boundary')
+        body.read()
+        self.send('GET', httplib.BadStatusLine(''), body)
+        self.assertEqual(len(body), len(self.fresh.request.call_args[1]['body'].read()))
+
+    def test_doesnt_resend_body_that_cant_be_rewound(self):
+        body = iter(['block'])
+        self.assertRaises(httplib.BadStatusLine, self.send, 'GET', httplib.BadStatusLine(''), body)
+        self.assertFalse(self.fresh.request.called)
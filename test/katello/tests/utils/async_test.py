@@ -0,0 +1,49 @@
+import unittest
+from mock import Mock
+
+from katello.client.lib.async import AsyncTask
+from katello.client.lib.ui.progress import PollingDelay
+
+
+class AsyncTaskUpdateTest(unittest.TestCase):
+
+    TASKS = [
+        {'uuid': '1', 'state': 'finished'},
+        {'uuid': '2', 'state': 'running'},
+        {'uuid': '3', 'state': 'waiting'}
+    ]
+
+    def setUp(self):
+        self.api = Mock()
+        self.api.status.side_effect = lambda uuid: {'uuid': uuid, 'state': 'finished'}
+        self.task = AsyncTask([dict(t) for t in self.TASKS])
+        self.task.status_api = Mock(return_value=self.api)
+
+    def test_polls_only_running_tasks(self):
+        self.task.update()
+        self.assertEqual(set(['2', '3']), set(c[0][0] for c in self.api.status.call_args_list))
+
+    def test_keeps_order_of_tasks(self):
+        self.task.update()
+        self.assertEqual(['1', '2', '3'], [t['uuid'] for t in self.task.get_hashes()])
+        self.assertTrue(self.task.finished())
+
+
+class PollingDelayTest(unittest.TestCase):
+
+    def test_delay_grows_up_to_ceiling(self):
+        delays = PollingDelay(1, factor=2, jitter=0)
+        delays.max_delay = 5
+        self.assertEqual([1, 2, 4, 5, 5], [delays.next() for __ in range(5)])
+
+    def test_jitter_stays_in_range(self):
+        delays = PollingDelay(2, factor=1, jitter=0.5)
+        for __ in range(20):
+            self.assertTrue(1 <= delays.next() <= 3)
+
+    def test_reset_starts_from_initial_delay(self):
+        delays = PollingDelay(1, factor=2, jitter=0)
+        delays.next()
+        delays.next()
+        delays.reset()
+        self.assertEqual(1, delays.next())
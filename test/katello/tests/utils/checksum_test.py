@@ -0,0 +1,48 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import unittest
+
+from katello.client.lib.rpm_utils import _calculate_checksum
+from katello.client.lib.utils.checksum import MultiHash, file_checksums
+
+
+class ChecksumTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'content.bin')
+        # spans more read buffers
+        self.content = os.urandom(1024) * 2500
+        f = open(self.path, 'wb')
+        f.write(self.content)
+        f.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_multi_hash_computes_all_algorithms(self):
+        hashes = MultiHash(['sha256', 'sha1'])
+        hashes.update('abc')
+        hashes.update('def')
+        self.assertEqual({'sha256': hashlib.sha256('abcdef').hexdigest(), 'sha1': hashlib.sha1('abcdef').hexdigest()},
+            hashes.hexdigests())
+
+    def test_multi_hash_rejects_unknown_algorithm(self):
+        self.assertRaises(KeyError, MultiHash(['sha256']).hexdigest, 'sha1')
+
+    def test_file_checksums_read(self):
+        self.assertEqual({'sha256': hashlib.sha256(self.content).hexdigest(), 'sha1': hashlib.sha1(self.content).hexdigest()},
+            file_checksums(self.path, ['sha256', 'sha1'], use_mmap=False))
+
+    def test_file_checksums_mmap(self):
+        self.assertEqual(hashlib.sha256(self.content).hexdigest(),
+            file_checksums(self.path, use_mmap=True)['sha256'])
+
+    def test_empty_file(self):
+        open(self.path, 'w').close()
+        self.assertEqual(hashlib.sha256('').hexdigest(), file_checksums(self.path, use_mmap=True)['sha256'])
+
+    def test_rpm_checksum_covers_whole_file(self):
+        self.assertEqual(hashlib.sha256(self.content).hexdigest(), _calculate_checksum('sha256', self.path))
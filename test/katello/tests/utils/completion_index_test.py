@@ -0,0 +1,75 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from katello.client.completion_index import CompletionIndex, IndexCompletion
+from katello.client.core.base import Command, Action
+
+
+class CompletionIndexTest(unittest.TestCase):
+
+    STAMP = [1000.0, [1000.0, None, None]]
+    TREE = {'commands': {}, 'options': ['--help']}
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.index = CompletionIndex(os.path.join(self.directory, 'katello', CompletionIndex.FILE))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_missing_index_is_not_loaded(self):
+        self.assertEqual(None, self.index.load('katello', self.STAMP))
+
+    def test_loads_saved_tree(self):
+        self.index.save('katello', self.STAMP, self.TREE)
+        self.assertEqual(self.TREE, self.index.load('katello', self.STAMP))
+
+    def test_outdated_index_is_not_loaded(self):
+        self.index.save('katello', self.STAMP, self.TREE)
+        self.assertEqual(None, self.index.load('katello', [1001.0, [1000.0, None, None]]))
+
+    def test_keeps_trees_of_more_modes(self):
+        self.index.save('katello', self.STAMP, self.TREE)
+        self.index.save('headpin', self.STAMP, {'commands': {}, 'options': []})
+        self.assertEqual(self.TREE, self.index.load('katello', self.STAMP))
+
+    def test_builds_tree_of_commands(self):
+        cmd = Command()
+        cmd.add_command('ping', Action())
+        tree = CompletionIndex.build(cmd)
+        self.assertEqual(['ping'], tree['commands'].keys())
+        self.assertTrue('--help' in tree['commands']['ping']['options'])
+
+
+class IndexCompletionTest(unittest.TestCase):
+
+    TREE = {
+        'commands': {
+            'repo': {
+                'commands': {
+                    'list': {'commands': {}, 'options': ['--help', '--org', '--product']},
+                    'info': {'commands': {}, 'options': ['--help', '--id']}
+                },
+                'options': ['--help']
+            },
+            'ping': {'commands': {}, 'options': ['--help']}
+        },
+        'options': ['--help', '--username']
+    }
+
+    def setUp(self):
+        self.completion = IndexCompletion(self.TREE)
+
+    def test_completes_commands(self):
+        self.assertEqual(['repo'], self.completion.complete('katello re'))
+
+    def test_completes_subcommands(self):
+        self.assertEqual(['info'], self.completion.complete('katello repo i'))
+
+    def test_completes_options(self):
+        self.assertEqual(['--org'], self.completion.complete('katello repo list --o'))
+
+    def test_offers_everything_after_space(self):
+        self.assertEqual(['--help', '--id'], sorted(self.completion.complete('katello repo info ')))
@@ -0,0 +1,128 @@
+import sys
+import threading
+import time
+import unittest
+
+from StringIO import StringIO
+
+from katello.client import server
+from katello.client.server import KatelloServer
+from katello.client.lib.utils.concurrency import parallel_map, ThreadLocalStream
+
+
+class ParallelMapTest(unittest.TestCase):
+
+    def test_returns_results_in_order(self):
+        def slow_square(x):
+            time.sleep(0.01 * (5 - x))
+            return x * x
+        self.assertEqual([0, 1, 4, 9, 16], parallel_map(slow_square, range(5), 5))
+
+    def test_runs_calls_concurrently(self):
+        barrier = threading.Semaphore(0)
+        def wait_for_other(x):
+            barrier.release()
+            time.sleep(0.05)
+            return barrier.acquire(False)
+        self.assertEqual([True, True], parallel_map(wait_for_other, [1, 2], 2))
+
+    def test_reraises_exception(self):
+        def fail_on_two(x):
+            if x == 2:
+                raise ValueError(x)
+            return x
+        self.assertRaises(ValueError, parallel_map, fail_on_two, [1, 2, 3], 2)
+
+    def test_single_worker_runs_serially(self):
+        threads = set()
+        parallel_map(lambda x: threads.add(threading.current_thread()), range(3), 1)
+        self.assertEqual(set([threading.current_thread()]), threads)
+
+    def test_consumes_generator_lazily_in_order(self):
+        produced = []
+        running = []
+        def generate():
+            for x in range(20):
+                produced.append((x, len(running)))
+                yield x
+        def process(x):
+            running.append(x)
+            time.sleep(0.005)
+            running.remove(x)
+            return x
+        self.assertEqual(range(20), parallel_map(process, generate(), 3))
+        self.assertEqual(range(20), [x for x, __ in produced])
+        self.assertTrue(max([count for __, count in produced]) <= 3)
+
+
+class ThreadLocalStreamTest(unittest.TestCase):
+
+    def setUp(self):
+        self.output = StringIO()
+        self.stream = ThreadLocalStream(self.output)
+
+    def test_writes_through_when_not_capturing(self):
+        self.stream.write("text")
+        self.assertEqual("text", self.output.getvalue())
+
+    def test_captures_output_of_the_current_thread(self):
+        self.stream.capture()
+        self.stream.write("captured")
+        self.assertEqual("", self.output.getvalue())
+        self.assertEqual(["captured"], self.stream.release())
+        self.stream.write("text")
+        self.assertEqual("text", self.output.getvalue())
+
+    def test_other_threads_are_not_captured(self):
+        self.stream.capture()
+        thread = threading.Thread(target=self.stream.write, args=("other",))
+        thread.start()
+        thread.join()
+        self.assertEqual("other", self.output.getvalue())
+        self.assertEqual([], self.stream.release())
+
+
+class ThreadContextTest(unittest.TestCase):
+
+    def setUp(self):
+        self.original_server = server.active_server
+        self.original_stdout = sys.stdout
+        self.global_server = KatelloServer('localhost')
+        server.set_active_server(self.global_server)
+
+    def tearDown(self):
+        sys.stdout = self.original_stdout
+        server.active_server = self.original_server
+
+    def in_worker(self, function):
+        """
+        Run the function in a thread with its own server, like a worker of a batch shell
+        """
+        results = []
+        def worker():
+            server.set_active_server(KatelloServer('worker'), thread_local=True)
+            results.append(function())
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+        return results[0]
+
+    def test_parallel_map_uses_server_of_the_calling_thread(self):
+        def servers():
+            return server.get_active_server(), parallel_map(lambda x: server.get_active_server(), range(4), 4)
+        worker_server, helper_servers = self.in_worker(servers)
+        self.assertEqual([worker_server] * 4, helper_servers)
+        self.assertFalse(worker_server is self.global_server)
+
+    def test_parallel_map_keeps_global_server_in_main_thread(self):
+        helper_servers = parallel_map(lambda x: server.get_active_server(), range(4), 4)
+        self.assertEqual([self.global_server] * 4, helper_servers)
+
+    def test_parallel_map_output_is_captured_with_the_caller(self):
+        output = StringIO()
+        sys.stdout = ThreadLocalStream(output)
+        sys.stdout.capture()
+        parallel_map(lambda x: sys.stdout.write("%d" % x), range(4), 4)
+        captured = sys.stdout.release()
+        self.assertEqual("", output.getvalue())
+        self.assertEqual(["0", "1", "2", "3"], sorted(captured))
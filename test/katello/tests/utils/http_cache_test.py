@@ -0,0 +1,70 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from katello.client.lib.http_cache import ResponseCache
+
+
+class ResponseCacheTest(unittest.TestCase):
+
+    KEY = ResponseCache.key(('localhost', 443, 'admin'), '/katello/api/organizations/ACME')
+    BODY = {'name': 'ACME', 'label': 'ACME'}
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = ResponseCache(os.path.join(self.directory, 'cache'))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_stores_response_with_etag(self):
+        self.cache.store(self.KEY, 200, self.BODY, [('ETag', '"abc"')])
+        entry = self.cache.get(self.KEY)
+        self.assertEqual(self.BODY, entry['body'])
+        self.assertEqual({'If-None-Match': '"abc"'}, ResponseCache.validators(entry))
+
+    def test_skips_response_without_validators(self):
+        self.assertEqual(None, self.cache.store(self.KEY, 200, self.BODY, [('Content-Type', 'application/json')]))
+        self.assertEqual(None, self.cache.get(self.KEY))
+
+    def test_skips_no_store_response(self):
+        self.cache.store(self.KEY, 200, self.BODY, [('ETag', '"abc"'), ('Cache-Control', 'private, no-store')])
+        self.assertEqual(None, self.cache.get(self.KEY))
+
+    def test_keys_differ_per_identity(self):
+        self.assertNotEqual(self.KEY, ResponseCache.key(('localhost', 443, 'other'), '/katello/api/organizations/ACME'))
+
+    def test_max_age_makes_entry_fresh(self):
+        entry = self.cache.store(self.KEY, 200, self.BODY, [('Cache-Control', 'max-age=60')])
+        self.assertTrue(ResponseCache.is_fresh(entry))
+        self.assertFalse(ResponseCache.is_fresh(entry, time.time() + 120))
+
+    def test_no_cache_entry_is_never_fresh(self):
+        entry = self.cache.store(self.KEY, 200, self.BODY, [('Cache-Control', 'max-age=60, no-cache'), ('ETag', '"a"')])
+        self.assertFalse(ResponseCache.is_fresh(entry))
+
+    def test_revalidation_updates_validators(self):
+        entry = self.cache.store(self.KEY, 200, self.BODY, [('ETag', '"abc"')])
+        self.cache.revalidated(self.KEY, entry, [('ETag', '"def"')])
+        self.assertEqual('"def"', self.cache.get(self.KEY)['etag'])
+
+    def test_corrupted_entry_is_dropped(self):
+        self.cache.store(self.KEY, 200, self.BODY, [('ETag', '"abc"')])
+        f = open(os.path.join(self.cache.directory, self.KEY + ResponseCache.SUFFIX), 'w')
+        f.write('{"status": ')
+        f.close()
+        self.assertEqual(None, self.cache.get(self.KEY))
+        self.assertEqual([], os.listdir(self.cache.directory))
+
+    def test_evicts_least_recently_used_entries(self):
+        keys = [ResponseCache.key((), str(i)) for i in range(3)]
+        for i, key in enumerate(keys):
+            self.cache.store(key, 200, 'x' * 100, [('ETag', '"%s"' % i)])
+            path = os.path.join(self.cache.directory, key + ResponseCache.SUFFIX)
+            os.utime(path, (1000 + i, 1000 + i))
+        self.cache.max_size = 3 * os.path.getsize(path)
+        self.cache.store(ResponseCache.key((), 'new'), 200, 'x' * 100, [('ETag', '"new"')])
+        self.assertEqual(None, self.cache.get(keys[0]))
+        self.assertNotEqual(None, self.cache.get(keys[2]))
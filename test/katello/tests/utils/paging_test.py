@@ -0,0 +1,162 @@
+import threading
+import unittest
+
+from katello.client import server
+from katello.client.server import KatelloServer
+from katello.client.lib.utils.paging import paged_items, slice_items
+
+
+class PagedCollection(object):
+    """
+    Server side collection returned in pages, records the requested pages
+    """
+
+    def __init__(self, size, paging=True):
+        self.records = range(size)
+        self.paging = paging
+        self.requests = []
+
+    def fetch_page(self, page, per_page):
+        self.requests.append((page, per_page))
+        if not self.paging:
+            return list(self.records)
+        start = (page - 1) * per_page
+        return self.records[start:start + per_page]
+
+
+class PagedItemsTest(unittest.TestCase):
+
+    def test_returns_all_records(self):
+        collection = PagedCollection(25)
+        self.assertEqual(range(25), list(paged_items(collection.fetch_page, per_page=10)))
+        self.assertEqual([(1, 10), (2, 10), (3, 10)], collection.requests)
+
+    def test_stops_after_empty_page(self):
+        collection = PagedCollection(20)
+        self.assertEqual(range(20), list(paged_items(collection.fetch_page, per_page=10)))
+        self.assertEqual([(1, 10), (2, 10), (3, 10)], collection.requests)
+
+    def test_fetches_first_page_immediately(self):
+        collection = PagedCollection(5)
+        paged_items(collection.fetch_page, per_page=10)
+        self.assertEqual([(1, 10)], collection.requests)
+
+    def test_raises_error_of_first_page_immediately(self):
+        def fail(page, per_page):
+            raise ValueError(page)
+        self.assertRaises(ValueError, paged_items, fail)
+
+    def test_reraises_error_of_later_page(self):
+        def fail_on_second(page, per_page):
+            if page == 2:
+                raise ValueError(page)
+            return range(per_page)
+        self.assertRaises(ValueError, list, paged_items(fail_on_second, per_page=10))
+
+    def test_starts_at_offset(self):
+        collection = PagedCollection(25)
+        self.assertEqual(range(13, 25), list(paged_items(collection.fetch_page, offset=13, per_page=10)))
+        self.assertEqual([(1, 1), (2, 10), (3, 10)], sorted(collection.requests))
+
+    def test_fetches_only_pages_within_limit(self):
+        collection = PagedCollection(100)
+        self.assertEqual(range(5, 25), list(paged_items(collection.fetch_page, offset=5, limit=20, per_page=10)))
+        self.assertEqual([(1, 10), (2, 10), (3, 10)], collection.requests)
+
+    def test_small_limit_reduces_page_size(self):
+        collection = PagedCollection(100)
+        self.assertEqual([6, 7, 8], list(paged_items(collection.fetch_page, offset=6, limit=3, per_page=10)))
+        self.assertEqual([(1, 1), (3, 3)], sorted(collection.requests))
+
+    def test_zero_limit_fetches_nothing(self):
+        collection = PagedCollection(10)
+        self.assertEqual([], list(paged_items(collection.fetch_page, limit=0)))
+        self.assertEqual([], collection.requests)
+
+    def test_slices_collection_when_paging_is_ignored(self):
+        collection = PagedCollection(25, paging=False)
+        self.assertEqual(range(3, 8), list(paged_items(collection.fetch_page, offset=3, limit=5, per_page=10)))
+        self.assertEqual(1, len(collection.requests))
+
+    def test_slices_collection_from_offset_beyond_first_page_when_paging_is_ignored(self):
+        collection = PagedCollection(25, paging=False)
+        self.assertEqual(range(12, 17), list(paged_items(collection.fetch_page, offset=12, limit=5, per_page=10)))
+        self.assertEqual([(1, 1), (3, 5)], sorted(collection.requests))
+
+    def test_returns_nothing_from_offset_past_collection_when_paging_is_ignored(self):
+        collection = PagedCollection(8, paging=False)
+        self.assertEqual([], list(paged_items(collection.fetch_page, offset=20, limit=10)))
+
+    def test_returns_nothing_from_offset_past_collection(self):
+        collection = PagedCollection(8)
+        self.assertEqual([], list(paged_items(collection.fetch_page, offset=20, limit=10)))
+
+    def test_returns_last_page_from_offset_beyond_first_page(self):
+        collection = PagedCollection(28)
+        self.assertEqual(range(25, 28), list(paged_items(collection.fetch_page, offset=25, per_page=10)))
+
+    def test_stops_on_repeated_page_when_paging_is_ignored(self):
+        collection = PagedCollection(10, paging=False)
+        self.assertEqual(range(10), list(paged_items(collection.fetch_page, per_page=10)))
+        self.assertEqual([(1, 10), (2, 10)], collection.requests)
+
+    def test_prefetches_next_page_while_records_are_consumed(self):
+        fetched = threading.Event()
+        def fetch_page(page, per_page):
+            if page == 2:
+                fetched.set()
+            return range((page - 1) * per_page, page * per_page) if page <= 2 else []
+        records = paged_items(fetch_page, per_page=2)
+        self.assertEqual(0, records.next())
+        fetched.wait(5)
+        self.assertTrue(fetched.is_set())
+        self.assertEqual([1, 2, 3], list(records))
+
+    def test_reads_streamed_pages(self):
+        collection = PagedCollection(25)
+        stream_page = lambda page, per_page: iter(collection.fetch_page(page, per_page))
+        self.assertEqual(range(25), list(paged_items(stream_page, per_page=10)))
+        self.assertEqual([(1, 10), (2, 10), (3, 10)], collection.requests)
+
+    def test_reads_streamed_collection_when_paging_is_ignored(self):
+        collection = PagedCollection(25, paging=False)
+        stream_page = lambda page, per_page: iter(collection.fetch_page(page, per_page))
+        self.assertEqual(range(3, 25), list(paged_items(stream_page, offset=3, per_page=10)))
+        self.assertEqual(1, len(collection.requests))
+
+    def test_closes_stream_when_limit_is_reached(self):
+        closed = []
+        def stream_page(page, per_page):
+            try:
+                for record in range(per_page):
+                    yield record
+            finally:
+                closed.append(page)
+        self.assertEqual([0, 1, 2], list(paged_items(stream_page, limit=3)))
+        self.assertEqual([1], closed)
+
+    def test_next_pages_are_fetched_with_server_of_the_calling_thread(self):
+        worker_server = KatelloServer('worker')
+        servers = []
+        def fetch_page(page, per_page):
+            servers.append(server.get_active_server())
+            return range(per_page) if page == 1 else []
+        def worker():
+            server.set_active_server(worker_server, thread_local=True)
+            list(paged_items(fetch_page, per_page=2))
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+        self.assertEqual([worker_server, worker_server], servers)
+
+
+class SliceItemsTest(unittest.TestCase):
+
+    def test_returns_all_records_without_limit(self):
+        self.assertEqual([2, 3, 4], slice_items(range(5), 2))
+
+    def test_applies_offset_and_limit(self):
+        self.assertEqual([1, 2], slice_items(range(5), 1, 2))
+
+    def test_ignores_missing_offset(self):
+        self.assertEqual([0, 1], slice_items(range(5), None, 2))
@@ -110,6 +110,12 @@ class MultipleOutputStrategyTest(PrintStrategyTest):
         self.assertTrue(out.find('A1') >= 0)
         self.assertTrue(out.find('B2') >= 0)
 
+    def test_streamed_values_are_printed(self):
+        columns = [{'attr_name': 'id', 'name': 'Id'}]
+        out = self.print_it(columns, (item for item in self.PRINTABLE_ITEMS))
+        self.assertTrue(out.find('A1') >= 0)
+        self.assertTrue(out.find('B2') >= 0)
+
 
 
 class GrepStrategyTest():
@@ -0,0 +1,54 @@
+import os
+import shutil
+import tarfile
+import tempfile
+import unittest
+from StringIO import StringIO
+
+from katello.client.lib.puppet_utils import generate_puppet_data, InvalidTarball, MissingModuleFile
+
+FILES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../../files')
+
+
+class GeneratePuppetDataTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def create_module(self, filename, members):
+        path = os.path.join(self.directory, filename)
+        tgz = tarfile.open(path, 'w:gz')
+        for name, content in members:
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            tgz.addfile(info, StringIO(content))
+        tgz.close()
+        return path
+
+    def test_reads_metadata(self):
+        unit_key, metadata = generate_puppet_data(os.path.join(FILES_DIR, 'puppet/jdob-valid-1.0.0.tar.gz'))
+        self.assertEqual({'author': 'jdob', 'name': 'valid', 'version': '1.0.0'}, unit_key)
+        self.assertEqual('jdob-valid', metadata['name'])
+
+    def test_doesnt_extract_to_temp_dir(self):
+        tempdir = tempfile.tempdir
+        tempfile.tempdir = self.directory
+        try:
+            generate_puppet_data(os.path.join(FILES_DIR, 'puppet/jdob-valid-1.0.0.tar.gz'))
+        finally:
+            tempfile.tempdir = tempdir
+        self.assertEqual([], os.listdir(self.directory))
+
+    def test_missing_metadata(self):
+        path = self.create_module('me-mod-1.0.tar.gz', [('me-mod-1.0/README', 'readme')])
+        self.assertRaises(MissingModuleFile, generate_puppet_data, path)
+
+    def test_invalid_tarball(self):
+        path = os.path.join(self.directory, 'me-mod-1.0.tar.gz')
+        f = open(path, 'w')
+        f.write('not a tarball')
+        f.close()
+        self.assertRaises(InvalidTarball, generate_puppet_data, path)
@@ -0,0 +1,76 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from katello.client.lib.upload_journal import UploadJournal
+
+
+class UploadJournalTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.journal = UploadJournal(os.path.join(self.directory, 'uploads'))
+        self.path = os.path.join(self.directory, 'content.bin')
+        self.write('a' * 2500)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, content):
+        f = open(self.path, 'wb')
+        f.write(content)
+        f.close()
+
+    def start(self):
+        return self.journal.start('https://localhost:443/katello', 1, self.path, 'abc', 1024)
+
+    def test_records_acknowledged_chunks(self):
+        upload = self.start()
+        upload.acknowledge(0, 'a' * 1024)
+        upload.acknowledge(2048, 'a' * 452)
+        found = self.journal.find('https://localhost:443/katello', 1, self.path)
+        self.assertEqual('abc', found.upload_id)
+        self.assertTrue(found.is_acknowledged(2048))
+        self.assertFalse(found.is_acknowledged(1024))
+        self.assertEqual(1476, found.acknowledged_size())
+        self.assertTrue(found.file_unchanged())
+
+    def test_uploads_differ_per_server_and_repository(self):
+        self.start()
+        self.assertEqual(None, self.journal.find('https://other:443/katello', 1, self.path))
+        self.assertEqual(None, self.journal.find('https://localhost:443/katello', 2, self.path))
+
+    def test_detects_changed_content(self):
+        upload = self.start()
+        upload.acknowledge(0, 'a' * 1024)
+        stat = os.stat(self.path)
+        self.write('b' + 'a' * 2499)
+        os.utime(self.path, (stat.st_atime, stat.st_mtime))
+        self.assertFalse(self.journal.find('https://localhost:443/katello', 1, self.path).file_unchanged())
+
+    def test_detects_changed_size(self):
+        self.start()
+        self.write('a' * 100)
+        self.assertFalse(self.journal.find('https://localhost:443/katello', 1, self.path).file_unchanged())
+
+    def test_ignores_incomplete_last_line(self):
+        upload = self.start()
+        upload.acknowledge(0, 'a' * 1024)
+        f = open(upload.path, 'a')
+        f.write('[1024, "da')
+        f.close()
+        self.assertEqual([0], self.journal.find('https://localhost:443/katello', 1, self.path).acknowledged.keys())
+
+    def test_removes_damaged_journal(self):
+        upload = self.start()
+        f = open(upload.path, 'w')
+        f.write('{"upload')
+        f.close()
+        self.assertEqual(None, self.journal.find('https://localhost:443/katello', 1, self.path))
+        self.assertEqual([], self.journal.entries())
+
+    def test_lists_entries(self):
+        self.start().remove()
+        self.start()
+        self.assertEqual(['abc'], [upload.upload_id for upload in self.journal.entries()])
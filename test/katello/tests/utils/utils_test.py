@@ -1,7 +1,10 @@
+# -*- coding: utf-8 -*-
 import unittest
+from StringIO import StringIO
 
-from katello.client.lib.utils.io import convert_to_mime_type, attachment_file_name
-from katello.client.lib.utils.data import slice_dict
+from katello.client.lib.utils.io import convert_to_mime_type, attachment_file_name, iter_json_array, copy_stream, \
+    print_stream
+from katello.client.lib.utils.data import slice_dict, join_related
 
 class ConvertToMimeTest(unittest.TestCase):
 
@@ -49,6 +52,71 @@ class AttachmentFilenameTest(unittest.TestCase):
             ('cache-control', 'private'),
             ('content-disposition')], self.DEFAULT_FILENAME))
 
+    def test_handles_unquoted_filename(self):
+        self.assertEqual(self.FILENAME, attachment_file_name([
+            ('content-disposition', 'attachment; filename=' + self.FILENAME)], self.DEFAULT_FILENAME))
+
+    def test_ignores_directories_in_filename(self):
+        self.assertEqual(self.FILENAME, attachment_file_name([
+            ('content-disposition', 'attachment; filename="../../' + self.FILENAME + '"')], self.DEFAULT_FILENAME))
+
+
+class CopyStreamTest(unittest.TestCase):
+
+    def test_copies_in_blocks(self):
+        blocks = []
+        target = StringIO()
+        self.assertEqual(10, copy_stream(StringIO('0123456789'), target, blocks.append, 4))
+        self.assertEqual('0123456789', target.getvalue())
+        self.assertEqual([4, 4, 2], blocks)
+
+    def test_decodes_characters_split_between_blocks(self):
+        target = StringIO()
+        copy_stream(StringIO(u'čšž'.encode('utf-8')), target, block_size=1, encoding='utf-8')
+        self.assertEqual(u'čšž', target.getvalue())
+
+
+class PrintStreamTest(unittest.TestCase):
+
+    def test_adds_missing_new_line(self):
+        target = StringIO()
+        print_stream(StringIO('report'), target)
+        self.assertEqual('report\n', target.getvalue())
+
+    def test_keeps_existing_new_line(self):
+        target = StringIO()
+        print_stream(StringIO('report\n'), target, encoding='utf-8')
+        self.assertEqual(u'report\n', target.getvalue())
+
+    def test_prints_new_line_for_empty_stream(self):
+        target = StringIO()
+        print_stream(StringIO(''), target)
+        self.assertEqual('\n', target.getvalue())
+
+
+class IterJsonArrayTest(unittest.TestCase):
+
+    def items(self, json_string, block_size=3):
+        return list(iter_json_array(StringIO(json_string), block_size))
+
+    def test_yields_array_items(self):
+        self.assertEqual([{'a': 1}, {'b': [2, 3]}], self.items('[{"a": 1}, {"b": [2, 3]}]'))
+
+    def test_handles_empty_array(self):
+        self.assertEqual([], self.items(' [ ] '))
+
+    def test_handles_values_split_between_blocks(self):
+        self.assertEqual([12345.5, True, None, u'text'], self.items('[12345.5,true, null ,"text"]', 1))
+
+    def test_handles_multibyte_characters_split_between_blocks(self):
+        self.assertEqual([u'\u017elu\u0165ou\u010dk\xfd'], self.items('["\xc5\xbelu\xc5\xa5ou\xc4\x8dk\xc3\xbd"]', 1))
+
+    def test_yields_non_array_document_as_single_item(self):
+        self.assertEqual([{'a': 1}], self.items('{"a": 1}'))
+
+    def test_raises_on_truncated_document(self):
+        self.assertRaises(ValueError, self.items, '[{"a": 1}, {"b"')
+
 
 class SliceDictTest(unittest.TestCase):
 
@@ -95,3 +163,22 @@ class SliceDictTest(unittest.TestCase):
             {"A": "a"}
         )
 
+
+class JoinRelatedTest(unittest.TestCase):
+
+    VIEWS = [{'id': 1, 'name': 'view1'}, {'id': 2, 'name': 'view2'}]
+
+    def test_decorates_records_with_related_field(self):
+        keys = [{'content_view_id': 2}, {'content_view_id': 1}]
+        join_related(keys, self.VIEWS, 'content_view_id', 'content_view')
+        self.assertEqual(['view2', 'view1'], [k['content_view'] for k in keys])
+
+    def test_skips_records_without_match(self):
+        keys = [{'content_view_id': None}, {'content_view_id': 3}]
+        join_related(keys, self.VIEWS, 'content_view_id', 'content_view')
+        self.assertEqual([{'content_view_id': None}, {'content_view_id': 3}], keys)
+
+    def test_joins_other_fields(self):
+        keys = [{'view': 'view1'}]
+        join_related(keys, self.VIEWS, 'view', 'view_id', related_key='name', related_field='id')
+        self.assertEqual(1, keys[0]['view_id'])